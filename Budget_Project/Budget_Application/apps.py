@@ -1,7 +1,23 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_migrate
+
+
+def create_shared_default_categories(sender, **kwargs):
+    if settings.SHARED_DEFAULT_CATEGORIES:
+        from .family_cache import invalidate_categories
+        from .models import Categories
+        Categories.create_shared_defaults()
+        invalidate_categories()
 
 
 class BudgetApplicationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Budget_Application'
 
+    def ready(self):
+        # Rejestracja sygnałów unieważniających pamięć podręczną rodzin
+        from . import family_cache  # noqa: F401
+        # Licznik zapisanych transakcji dla /metrics
+        from . import metrics  # noqa: F401
+        post_migrate.connect(create_shared_default_categories, sender=self)
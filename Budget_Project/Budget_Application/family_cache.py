@@ -0,0 +1,124 @@
+"""
+Pamięć podręczna kategorii i członków rodziny (Django cache framework).
+
+Listy są trzymane osobno dla każdej rodziny (lub użytkownika bez rodziny), więc
+formularze i filtry nie pytają bazy przy każdym wyświetleniu. Wpisy są usuwane
+sygnałami przy zmianie kategorii oraz przy dołączeniu do rodziny, jej opuszczeniu
+lub zmianie danych członka. Wspólne kategorie domyślne mają własny numer wersji,
+który jest częścią klucza - jego podbicie unieważnia listy wszystkich rodzin.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .metrics import cache_requests
+from .models import Categories, User
+
+
+SHARED_VERSION_KEY = 'categories:shared:version'
+# Zmiany tych pól użytkownika wpływają na listę członków rodziny
+MEMBER_FIELDS = {'name', 'surname', 'role', 'family', 'is_blocked'}
+
+
+def _owner_key(family_id, user_id):
+    return f"family:{family_id}" if family_id else f"user:{user_id}"
+
+
+def _categories_key(family_id, user_id):
+    shared_version = cache.get_or_set(SHARED_VERSION_KEY, 1, None)
+    return f"{_owner_key(family_id, user_id)}:categories:{shared_version}"
+
+
+def _members_key(family_id, user_id):
+    return f"{_owner_key(family_id, user_id)}:members"
+
+
+def get_categories(user):
+    """
+    Zwraca kategorie widoczne dla użytkownika (Categories.objects.visible_to)
+    jako listę słowników posortowaną po dacie utworzenia.
+    """
+    key = _categories_key(user.family_id, user.pk)
+    categories = cache.get(key)
+    cache_requests.inc('family_categories', 'miss' if categories is None else 'hit')
+    if categories is None:
+        categories = [
+            {**category, 'is_shared': category['user_id'] is None}
+            for category in Categories.objects.visible_to(user).order_by('created_at', 'id').values(
+                'id', 'category_name', 'category_type', 'user_id'
+            )
+        ]
+        cache.set(key, categories, settings.FAMILY_CACHE_TIMEOUT)
+    return categories
+
+
+def get_members(user):
+    """Zwraca członków rodziny użytkownika (lub tylko jego) jako listę słowników posortowaną po imieniu"""
+    key = _members_key(user.family_id, user.pk)
+    members = cache.get(key)
+    cache_requests.inc('family_members', 'miss' if members is None else 'hit')
+    if members is None:
+        if user.family_id:
+            queryset = User.objects.filter(family_id=user.family_id)
+        else:
+            queryset = User.objects.filter(pk=user.pk)
+        members = list(queryset.order_by('name', 'surname').values(
+            'user_id', 'login', 'name', 'surname', 'role', 'is_blocked'
+        ))
+        cache.set(key, members, settings.FAMILY_CACHE_TIMEOUT)
+    return members
+
+
+def invalidate_categories(family_id=None, user_id=None):
+    """Usuwa listę kategorii rodziny (lub użytkownika bez rodziny); bez argumentów - wszystkie listy"""
+    if family_id is None and user_id is None:
+        try:
+            cache.incr(SHARED_VERSION_KEY)
+        except ValueError:
+            cache.set(SHARED_VERSION_KEY, 2, None)
+        return
+    cache.delete(_categories_key(family_id, user_id))
+
+
+def invalidate_members(family_id=None, user_id=None):
+    cache.delete(_members_key(family_id, user_id))
+
+
+def invalidate_owner(family_id, user_id):
+    invalidate_categories(family_id, user_id)
+    invalidate_members(family_id, user_id)
+
+
+@receiver(post_save, sender=Categories)
+@receiver(post_delete, sender=Categories)
+def invalidate_categories_on_change(sender, instance, **kwargs):
+    if instance.user_id_id is None:
+        invalidate_categories()
+        return
+    invalidate_categories(_owner_family_id(instance), instance.user_id_id)
+
+
+def _owner_family_id(category):
+    # Właściciel jest zwykle już wczytany (zapis z widoku, select_related) - bez dodatkowego zapytania
+    if Categories._meta.get_field('user_id').is_cached(category):
+        return category.user_id.family_id
+    return User.objects.filter(pk=category.user_id_id).values_list('family_id', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_on_save(sender, instance, created, update_fields=None, **kwargs):
+    # Np. zapis last_login przy logowaniu nie zmienia list członków ani kategorii
+    if update_fields and not MEMBER_FIELDS.intersection(update_fields):
+        return
+    invalidate_owner(instance.family_id, instance.pk)
+    loaded_family_id = getattr(instance, '_loaded_family_id', instance.family_id)
+    if loaded_family_id != instance.family_id:
+        # Użytkownik zmienił rodzinę - lista poprzedniej rodziny też jest nieaktualna
+        invalidate_owner(loaded_family_id, instance.pk)
+    instance._loaded_family_id = instance.family_id
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_on_delete(sender, instance, **kwargs):
+    invalidate_owner(instance.family_id, instance.pk)
@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from . import family_cache
 from .models import Family, FamilyInvitation, User, DataTransaction, Categories
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import Group
@@ -448,18 +449,25 @@ class AddTransaction(forms.ModelForm):
         user = kwargs.pop('user')  # pobieramy usera z widoku
         form_type = kwargs.pop('form_type', None)
         super().__init__(*args, **kwargs)
-        family = getattr(user, 'family', None)
-        if family:
-            self.fields['id_user'].queryset = User.objects.filter(family=family)
+        if user.family_id:
+            self.fields['id_user'].queryset = User.objects.filter(family_id=user.family_id)
         else:
             self.fields['id_user'].queryset = User.objects.filter(pk=user.pk)
         self.fields['id_user'].initial = user.pk
         self.fields['income'].required = True
         self.fields['expense'].required = True
-        self.fields['category'].queryset = Categories.objects.filter(
-            category_type=form_type,
-            user_id__family=user.family
+        self.fields['category'].queryset = Categories.objects.visible_to(user).filter(
+            category_type=form_type
         )
+        # Listy wyboru z pamięci podręcznej rodziny - querysety są używane tylko przy walidacji
+        self.fields['id_user'].choices = [('', '---------')] + [
+            (member['user_id'], f"{member['name']} {member['surname']}") for member in family_cache.get_members(user)
+        ]
+        self.fields['category'].choices = [('', '---------')] + [
+            (category['id'], category['category_name'])
+            for category in family_cache.get_categories(user)
+            if category['category_type'] == form_type
+        ]
         self.fields['description'].required = False
         self.fields['transaction_type'].required = True
         if form_type == 'income':
@@ -514,9 +522,8 @@ class AddCategory(forms.ModelForm):
 
     def clean_category_name(self):
         category_name = self.cleaned_data['category_name']
-        family = self.user.family
-        # Sprawdzamy, czy kategoria o takiej nazwie już istnieje dla danego użytkownika
-        qs = Categories.objects.filter(category_name__iexact=category_name, user_id__family=family)
+        # Sprawdzamy, czy kategoria o takiej nazwie już istnieje w rodzinie lub wśród wspólnych kategorii
+        qs = Categories.objects.visible_to(self.user).filter(category_name__iexact=category_name)
 
         # Jeśli edycja, to wykluczamy obecną instancję
         if self.instance.pk:
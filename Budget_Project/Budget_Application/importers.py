@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.db.models import Max
+
+from .metrics import transactions_written
+from .models import Categories, DataTransaction, FamilyTransactionView, MonthlyCategoryTotals
+
+
+class DataTransactionSink:
+    """
+    Zapisuje zaimportowane wiersze wyciągu bankowego jako DataTransaction.
+
+    Każda porcja wierszy trafia do bazy jednym bulk_create. Kategorie rodziny
+    (lub użytkownika bez rodziny) oraz wspólne kategorie domyślne są wczytywane
+    raz, a brakujące tworzone przy pierwszym użyciu.
+    """
+
+    def __init__(self, user, transaction_type='one off'):
+        self.user = user
+        self.transaction_type = transaction_type
+        self.categories = self._load_categories()
+
+    def _load_categories(self):
+        categories = Categories.objects.visible_to(self.user)
+        return {(category.category_name, category.category_type): category for category in categories}
+
+    def _get_category(self, name, category_type):
+        key = (name, category_type)
+        if key not in self.categories:
+            self.categories[key] = Categories.objects.create(
+                category_name=name,
+                category_type=category_type,
+                user_id=self.user
+            )
+        return self.categories[key]
+
+    def write(self, rows):
+        transactions = [
+            DataTransaction(
+                id_user=self.user,
+                family_id=self.user.family_id,
+                transaction_date=row['date'],
+                income=row['amount'] if row['type'] == 'income' else None,
+                expense=row['amount'] if row['type'] == 'expense' else None,
+                description=row['description'][:255],
+                category=self._get_category(row['category'], row['type']),
+                transaction_type=self.transaction_type,
+            )
+            for row in rows
+        ]
+        for data_transaction in transactions:
+            data_transaction.sync_amount()
+        with transaction.atomic():
+            # MySQL nie zwraca kluczy z bulk_create - nowe wiersze to te o id większym niż dotychczasowe
+            last_id = DataTransaction.objects.aggregate(last_id=Max('transaction_id'))['last_id'] or 0
+            DataTransaction.objects.bulk_create(transactions, batch_size=len(transactions))
+            # bulk_create nie wysyła sygnałów - uzupełniamy tabelę transakcji rodziny i zestawienie miesięczne
+            FamilyTransactionView.add_missing(
+                DataTransaction.objects.filter(id_user=self.user, transaction_id__gt=last_id)
+            )
+            MonthlyCategoryTotals.add_many(transactions)
+        transactions_written.inc('import', amount=len(transactions))
@@ -0,0 +1,167 @@
+"""
+Pomiary zapytań SQL i czasu odpowiedzi dla każdego widoku.
+
+ViewStatsMiddleware zlicza dla każdego żądania liczbę zapytań SQL i ich łączny czas
+(connection.execute_wrapper), czas renderowania szablonów (backend szablonów
+InstrumentedDjangoTemplates), całkowity czas odpowiedzi i jej rozmiar. Próbki trafiają do
+okien ostatnich N wartości dla każdego widoku, z których liczone są percentyle
+(endpoint /stats/views/ dla personelu). Żądania przekraczające budżet zapytań lub czasu
+są dodatkowo logowane jako ostrzeżenia. Czas i liczba zapytań każdego żądania trafiają też
+do metryk Prometheusa (moduł metrics).
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+from django.template.backends.django import DjangoTemplates, Template
+
+from perf_stats import RollingWindow
+
+from . import metrics
+
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('queries', 'sql_ms', 'render_ms', 'total_ms', 'response_bytes')
+
+# Pomiary bieżącego żądania (osobne dla każdego wątku / zadania asynchronicznego)
+_current_request = ContextVar('view_stats_request', default=None)
+
+
+class RequestStats:
+    """Liczniki jednego żądania uzupełniane w trakcie jego obsługi"""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+
+
+class ViewStats:
+    """Statystyki wszystkich widoków: liczba żądań i okno próbek każdej miary"""
+
+    def __init__(self, window_size=1000):
+        self.window_size = window_size
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def record(self, view_name, sample):
+        with self._lock:
+            view = self._views.get(view_name)
+            if view is None:
+                view = self._views[view_name] = {
+                    'requests': 0,
+                    **{metric: RollingWindow(self.window_size) for metric in METRICS},
+                }
+            view['requests'] += 1
+            for metric in METRICS:
+                view[metric].add(sample[metric])
+
+    def snapshot(self):
+        """Zwraca statystyki jako słownik gotowy do serializacji (widoki posortowane po nazwie)"""
+        with self._lock:
+            return {
+                view_name: {
+                    'requests': view['requests'],
+                    **{metric: view[metric].summary() for metric in METRICS},
+                }
+                for view_name, view in sorted(self._views.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+view_stats = ViewStats(settings.VIEW_STATS_WINDOW)
+
+
+class InstrumentedTemplate(Template):
+    """Szablon, który dolicza czas renderowania do pomiarów bieżącego żądania"""
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats = _current_request.get()
+            if stats is not None:
+                stats.render_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Backend szablonów Django zwracający InstrumentedTemplate (ustawienie TEMPLATES['BACKEND'])"""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
+
+
+class ViewStatsMiddleware:
+    """Zbiera pomiary każdego żądania i zapisuje je w `view_stats` pod nazwą widoku z urls.py"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.VIEW_STATS_ENABLED:
+            return self.get_response(request)
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(self._record_query):
+                response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        total_time = time.perf_counter() - started
+
+        sample = {
+            'queries': stats.queries,
+            'sql_ms': stats.sql_time * 1000,
+            'render_ms': stats.render_time * 1000,
+            'total_ms': total_time * 1000,
+            # Odpowiedzi strumieniowe (eksport) nie mają znanego rozmiaru
+            'response_bytes': 0 if response.streaming else len(response.content),
+        }
+        match = request.resolver_match
+        # Adresy, które nie pasują do żadnego widoku (np. 404), trafiają do metryk pod wspólną nazwą
+        view_name = match.view_name if match else 'unresolved'
+        metrics.observe_request(view_name, request.method, response.status_code, sample)
+        if match is None:
+            return response
+
+        view_stats.record(view_name, sample)
+        self._check_budget(request, view_name, sample)
+        return response
+
+    @staticmethod
+    def _record_query(execute, sql, params, many, context):
+        stats = _current_request.get()
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if stats is not None:
+                stats.queries += 1
+                stats.sql_time += time.perf_counter() - started
+
+    @staticmethod
+    def _check_budget(request, view_name, sample):
+        query_budget = settings.VIEW_QUERY_BUDGET
+        latency_budget = settings.VIEW_LATENCY_BUDGET_MS
+        over_queries = query_budget and sample['queries'] > query_budget
+        over_latency = latency_budget and sample['total_ms'] > latency_budget
+        if over_queries or over_latency:
+            logger.warning(
+                "Przekroczony budżet widoku %s (%s %s): %d zapytań SQL (%.1f ms), render %.1f ms, razem %.1f ms",
+                view_name, request.method, request.get_full_path(), sample['queries'], sample['sql_ms'],
+                sample['render_ms'], sample['total_ms'],
+            )
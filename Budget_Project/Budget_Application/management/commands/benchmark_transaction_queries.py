@@ -0,0 +1,166 @@
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+
+from Budget_Application.models import Categories, DataTransaction, Family, FamilyTransactionView, MonthlyCategoryTotals, User
+
+
+BENCHMARK_FAMILY = 'benchmark-family'
+CATEGORY_NAMES = {
+    'income': ['Wynagrodzenie', 'Prezenty', 'Inne przychody'],
+    'expense': ['Zakupy', 'Transport', 'Czynsz', 'Media', 'Rozrywka', 'Restauracje', 'Inne wydatki'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Wypełnia bazę transakcjami testowymi i pokazuje plany zapytań (EXPLAIN) oraz czasy "
+        "typowych zapytań widoków transakcji. Działa na bazie z ustawień "
+        "(DB_ENGINE=sqlite dla SQLite, domyślnie MySQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Docelowa liczba transakcji testowych")
+        parser.add_argument('--users', type=int, default=200, help="Liczba użytkowników testowych")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=5, help="Liczba powtórzeń każdego zapytania")
+        parser.add_argument('--chunk-size', type=int, default=10_000)
+        parser.add_argument('--json', dest='json_path', help="Zapisz wyniki do pliku JSON")
+
+    def handle(self, *args, **options):
+        family, users = self._seed(options)
+        user = users[0]
+        last_date = date.today()
+        first_date = last_date - timedelta(days=90)
+        category_name = 'Zakupy'
+
+        queries = {
+            'user_date_range_page': DataTransaction.objects.filter(
+                id_user=user, transaction_date__range=(first_date, last_date)
+            ).order_by('-transaction_date', '-transaction_id')[:50],
+            'user_category_date_range': DataTransaction.objects.filter(
+                id_user=user, category__category_name=category_name,
+                transaction_date__range=(first_date, last_date)
+            ).order_by('-transaction_date', '-transaction_id')[:50],
+            'user_expenses': DataTransaction.objects.filter(
+                id_user=user, direction='expense'
+            ).order_by('-transaction_date', '-transaction_id')[:50],
+            'family_date_range_page': DataTransaction.objects.filter(
+                family=family, transaction_date__range=(first_date, last_date)
+            ).order_by('-transaction_date', '-transaction_id')[:50],
+            'family_table_page': FamilyTransactionView.objects.filter(
+                family=family, transaction_date__range=(first_date, last_date)
+            ).order_by('-transaction_date', '-transaction_id')[:50],
+            'family_monthly_report_raw': DataTransaction.objects.filter(
+                family=family, transaction_date__year=last_date.year
+            ).annotate(month=TruncMonth('transaction_date')).values(
+                'category__category_name', 'month'
+            ).annotate(total=Sum('expense')).order_by(),
+            'family_monthly_report_rollup': MonthlyCategoryTotals.objects.filter(
+                family=family, month__year=last_date.year
+            ).values('category__category_name', 'month').annotate(total=Sum('expense')).order_by(),
+            'user_totals': DataTransaction.objects.filter(
+                id_user=user, transaction_date__range=(first_date, last_date)
+            ),
+        }
+
+        results = {
+            'vendor': connection.vendor,
+            'rows': DataTransaction.objects.filter(family=family).count(),
+            'queries': {},
+        }
+        for name, queryset in queries.items():
+            if name == 'user_totals':
+                run = lambda qs=queryset: qs.aggregate(income=Sum('amount', filter=Q(direction='income')), total=Sum('amount'))
+                plan = queryset.values('id_user').annotate(Sum('amount')).explain()
+            else:
+                run = lambda qs=queryset: list(qs.all())
+                plan = queryset.explain()
+
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+
+            results['queries'][name] = {
+                'median_ms': statistics.median(timings),
+                'min_ms': min(timings),
+                'plan': plan,
+            }
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}"))
+            self.stdout.write(plan)
+            self.stdout.write(f"mediana: {statistics.median(timings):.2f} ms, min: {min(timings):.2f} ms")
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Wyniki zapisane do {options['json_path']}"))
+
+    def _seed(self, options):
+        """Tworzy rodzinę testową i dopisuje transakcje, aż osiągną zadaną liczbę"""
+        family, _ = Family.objects.get_or_create(family_name=BENCHMARK_FAMILY)
+        users = list(User.objects.filter(family=family).order_by('login'))
+        if len(users) < options['users']:
+            password = make_password('Benchmark123!')
+            User.objects.bulk_create([
+                User(
+                    login=f'bench{number}', email=f'bench{number}@example.com', password=password,
+                    name=f'Bench{number}', surname='Test', role='adult', family=family
+                )
+                for number in range(len(users), options['users'])
+            ])
+            users = list(User.objects.filter(family=family).order_by('login'))
+
+        categories = list(Categories.objects.filter(user_id=users[0]))
+        if not categories:
+            Categories.objects.bulk_create([
+                Categories(category_name=name, category_type=category_type, user_id=users[0])
+                for category_type, names in CATEGORY_NAMES.items()
+                for name in names
+            ])
+            categories = list(Categories.objects.filter(user_id=users[0]))
+
+        existing = DataTransaction.objects.filter(family=family).count()
+        missing = options['rows'] - existing
+        if missing <= 0:
+            return family, users
+
+        self.stdout.write(f"Dodawanie {missing} transakcji testowych...")
+        rng = random.Random(options['seed'] + existing)
+        today = date.today()
+        started = time.perf_counter()
+        while missing > 0:
+            chunk = min(missing, options['chunk_size'])
+            rows = []
+            for _ in range(chunk):
+                category = rng.choice(categories)
+                amount = Decimal(f"{rng.lognormvariate(4, 1):.2f}")
+                rows.append(DataTransaction(
+                    id_user=rng.choice(users),
+                    family=family,
+                    transaction_date=today - timedelta(days=rng.randrange(5 * 365)),
+                    income=amount if category.category_type == 'income' else None,
+                    expense=amount if category.category_type == 'expense' else None,
+                    category=category,
+                    transaction_type='one off',
+                ))
+            for row in rows:
+                row.sync_amount()
+            with transaction.atomic():
+                DataTransaction.objects.bulk_create(rows)
+            missing -= chunk
+        FamilyTransactionView.add_missing(DataTransaction.objects.filter(family=family))
+        MonthlyCategoryTotals.rebuild(users)
+        seconds = time.perf_counter() - started
+        self.stdout.write(f"Gotowe w {seconds:.1f} s")
+        return family, users
@@ -0,0 +1,235 @@
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from Budget_Application.models import DataTransaction, Family, User
+from perf_stats import RollingWindow, find_regressions, git_commit
+
+
+DEFAULT_SIZES = '1000,100000,1000000'
+# Czas odpowiedzi rośnie o ponad tyle razy względem pliku bazowego - regresja
+DEFAULT_MAX_SLOWDOWN = 1.25
+# Różnice poniżej tej wartości (ms) to szum pomiaru, a nie regresja
+DEFAULT_MIN_DELTA_MS = 2.0
+
+
+def compare_results(baseline, current, max_slowdown=DEFAULT_MAX_SLOWDOWN, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Porównuje dwa wyniki komendy i zwraca listę regresji: wolniejsze p95 (ponad `max_slowdown`
+    razy i o więcej niż `min_delta_ms`) albo większa liczba zapytań SQL. Porównywane są tylko
+    rozmiary i scenariusze obecne w obu wynikach.
+    """
+    limits = {
+        'p95': (max_slowdown, min_delta_ms, "p95 {old:.1f} ms -> {new:.1f} ms"),
+        'queries': (1, 0, "zapytania SQL {old} -> {new}"),
+    }
+    return find_regressions(_flatten(baseline), _flatten(current), limits)
+
+
+def _flatten(results):
+    return {
+        f"{size} {name}": {'p95': result['latency_ms']['p95'], 'queries': result['queries']['max']}
+        for size, scenarios in results.get('sizes', {}).items()
+        for name, result in scenarios.items()
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Mierzy czas odpowiedzi (p50/p95) i liczbę zapytań SQL widoków transakcji i kategorii przez "
+        "klienta testowego Django na bazach SQLite z danymi z seed_data dla kilku rozmiarów. "
+        "Wymaga DB_ENGINE=sqlite. Bazy są zapisywane w --workdir i używane ponownie, a zmiany "
+        "wprowadzone w trakcie pomiarów są wycofywane."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Liczby transakcji oddzielone przecinkami")
+        parser.add_argument('--repeat', type=int, default=20, help="Liczba mierzonych żądań każdego scenariusza")
+        parser.add_argument('--warmup', type=int, default=2, help="Liczba żądań przed pomiarem")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--families', type=int, default=10)
+        parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'budget_benchmark'),
+                            help="Katalog baz SQLite z danymi testowymi")
+        parser.add_argument('--json', dest='json_path', help="Zapisz wyniki do pliku JSON")
+        parser.add_argument('--compare', help="Plik JSON z wcześniejszymi wynikami do porównania")
+        parser.add_argument('--max-slowdown', type=float, default=DEFAULT_MAX_SLOWDOWN)
+        parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS)
+
+    def handle(self, *args, **options):
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError("Testy widoków działają na lokalnej bazie SQLite - uruchom z DB_ENGINE=sqlite.")
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError(f"Nieprawidłowa lista rozmiarów: {options['sizes']}")
+        if options['repeat'] < 1:
+            raise CommandError("--repeat musi być większe od zera.")
+        os.makedirs(options['workdir'], exist_ok=True)
+
+        results = {
+            'commit': git_commit(settings.BASE_DIR),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'vendor': 'sqlite',
+            'seed': options['seed'],
+            'repeat': options['repeat'],
+            'sizes': {},
+        }
+        # Klient testowy wymaga m.in. hosta 'testserver' w ALLOWED_HOSTS
+        setup_test_environment()
+        try:
+            for size in sizes:
+                self._use_database(size, options)
+                results['sizes'][str(size)] = self._run_scenarios(options)
+        finally:
+            teardown_test_environment()
+            connections[DEFAULT_DB_ALIAS].close()
+
+        self._print_table(results)
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Wyniki zapisane do {options['json_path']}"))
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = compare_results(baseline, results, options['max_slowdown'], options['min_delta_ms'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(regression)
+                raise CommandError(f"Wykryto regresje względem {options['compare']}: {len(regressions)}")
+            self.stdout.write(self.style.SUCCESS(f"Brak regresji względem {options['compare']}"))
+
+    def _use_database(self, size, options):
+        """Przełącza połączenie na bazę SQLite danego rozmiaru i wypełnia ją, jeśli trzeba"""
+        path = os.path.join(options['workdir'], f"views-{size}-seed{options['seed']}-f{options['families']}.sqlite3")
+        connection = connections[DEFAULT_DB_ALIAS]
+        connection.close()
+        # Tak samo przełącza bazę test runner Django przy tworzeniu bazy testowej
+        connection.settings_dict['NAME'] = path
+        # Rodziny i użytkownicy mają te same UUID we wszystkich bazach - wpisy z poprzedniej bazy są nieaktualne
+        cache.clear()
+
+        call_command('migrate', verbosity=0, interactive=False)
+        prefix = f"seed{options['seed']}-"
+        if Family.objects.filter(family_name__startswith=prefix).exists():
+            if DataTransaction.objects.count() == size:
+                self.stdout.write(f"Baza {path}: {size} transakcji")
+                return
+            # Przerwane wypełnianie - zaczynamy od nowa
+            connection.close()
+            os.remove(path)
+            call_command('migrate', verbosity=0, interactive=False)
+
+        self.stdout.write(f"Wypełnianie bazy {path} ({size} transakcji)...")
+        call_command(
+            'seed_data', rows=size, seed=options['seed'], families=options['families'],
+            stdout=self.stdout if options['verbosity'] > 1 else io.StringIO(),
+        )
+
+    def _scenarios(self, user):
+        """Zwraca {nazwa: (funkcja wykonująca żądanie, oczekiwany status)}; funkcja dostaje klienta i numer żądania"""
+        last_date = DataTransaction.objects.filter(id_user=user).latest('transaction_date').transaction_date
+        search = {
+            'category': 'Zakupy',
+            'type': 'expense',
+            'date_from': (last_date - timedelta(days=90)).isoformat(),
+            'date_to': last_date.isoformat(),
+        }
+        edited = DataTransaction.objects.filter(id_user=user, direction='expense').latest('transaction_id')
+        expense_category = DataTransaction.objects.filter(id_user=user, direction='expense').values_list(
+            'category_id', flat=True
+        ).first()
+
+        def add_transaction(client, number):
+            return client.post(reverse('add_transaction', args=['expense']), {
+                'id_user': user.pk,
+                'transaction_date': last_date.isoformat(),
+                'expense': '12.34',
+                'category': expense_category,
+                'description': f'Benchmark {number}',
+                'transaction_type': 'one off',
+            })
+
+        def edit_transaction(client, number):
+            return client.post(reverse('edit-transaction', args=[edited.transaction_id]), {
+                'transaction_date': edited.transaction_date.isoformat(),
+                'amount': str(Decimal('10.00') + number),
+                'transaction_type': 'expense',
+                'description': f'Benchmark {number}',
+                'category': edited.category.category_name,
+            })
+
+        def add_category(client, number):
+            return client.post(reverse('add_category', args=['expense']), {'category_name': f'Benchmark {number}'})
+
+        return {
+            'filtered_transactions': (lambda client, number: client.get(reverse('filtered-transactions')), 200),
+            'filtered_transactions_search': (
+                lambda client, number: client.get(reverse('filtered-transactions'), search), 200
+            ),
+            'filtered_family_transactions': (
+                lambda client, number: client.get(reverse('filtered-family-transactions')), 200
+            ),
+            'filtered_family_transactions_search': (
+                lambda client, number: client.get(reverse('filtered-family-transactions'), search), 200
+            ),
+            'add_transaction_form': (lambda client, number: client.get(reverse('add_transaction', args=['expense'])), 200),
+            'add_transaction': (add_transaction, 302),
+            'edit_transaction': (edit_transaction, 200),
+            'add_category_form': (lambda client, number: client.get(reverse('add_category', args=['expense'])), 200),
+            'add_category': (add_category, 302),
+        }
+
+    def _run_scenarios(self, options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        user = User.objects.get(login=f"seed{options['seed']}_1_adult1")
+        results = {}
+        # Zmiany z żądań zapisujących są wycofywane, żeby baza była taka sama przy każdym uruchomieniu
+        with transaction.atomic():
+            client = Client()
+            client.force_login(user)
+            number = 0
+            for name, (request, expected_status) in self._scenarios(user).items():
+                latency = RollingWindow(options['repeat'])
+                queries = RollingWindow(options['repeat'])
+                for attempt in range(options['warmup'] + options['repeat']):
+                    number += 1
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = request(client, number)
+                        elapsed = time.perf_counter() - started
+                    if response.status_code != expected_status or b'"success": false' in response.content:
+                        raise CommandError(
+                            f"Scenariusz {name}: status {response.status_code} zamiast {expected_status}"
+                        )
+                    if attempt >= options['warmup']:
+                        latency.add(elapsed * 1000)
+                        queries.add(len(captured))
+                results[name] = {'latency_ms': latency.summary(), 'queries': queries.summary()}
+            transaction.set_rollback(True)
+        # Sygnały zapisów unieważniły wpisy pamięci podręcznej wartościami, których już nie ma w bazie
+        cache.clear()
+        return results
+
+    def _print_table(self, results):
+        self.stdout.write(f"\n{'rozmiar':>9}  {'scenariusz':<38}{'p50 ms':>9}{'p95 ms':>9}{'SQL':>6}")
+        for size, scenarios in results['sizes'].items():
+            for name, result in scenarios.items():
+                self.stdout.write(
+                    f"{size:>9}  {name:<38}{result['latency_ms']['p50']:>9.1f}{result['latency_ms']['p95']:>9.1f}"
+                    f"{result['queries']['max']:>6}"
+                )
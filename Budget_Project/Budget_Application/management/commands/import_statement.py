@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+import bank_import
+from Budget_Application.importers import DataTransactionSink
+from Budget_Application.models import User
+
+
+class Command(BaseCommand):
+    help = "Importuje wyciąg bankowy (CSV lub MT940) jako transakcje wskazanego użytkownika."
+
+    def add_arguments(self, parser):
+        parser.add_argument('file_path', help="Ścieżka do pliku z wyciągiem")
+        parser.add_argument('--login', required=True, help="Login użytkownika, do którego trafią transakcje")
+        parser.add_argument('--format', choices=['csv', 'mt940'], help="Format pliku (domyślnie na podstawie rozszerzenia)")
+        parser.add_argument('--chunk-size', type=int, default=bank_import.DEFAULT_CHUNK_SIZE,
+                            help="Liczba wierszy zapisywanych jednym bulk_create")
+        parser.add_argument('--delimiter', default=';', help="Separator kolumn w pliku CSV")
+        parser.add_argument('--encoding', default=None, help="Kodowanie pliku (np. cp1250)")
+        parser.add_argument('--transaction-type', default='one off', choices=['one off', 'monthly'])
+        parser.add_argument('--rules', help='Plik JSON z regułami kategorii: {"fragment opisu": "Kategoria"}')
+        parser.add_argument('--columns', help='Plik JSON z nazwami kolumn CSV: {"date": ..., "amount": ..., "description": ...}')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(login=options['login'])
+        except User.DoesNotExist:
+            raise CommandError(f"Nie znaleziono użytkownika o loginie {options['login']}.")
+
+        reader_options = {}
+        if options['encoding']:
+            reader_options['encoding'] = options['encoding']
+        is_csv = options['format'] != 'mt940' and not options['file_path'].lower().endswith(('.sta', '.mt940'))
+        if is_csv:
+            reader_options['delimiter'] = options['delimiter']
+        elif options['columns']:
+            raise CommandError("--columns dotyczy tylko plików CSV.")
+
+        sink = DataTransactionSink(user, transaction_type=options['transaction_type'])
+        try:
+            if options['columns']:
+                reader_options['columns'] = bank_import.load_mapping(options['columns'])
+            rules = bank_import.load_mapping(options['rules']) if options['rules'] else None
+            stats = bank_import.import_statement(
+                options['file_path'],
+                sink,
+                file_format=options['format'],
+                chunk_size=options['chunk_size'],
+                mapper=bank_import.CategoryMapper(rules),
+                **reader_options
+            )
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Błąd importu: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Zaimportowano {stats['rows']} transakcji w {stats['seconds']:.2f} s "
+            f"({stats['rows_per_second']:.0f} wierszy/s)"
+        ))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Budget_Application.models import MonthlyCategoryTotals, User
+
+
+class Command(BaseCommand):
+    help = "Przelicza od zera zestawienie miesięczne (MonthlyCategoryTotals) na podstawie transakcji."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--login', help="Przelicz tylko dla rodziny tego użytkownika (lub samego użytkownika)")
+
+    def handle(self, *args, **options):
+        users = None
+        if options['login']:
+            try:
+                user = User.objects.get(login=options['login'])
+            except User.DoesNotExist:
+                raise CommandError(f"Nie znaleziono użytkownika o loginie {options['login']}.")
+            users = list(User.objects.filter(family_id=user.family_id)) if user.family_id else [user]
+
+        started = time.perf_counter()
+        MonthlyCategoryTotals.rebuild(users)
+        seconds = time.perf_counter() - started
+
+        rows = MonthlyCategoryTotals.objects.filter(user__in=users) if users is not None else MonthlyCategoryTotals.objects
+        self.stdout.write(self.style.SUCCESS(
+            f"Zestawienie przeliczone w {seconds:.2f} s ({rows.count()} wierszy)"
+        ))
@@ -0,0 +1,216 @@
+import time
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from Budget_Application.models import (
+    DEFAULT_CATEGORIES, Categories, DataTransaction, Family, FamilyTransactionView, MonthlyCategoryTotals, User,
+)
+from seed_data import (
+    CATEGORY_PROFILES, DEFAULT_CHUNK_SIZE, DEFAULT_END_DATE, TransactionGenerator, extra_category_names, write_ledger,
+)
+
+
+SEED_PASSWORD = 'Seed123!'
+# Dziecko robi średnio mniej transakcji niż dorosły
+KID_ACTIVITY = 0.3
+# Kolumny DataTransaction zapisywane przez _insert_transactions (bez klucza głównego)
+TRANSACTION_COLUMNS = (
+    'id_user', 'family', 'transaction_date', 'income', 'expense', 'description', 'category', 'transaction_type',
+    'amount', 'direction',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generuje powtarzalne dane testowe: rodziny, dorosłych, dzieci, kategorie i transakcje "
+        "(bulk_create porcjami). Te same opcje i --seed dają zawsze te same dane. "
+        f"Hasło wszystkich użytkowników: {SEED_PASSWORD}"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--families', type=int, default=10)
+        parser.add_argument('--adults', type=int, default=2, help="Liczba dorosłych w rodzinie")
+        parser.add_argument('--kids', type=int, default=1, help="Liczba dzieci w rodzinie")
+        parser.add_argument('--categories', type=int, default=0, help="Dodatkowe kategorie wydatków w rodzinie")
+        parser.add_argument('--rows', type=int, default=100_000, help="Łączna liczba transakcji")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--start-date', type=date.fromisoformat, help="Pierwszy dzień (RRRR-MM-DD)")
+        parser.add_argument('--end-date', type=date.fromisoformat, default=DEFAULT_END_DATE,
+                            help="Ostatni dzień (RRRR-MM-DD)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--ledger', help="Zapisz te same transakcje do rejestru aplikacji konsolowej (.jsonl/.xlsx)")
+
+    def handle(self, *args, **options):
+        if options['families'] < 1 or options['adults'] < 1:
+            raise CommandError("Potrzebna jest co najmniej jedna rodzina z jednym dorosłym.")
+        prefix = f"seed{options['seed']}"
+        if Family.objects.filter(family_name__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Dane dla --seed {options['seed']} już istnieją - użyj innego ziarna lub pustej bazy.")
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            users = self._create_users(prefix, options)
+            categories = self._create_categories(users, options)
+        self.stdout.write(f"Utworzono {len(users)} użytkowników w {options['families']} rodzinach")
+
+        written = self._create_transactions(users, categories, options)
+        seconds = time.perf_counter() - started
+        self.stdout.write(f"Zapisano {written} transakcji w {seconds:.1f} s ({written / seconds:.0f} wierszy/s)")
+
+        # Zapis z pominięciem modeli nie wysyła sygnałów - uzupełniamy tabelę transakcji rodziny i zestawienie
+        started = time.perf_counter()
+        FamilyTransactionView.add_missing(DataTransaction.objects.filter(id_user__in=users))
+        MonthlyCategoryTotals.rebuild(users)
+        self.stdout.write(self.style.SUCCESS(
+            f"Tabela transakcji rodzin i zestawienie miesięczne uzupełnione w {time.perf_counter() - started:.1f} s"
+        ))
+
+        if options['ledger']:
+            # Ten sam generator z tym samym ziarnem daje te same wiersze co w bazie
+            generator, _, _ = self._generator(options)
+            owners = [user.user_id for user in users]
+            ledger_rows = write_ledger(
+                options['ledger'],
+                generator.rows(owners, options['rows'], self._weights(users), options['chunk_size']),
+                options['chunk_size'],
+            )
+            self.stdout.write(self.style.SUCCESS(f"Zapisano {ledger_rows} transakcji do {options['ledger']}"))
+
+    def _generator(self, options):
+        """Zwraca generator oraz identyfikatory rodzin i użytkowników (losowane przed transakcjami)"""
+        generator = TransactionGenerator(
+            options['seed'], options['start_date'], options['end_date'], options['categories']
+        )
+        family_ids = [generator.make_uuid() for _ in range(options['families'])]
+        user_ids = [
+            generator.make_uuid() for _ in range(options['families'] * (options['adults'] + options['kids']))
+        ]
+        return generator, family_ids, user_ids
+
+    @staticmethod
+    def _weights(users):
+        return [KID_ACTIVITY if user.role == 'kid' else 1.0 for user in users]
+
+    def _create_users(self, prefix, options):
+        _, family_ids, user_ids = self._generator(options)
+        families = [
+            Family(family_id=family_uuid, family_name=f"{prefix}-{number}")
+            for number, family_uuid in enumerate(family_ids, start=1)
+        ]
+        Family.objects.bulk_create(families)
+        # MySQL nie zwraca kluczy z bulk_create - pobieramy rodziny ponownie
+        families = list(Family.objects.filter(family_name__startswith=f"{prefix}-").order_by('id'))
+
+        password = make_password(SEED_PASSWORD)
+        user_ids = iter(user_ids)
+        users = []
+        for family_number, family in enumerate(families, start=1):
+            members = [('adult', number) for number in range(1, options['adults'] + 1)]
+            members += [('kid', number) for number in range(1, options['kids'] + 1)]
+            for role, number in members:
+                login = f"{prefix}_{family_number}_{role}{number}"
+                users.append(User(
+                    user_id=next(user_ids), login=login, email=f"{login}@example.com", password=password,
+                    name=f"{'Dorosły' if role == 'adult' else 'Dziecko'} {number}", surname=family.family_name,
+                    role=role, family=family,
+                ))
+        User.objects.bulk_create(users, batch_size=options['chunk_size'])
+
+        for family, first_adult in zip(families, users[::options['adults'] + options['kids']]):
+            family.created_by = first_adult
+        Family.objects.bulk_update(families, ['created_by'])
+        return users
+
+    def _create_categories(self, users, options):
+        """Zwraca {(id użytkownika, nazwa kategorii): id kategorii} dla kategorii widocznych dla użytkownika"""
+        # Tak jak przy rejestracji: wspólne kategorie domyślne albo własna kopia dla każdego użytkownika
+        if settings.SHARED_DEFAULT_CATEGORIES:
+            Categories.create_shared_defaults()
+        else:
+            Categories.objects.bulk_create([
+                Categories(category_name=name, category_type=category_type, user_id=user)
+                for user in users
+                for name, category_type in DEFAULT_CATEGORIES
+            ], batch_size=options['chunk_size'], ignore_conflicts=True)
+
+        family_size = options['adults'] + options['kids']
+        first_adults = users[::family_size]
+        extra_names = extra_category_names(options['categories'])
+        Categories.objects.bulk_create([
+            Categories(category_name=name, category_type='expense', user_id=first_adult)
+            for first_adult in first_adults
+            for name in extra_names
+        ], batch_size=options['chunk_size'])
+
+        shared = dict(Categories.objects.filter(user_id__isnull=True).values_list('category_name', 'id'))
+        owned = {
+            (user_id, name): category_id
+            for category_id, user_id, name in Categories.objects.filter(
+                user_id__in=users
+            ).values_list('id', 'user_id', 'category_name')
+        }
+
+        categories = {}
+        for position, user in enumerate(users):
+            first_adult = first_adults[position // family_size]
+            for name in [*CATEGORY_PROFILES, *extra_names]:
+                categories[(user.user_id, name)] = (
+                    owned.get((user.user_id, name)) or owned.get((first_adult.user_id, name)) or shared[name]
+                )
+        return categories
+
+    def _create_transactions(self, users, categories, options):
+        generator, _, _ = self._generator(options)
+        connection = connections[DEFAULT_DB_ALIAS]
+        user_field = DataTransaction._meta.get_field('id_user')
+        # Klucz użytkownika w postaci gotowej do zapisu liczony raz, a nie dla każdej transakcji
+        owners = {user.user_id: user_field.get_db_prep_save(user.user_id, connection) for user in users}
+        families = {user.user_id: user.family_id for user in users}
+
+        written = 0
+        batch = []
+        for row in generator.rows(users, options['rows'], self._weights(users), options['chunk_size']):
+            user_id = row['owner'].user_id
+            amount = row['amount']
+            is_income = row['type'] == 'income'
+            batch.append([
+                owners[user_id],
+                families[user_id],
+                connection.ops.adapt_datefield_value(row['date']),
+                amount if is_income else None,
+                None if is_income else amount,
+                row['description'],
+                categories[(user_id, row['category'])],
+                'monthly' if row['frequency'] == 'Miesięczny' else 'one off',
+                # Jak w DataTransaction.sync_amount(): przychód dodatni, wydatek ujemny
+                amount if is_income else -amount,
+                row['type'],
+            ])
+            if len(batch) >= options['chunk_size']:
+                written += self._insert_transactions(connection, batch)
+                batch = []
+                self.stdout.write(f"  {written} / {options['rows']}")
+        if batch:
+            written += self._insert_transactions(connection, batch)
+        return written
+
+    @staticmethod
+    def _insert_transactions(connection, rows):
+        """
+        Zapisuje porcję transakcji (wartości w kolejności TRANSACTION_COLUMNS) jednym executemany.
+        Działa jak bulk_create, ale bez budowania obiektów modelu i kompilowania INSERT-a dla każdego
+        z nich, i bez dzielenia porcji na paczki po 999 parametrów (limit SQLite w Django).
+        """
+        quote_name = connection.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            quote_name(DataTransaction._meta.db_table),
+            ', '.join(quote_name(DataTransaction._meta.get_field(name).column) for name in TRANSACTION_COLUMNS),
+            ', '.join(['%s'] * len(TRANSACTION_COLUMNS)),
+        )
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+        return len(rows)
@@ -0,0 +1,232 @@
+"""
+Metryki aplikacji w formacie tekstowym Prometheusa (endpoint /metrics).
+
+Liczniki i histogramy są zwiększane bez blokady: każdy wątek ma własną kopię wartości
+(threading.local), a kopie są sumowane dopiero przy odczycie. Blokada jest używana tylko
+przy pierwszym zapisie nowego wątku i przy odczycie. Wartości są liczone osobno w każdym
+procesie serwera.
+"""
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import DataTransaction
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+_collectors = []
+
+
+class _Metric:
+    """Wspólna część liczników i histogramów: wartości trzymane osobno dla każdego wątku"""
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        # Wartości wątków, które już się zakończyły (np. po żądaniach obsłużonych przez runserver)
+        self._retired = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _shard(self):
+        shard = getattr(self._local, 'values', None)
+        if shard is None:
+            shard = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _merge(self, total, values):
+        raise NotImplementedError
+
+    def collect(self):
+        """Zwraca {etykiety: wartość} zsumowane ze wszystkich wątków"""
+        with self._lock:
+            total = {}
+            alive = []
+            for thread, shard in self._shards:
+                values = shard.copy()
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                    self._merge(total, values)
+                else:
+                    # Doliczone niżej razem z pozostałymi wartościami zakończonych wątków
+                    self._merge(self._retired, values)
+            self._shards = alive
+            self._merge(total, self._retired)
+            return total
+
+    def _labels(self, labels, extra=()):
+        pairs = list(zip(self.labelnames, labels)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        for labels, value in sorted(self.collect().items()):
+            lines.extend(self._samples(labels, value))
+        return lines
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def inc(self, *labels, amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, total, values):
+        for labels, value in values.items():
+            total[labels] = total.get(labels, 0) + value
+
+    def _samples(self, labels, value):
+        return [f'{self.name}{self._labels(labels)} {_format(value)}']
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # Liczniki kubełków (ostatni to +Inf) oraz suma obserwacji
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def _merge(self, total, values):
+        for labels, counts in values.items():
+            current = total.setdefault(labels, [0] * len(counts))
+            for position, count in enumerate(counts):
+                current[position] += count
+
+    def _samples(self, labels, counts):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else _format(bound)
+            lines.append(f'{self.name}_bucket{self._labels(labels, [("le", le)])} {cumulative}')
+        lines.append(f'{self.name}_sum{self._labels(labels)} {_format(counts[-1])}')
+        lines.append(f'{self.name}_count{self._labels(labels)} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def register_collector(collect):
+    """Rejestruje funkcję zwracającą gotowe linie metryk liczonych przy odczycie (np. z innych modułów)"""
+    _collectors.append(collect)
+    return collect
+
+
+def render():
+    """Zwraca wszystkie metryki w formacie tekstowym Prometheusa"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.expose())
+    for collect in _collectors:
+        lines.extend(collect())
+    return '\n'.join(lines) + '\n'
+
+
+http_requests = Counter(
+    'budget_http_requests_total', 'Liczba żądań HTTP według widoku, metody i statusu',
+    ('view', 'method', 'status'),
+)
+http_request_duration = Histogram(
+    'budget_http_request_duration_seconds', 'Czas obsługi żądania HTTP według widoku', ('view',),
+)
+db_queries = Counter('budget_db_queries_total', 'Liczba zapytań SQL według widoku', ('view',))
+db_query_duration = Counter(
+    'budget_db_query_duration_seconds_total', 'Łączny czas zapytań SQL według widoku', ('view',),
+)
+cache_requests = Counter(
+    'budget_cache_requests_total', 'Odczyty pamięci podręcznej rodzin (result=hit|miss)', ('cache', 'result'),
+)
+transactions_written = Counter(
+    'budget_transactions_written_total', 'Liczba zapisanych nowych transakcji (DataTransaction)', ('source',),
+)
+
+
+def observe_request(view_name, method, status, sample):
+    """Dolicza pomiary jednego żądania (wywoływane przez ViewStatsMiddleware)"""
+    http_requests.inc(view_name, method, str(status))
+    http_request_duration.observe(sample['total_ms'] / 1000, view_name)
+    db_queries.inc(view_name, amount=sample['queries'])
+    db_query_duration.inc(view_name, amount=sample['sql_ms'] / 1000)
+
+
+@register_collector
+def collect_cache_hit_ratio():
+    lines = [
+        '# HELP budget_cache_hit_ratio Udział trafień w odczytach pamięci podręcznej',
+        '# TYPE budget_cache_hit_ratio gauge',
+    ]
+    results = defaultdict(lambda: {'hit': 0, 'miss': 0})
+    for (cache_name, result), count in cache_requests.collect().items():
+        results[cache_name][result] += count
+    for cache_name, counts in sorted(results.items()):
+        ratio = counts['hit'] / (counts['hit'] + counts['miss'])
+        lines.append(f'budget_cache_hit_ratio{{cache="{cache_name}"}} {_format(ratio)}')
+    return lines
+
+
+@register_collector
+def collect_exchange_rates():
+    # Import lokalny: moduł kursów jest wspólny z aplikacją konsolową i nie zna Django
+    from exchange_rates import rate_cache
+
+    stats = rate_cache.stats()
+    lookups = stats['hits'] + stats['misses']
+    lines = [
+        '# HELP budget_exchange_rate_upstream_requests_total Zapytania do zewnętrznego API kursów walut',
+        '# TYPE budget_exchange_rate_upstream_requests_total counter',
+        f'budget_exchange_rate_upstream_requests_total {stats["upstream_requests"]}',
+        '# HELP budget_exchange_rate_upstream_errors_total Nieudane zapytania do API kursów walut',
+        '# TYPE budget_exchange_rate_upstream_errors_total counter',
+        f'budget_exchange_rate_upstream_errors_total {stats["upstream_errors"]}',
+        '# HELP budget_exchange_rate_upstream_duration_seconds Czas zapytań do API kursów walut',
+        '# TYPE budget_exchange_rate_upstream_duration_seconds summary',
+        f'budget_exchange_rate_upstream_duration_seconds_sum {_format(stats["upstream_seconds"])}',
+        f'budget_exchange_rate_upstream_duration_seconds_count {stats["upstream_requests"]}',
+        '# HELP budget_exchange_rate_cache_requests_total Odczyty tabel kursów (result=hit|miss)',
+        '# TYPE budget_exchange_rate_cache_requests_total counter',
+        f'budget_exchange_rate_cache_requests_total{{result="hit"}} {stats["hits"]}',
+        f'budget_exchange_rate_cache_requests_total{{result="miss"}} {stats["misses"]}',
+    ]
+    if lookups:
+        lines += [
+            '# HELP budget_exchange_rate_cache_hit_ratio Udział trafień w odczytach tabel kursów',
+            '# TYPE budget_exchange_rate_cache_hit_ratio gauge',
+            f'budget_exchange_rate_cache_hit_ratio {_format(stats["hits"] / lookups)}',
+        ]
+    return lines
+
+
+@receiver(post_save, sender=DataTransaction)
+def count_created_transaction(sender, instance, created, **kwargs):
+    if created:
+        transactions_written.inc('save')
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Budget_Application', '0002_familytransactionview_categories_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='datatransaction',
+            index=models.Index(fields=['id_user', 'transaction_date', 'transaction_id'], name='dt_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datatransaction',
+            index=models.Index(fields=['category', 'transaction_date'], name='dt_category_date_idx'),
+        ),
+    ]
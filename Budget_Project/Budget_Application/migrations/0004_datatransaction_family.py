@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_family_from_users(apps, schema_editor):
+    DataTransaction = apps.get_model('Budget_Application', 'DataTransaction')
+    User = apps.get_model('Budget_Application', 'User')
+    DataTransaction.objects.update(
+        family_id=models.Subquery(
+            User.objects.filter(pk=models.OuterRef('id_user')).values('family_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Budget_Application', '0003_datatransaction_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datatransaction',
+            name='family',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transactions', to='Budget_Application.family'),
+        ),
+        migrations.RunPython(copy_family_from_users, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='datatransaction',
+            index=models.Index(fields=['family', 'transaction_date', 'transaction_id'], name='dt_family_date_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_family_transactions(apps, schema_editor):
+    DataTransaction = apps.get_model('Budget_Application', 'DataTransaction')
+    FamilyTransactionView = apps.get_model('Budget_Application', 'FamilyTransactionView')
+    rows = []
+    for transaction in DataTransaction.objects.select_related('id_user', 'category').iterator(chunk_size=10000):
+        user = transaction.id_user
+        rows.append(FamilyTransactionView(
+            transaction_id=transaction.transaction_id,
+            user_id=user.user_id,
+            user_name=user.name,
+            user_surname=user.surname,
+            user_role=user.role,
+            transaction_date=transaction.transaction_date,
+            income=transaction.income,
+            expense=transaction.expense,
+            description=transaction.description,
+            category=transaction.category.category_name if transaction.category_id else None,
+            transaction_type=transaction.transaction_type,
+            family_id=transaction.family_id,
+        ))
+        if len(rows) >= 10000:
+            FamilyTransactionView.objects.bulk_create(rows)
+            rows = []
+    if rows:
+        FamilyTransactionView.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Budget_Application', '0004_datatransaction_family'),
+    ]
+
+    operations = [
+        # Wcześniej model niezarządzany bez tabeli w bazie - tworzymy go od nowa jako zwykłą tabelę
+        migrations.DeleteModel(
+            name='FamilyTransactionView',
+        ),
+        migrations.CreateModel(
+            name='FamilyTransactionView',
+            fields=[
+                ('transaction', models.OneToOneField(db_column='transaction_id', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='family_row', serialize=False, to='Budget_Application.datatransaction')),
+                ('user_name', models.CharField(max_length=100)),
+                ('user_surname', models.CharField(max_length=100)),
+                ('user_role', models.CharField(max_length=10)),
+                ('transaction_date', models.DateField()),
+                ('income', models.FloatField(blank=True, null=True)),
+                ('expense', models.FloatField(blank=True, null=True)),
+                ('description', models.CharField(blank=True, max_length=255, null=True)),
+                ('category', models.CharField(blank=True, max_length=255, null=True)),
+                ('transaction_type', models.CharField(blank=True, max_length=255, null=True)),
+                ('family', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='Budget_Application.family')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='family_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'family_transaction_view',
+                'indexes': [models.Index(fields=['family', 'transaction_date', 'transaction'], name='ftv_family_date_idx'), models.Index(fields=['user', 'transaction_date', 'transaction'], name='ftv_user_date_idx')],
+            },
+        ),
+        migrations.RunPython(fill_family_transactions, migrations.RunPython.noop),
+    ]
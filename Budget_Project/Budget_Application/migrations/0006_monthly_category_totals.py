@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def fill_monthly_totals(apps, schema_editor):
+    DataTransaction = apps.get_model('Budget_Application', 'DataTransaction')
+    MonthlyCategoryTotals = apps.get_model('Budget_Application', 'MonthlyCategoryTotals')
+    rows = DataTransaction.objects.annotate(month=TruncMonth('transaction_date')).order_by().values(
+        'id_user', 'id_user__family', 'category', 'month'
+    ).annotate(
+        income_sum=Coalesce(models.Sum('income'), models.Value(0.0)),
+        expense_sum=Coalesce(models.Sum('expense'), models.Value(0.0)),
+        count=models.Count('transaction_id'),
+    )
+    MonthlyCategoryTotals.objects.bulk_create([
+        MonthlyCategoryTotals(
+            user_id=row['id_user'], family_id=row['id_user__family'], category_id=row['category'],
+            month=row['month'], income=row['income_sum'], expense=row['expense_sum'],
+            transaction_count=row['count']
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Budget_Application', '0005_family_transaction_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('income', models.FloatField(default=0.0)),
+                ('expense', models.FloatField(default=0.0)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to='Budget_Application.categories')),
+                ('family', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='Budget_Application.family')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'MONTHLY_CATEGORY_TOTALS',
+                'indexes': [models.Index(fields=['family', 'month'], name='mct_family_month_idx'), models.Index(fields=['user', 'month'], name='mct_user_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'category', 'month'), name='mct_user_category_month_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_monthly_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:51
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def rebuild_monthly_totals(apps, schema_editor):
+    # Sumy liczone wcześniej na floatach mogą różnić się o grosz od sumy zaokrąglonych kwot
+    DataTransaction = apps.get_model('Budget_Application', 'DataTransaction')
+    MonthlyCategoryTotals = apps.get_model('Budget_Application', 'MonthlyCategoryTotals')
+    rows = DataTransaction.objects.annotate(month=TruncMonth('transaction_date')).order_by().values(
+        'id_user', 'id_user__family', 'category', 'month'
+    ).annotate(
+        income_sum=Coalesce(models.Sum('income'), models.Value(Decimal('0.00'))),
+        expense_sum=Coalesce(models.Sum('expense'), models.Value(Decimal('0.00'))),
+        count=models.Count('transaction_id'),
+    )
+    MonthlyCategoryTotals.objects.all().delete()
+    MonthlyCategoryTotals.objects.bulk_create([
+        MonthlyCategoryTotals(
+            user_id=row['id_user'], family_id=row['id_user__family'], category_id=row['category'],
+            month=row['month'], income=row['income_sum'], expense=row['expense_sum'],
+            transaction_count=row['count']
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Budget_Application', '0006_monthly_category_totals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='datatransaction',
+            name='expense',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AlterField(
+            model_name='datatransaction',
+            name='income',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AlterField(
+            model_name='familytransactionview',
+            name='expense',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AlterField(
+            model_name='familytransactionview',
+            name='income',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AlterField(
+            model_name='monthlycategorytotals',
+            name='expense',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='monthlycategorytotals',
+            name='income',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14),
+        ),
+        migrations.RunPython(rebuild_monthly_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:53
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_signed_amount(apps, schema_editor):
+    for model_name in ('DataTransaction', 'FamilyTransactionView'):
+        model = apps.get_model('Budget_Application', model_name)
+        model.objects.filter(income__gt=0).update(direction='income', amount=models.F('income'))
+        model.objects.exclude(income__gt=0).update(
+            direction='expense',
+            amount=-Coalesce(models.F('expense'), models.Value(Decimal('0.00')))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Budget_Application', '0007_decimal_money'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datatransaction',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='datatransaction',
+            name='direction',
+            field=models.CharField(choices=[('income', 'income'), ('expense', 'expense')], default='expense', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='familytransactionview',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='familytransactionview',
+            name='direction',
+            field=models.CharField(choices=[('income', 'income'), ('expense', 'expense')], default='expense', max_length=7),
+        ),
+        migrations.RunPython(fill_signed_amount, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='datatransaction',
+            index=models.Index(fields=['id_user', 'direction', 'transaction_date'], name='dt_user_direction_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='familytransactionview',
+            index=models.Index(fields=['family', 'direction', 'transaction_date'], name='ftv_family_direction_date_idx'),
+        ),
+    ]
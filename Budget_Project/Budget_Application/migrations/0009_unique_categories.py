@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def merge_duplicate_categories(apps, schema_editor):
+    # Przed dodaniem ograniczenia unikalności scalamy powtórzone kategorie użytkownika w jedną
+    Categories = apps.get_model('Budget_Application', 'Categories')
+    DataTransaction = apps.get_model('Budget_Application', 'DataTransaction')
+    MonthlyCategoryTotals = apps.get_model('Budget_Application', 'MonthlyCategoryTotals')
+
+    duplicates = Categories.objects.values('user_id', 'category_name', 'category_type').annotate(
+        count=models.Count('id'), keep_id=models.Min('id')
+    ).filter(count__gt=1)
+    for group in duplicates:
+        keep_id = group['keep_id']
+        extra = Categories.objects.filter(
+            user_id=group['user_id'], category_name=group['category_name'], category_type=group['category_type']
+        ).exclude(id=keep_id)
+        DataTransaction.objects.filter(category__in=extra).update(category_id=keep_id)
+        for row in MonthlyCategoryTotals.objects.filter(category__in=extra):
+            target = MonthlyCategoryTotals.objects.filter(user_id=row.user_id, category_id=keep_id, month=row.month).first()
+            if target:
+                target.income += row.income
+                target.expense += row.expense
+                target.transaction_count += row.transaction_count
+                target.save()
+                row.delete()
+            else:
+                row.category_id = keep_id
+                row.save()
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Budget_Application', '0008_signed_amount'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='categories',
+            name='user_id',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(merge_duplicate_categories, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='categories',
+            constraint=models.UniqueConstraint(fields=('user_id', 'category_name', 'category_type'), name='category_user_name_type_uniq'),
+        ),
+    ]
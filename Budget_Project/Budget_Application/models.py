@@ -1,50 +1,368 @@
-from django.db import models
+from django.db import IntegrityError, connections, models, transaction as db_transaction
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
 import uuid
 from datetime import timedelta
+from decimal import Decimal
 import random
 import string
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from money import to_decimal
+
+
+def to_money(value):
+    """
+    Zamienia kwotę (float, str, Decimal lub None) na Decimal z dokładnością do grosza.
+    Zaokrąglanie jak w aplikacji konsolowej (money.to_decimal); brak kwoty to zero.
+    """
+    if value is None or value == '':
+        return Decimal('0.00')
+    return to_decimal(value)
+
+
+DIRECTION_CHOICES = (
+    ('income', 'income'),
+    ('expense', 'expense'),
+)
+
+
+class DataTransactionQuerySet(models.QuerySet):
+
+    def delete(self):
+        """
+        Usuwa transakcje i odejmuje je z zestawienia miesięcznego jedną aktualizacją na każdy
+        wiersz (użytkownik, kategoria, miesiąc), a nie osobno dla każdej usuniętej transakcji.
+        """
+        groups = self.annotate(month=TruncMonth('transaction_date')).order_by().values(
+            'id_user', 'family', 'category', 'month'
+        ).annotate(
+            income_sum=Coalesce(models.Sum('income'), models.Value(Decimal('0.00'))),
+            expense_sum=Coalesce(models.Sum('expense'), models.Value(Decimal('0.00'))),
+            count=models.Count('transaction_id'),
+        )
+        with db_transaction.atomic(using=self.db):
+            groups = list(groups)
+            # Sygnał post_delete pomija transakcje usuwane przez QuerySet (origin=self)
+            deleted = super().delete()
+            for row in groups:
+                MonthlyCategoryTotals.apply(
+                    row['id_user'], row['family'], row['category'], row['month'],
+                    -to_money(row['income_sum']), -to_money(row['expense_sum']), -row['count']
+                )
+        return deleted
+
 
 class DataTransaction(models.Model):
     transaction_id = models.AutoField(primary_key=True)
     id_user = models.ForeignKey('User', on_delete=models.CASCADE, db_column='id_user')
     transaction_date = models.DateField()
-    income = models.FloatField(blank=True, null=True)
-    expense = models.FloatField(blank=True, null=True)
+    income = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    expense = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
     description = models.CharField(blank=True, null=True, max_length=255)
     category = models.ForeignKey('Categories', on_delete=models.CASCADE)
     transaction_type = models.CharField(blank=True, null=True, max_length=255)
+    # Rodzina właściciela transakcji (kopia User.family), żeby listy rodziny nie wymagały złączenia z USERS.
+    # Uzupełniana w save() oraz przez User.set_family() przy dołączeniu do rodziny lub jej opuszczeniu.
+    family = models.ForeignKey('Family', on_delete=models.SET_NULL, null=True, blank=True, related_name='transactions')
+    # Kwota ze znakiem (przychód dodatni, wydatek ujemny) i kierunek - wyliczane z income/expense w sync_amount().
+    # Filtry i sumy korzystają z tych kolumn zamiast z pary income/expense, z których jedna jest zawsze pusta.
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    direction = models.CharField(max_length=7, choices=DIRECTION_CHOICES, default='expense')
+
+    objects = DataTransactionQuerySet.as_manager()
 
     class Meta:
         db_table = 'DATA_TRANSACTION'
+        indexes = [
+            # Listy transakcji: filtr po użytkowniku i zakresie dat, sortowanie po dacie (i id dla stronicowania)
+            models.Index(fields=['id_user', 'transaction_date', 'transaction_id'], name='dt_user_date_idx'),
+            # Filtr po kategorii w zakresie dat
+            models.Index(fields=['category', 'transaction_date'], name='dt_category_date_idx'),
+            # Listy transakcji rodziny
+            models.Index(fields=['family', 'transaction_date', 'transaction_id'], name='dt_family_date_idx'),
+            # Filtr "tylko przychody" / "tylko wydatki" użytkownika
+            models.Index(fields=['id_user', 'direction', 'transaction_date'], name='dt_user_direction_date_idx'),
+        ]
+
+    # Pola, od których zależy wiersz w MonthlyCategoryTotals
+    ROLLUP_FIELDS = ('id_user_id', 'family_id', 'category_id', 'transaction_date', 'income', 'expense')
+    # Pola przepisywane do FamilyTransactionView (amount i direction wynikają z income/expense)
+    FAMILY_ROW_FIELDS = ROLLUP_FIELDS + ('description', 'transaction_type')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Zapamiętujemy stan z bazy, żeby przy zapisie skorygować zestawienie miesięczne o różnicę
+        # i nie przepisywać wiersza tabeli rodziny, gdy nic się w nim nie zmienia
+        if all(field in instance.__dict__ for field in cls.ROLLUP_FIELDS):
+            instance._rollup_state = instance.rollup_state()
+            if all(field in instance.__dict__ for field in cls.FAMILY_ROW_FIELDS):
+                instance._family_row_state = instance.family_row_state(instance._rollup_state)
+        return instance
+
+    def rollup_state(self):
+        """Zwraca (user_id, family_id, category_id, miesiąc, przychód, wydatek) tej transakcji"""
+        transaction_date = self._meta.get_field('transaction_date').to_python(self.transaction_date)
+        return (
+            self.id_user_id, self.family_id, self.category_id, transaction_date.replace(day=1),
+            to_money(self.income), to_money(self.expense),
+        )
+
+    def family_row_state(self, rollup_state=None):
+        """Zwraca rollup_state() uzupełniony o dzień, opis i typ - pola wiersza FamilyTransactionView"""
+        transaction_date = self._meta.get_field('transaction_date').to_python(self.transaction_date)
+        return (rollup_state or self.rollup_state()) + (transaction_date, self.description, self.transaction_type)
+
+    def sync_amount(self):
+        """Uzupełnia amount i direction na podstawie income/expense (wywoływane też przed bulk_create)"""
+        income = to_money(self.income)
+        if income > 0:
+            self.direction = 'income'
+            self.amount = income
+        else:
+            self.direction = 'expense'
+            self.amount = -to_money(self.expense)
+
+    def save(self, *args, **kwargs):
+        if self.id_user_id:
+            self.family_id = self.id_user.family_id
+        self.sync_amount()
+        super().save(*args, **kwargs)
+
+
+class MonthlyCategoryTotals(models.Model):
+    """
+    Zestawienie miesięczne: suma przychodów, wydatków i liczba transakcji
+    dla każdego użytkownika, kategorii i miesiąca (month = pierwszy dzień miesiąca).
+
+    Aktualizowane przyrostowo sygnałami przy dodaniu, edycji i usunięciu DataTransaction,
+    więc raporty miesięczne nie muszą przeglądać surowych transakcji. Ścieżki z bulk_create
+    wywołują add_many(), a komenda rebuild_monthly_totals przelicza tabelę od zera.
+    """
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='monthly_totals')
+    family = models.ForeignKey('Family', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    category = models.ForeignKey('Categories', on_delete=models.CASCADE, related_name='monthly_totals')
+    month = models.DateField()
+    income = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    expense = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    transaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'MONTHLY_CATEGORY_TOTALS'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'category', 'month'], name='mct_user_category_month_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['family', 'month'], name='mct_family_month_idx'),
+            models.Index(fields=['user', 'month'], name='mct_user_month_idx'),
+        ]
+
+    @classmethod
+    def apply(cls, user_id, family_id, category_id, month, income, expense, count):
+        """Dodaje do wiersza (user, category, month) podane kwoty i liczbę transakcji (mogą być ujemne)"""
+        updated = cls.objects.filter(user_id=user_id, category_id=category_id, month=month).update(
+            income=models.F('income') + income,
+            expense=models.F('expense') + expense,
+            transaction_count=models.F('transaction_count') + count,
+            family_id=family_id,
+        )
+        # Brak wiersza przy odejmowaniu oznacza, że kategoria lub użytkownik jest właśnie usuwany
+        if updated or count <= 0:
+            return
+        try:
+            with db_transaction.atomic():
+                cls.objects.create(
+                    user_id=user_id, family_id=family_id, category_id=category_id, month=month,
+                    income=income, expense=expense, transaction_count=count
+                )
+        except IntegrityError:
+            # Równoległy zapis utworzył wiersz pierwszy - dopisujemy się do niego
+            cls.apply(user_id, family_id, category_id, month, income, expense, count)
+
+    @classmethod
+    def add_many(cls, transactions):
+        """Dolicza transakcje zapisane z pominięciem sygnałów (np. bulk_create), jedna aktualizacja na wiersz"""
+        deltas = {}
+        for transaction in transactions:
+            user_id, family_id, category_id, month, income, expense = transaction.rollup_state()
+            key = (user_id, family_id, category_id, month)
+            total_income, total_expense, count = deltas.get(key, (Decimal('0.00'), Decimal('0.00'), 0))
+            deltas[key] = (total_income + income, total_expense + expense, count + 1)
+        for (user_id, family_id, category_id, month), (income, expense, count) in deltas.items():
+            cls.apply(user_id, family_id, category_id, month, income, expense, count)
+
+    @classmethod
+    def rebuild(cls, users=None):
+        """Przelicza zestawienie od zera (dla wszystkich lub wskazanych użytkowników) jednym GROUP BY"""
+        transactions = DataTransaction.objects.all()
+        existing = cls.objects.all()
+        if users is not None:
+            transactions = transactions.filter(id_user__in=users)
+            existing = existing.filter(user__in=users)
+
+        rows = transactions.annotate(month=TruncMonth('transaction_date')).order_by().values(
+            'id_user', 'id_user__family', 'category', 'month'
+        ).annotate(
+            income_sum=Coalesce(models.Sum('income'), models.Value(Decimal('0.00'))),
+            expense_sum=Coalesce(models.Sum('expense'), models.Value(Decimal('0.00'))),
+            count=models.Count('transaction_id'),
+        )
+        with db_transaction.atomic():
+            existing.delete()
+            cls.objects.bulk_create([
+                cls(
+                    user_id=row['id_user'], family_id=row['id_user__family'], category_id=row['category'],
+                    month=row['month'], income=row['income_sum'], expense=row['expense_sum'],
+                    transaction_count=row['count']
+                )
+                for row in rows
+            ], batch_size=1000)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.category_id} - {self.month:%Y-%m}"
+
+
+@receiver(pre_save, sender=DataTransaction)
+def remember_rollup_state(sender, instance, **kwargs):
+    # Obiekt nie pochodzi z bazy (np. utworzony ręcznie z istniejącym kluczem) - stan trzeba doczytać
+    if instance.pk is None or hasattr(instance, '_rollup_state'):
+        return
+    old = sender.objects.filter(pk=instance.pk).first()
+    if old is not None:
+        instance._rollup_state = old._rollup_state
+        instance._family_row_state = old._family_row_state
+
+
+@receiver(post_save, sender=DataTransaction)
+def update_monthly_totals(sender, instance, created, **kwargs):
+    old_state = getattr(instance, '_rollup_state', None)
+    new_state = instance.rollup_state()
+    if old_state == new_state:
+        return
+    user_id, family_id, category_id, month, income, expense = new_state
+    if old_state is not None and old_state[:4] == new_state[:4]:
+        # Ten sam wiersz zestawienia - zmieniły się tylko kwoty
+        MonthlyCategoryTotals.apply(
+            user_id, family_id, category_id, month, income - old_state[4], expense - old_state[5], 0
+        )
+    else:
+        if old_state is not None:
+            old_user_id, old_family_id, old_category_id, old_month, old_income, old_expense = old_state
+            MonthlyCategoryTotals.apply(
+                old_user_id, old_family_id, old_category_id, old_month, -old_income, -old_expense, -1
+            )
+        MonthlyCategoryTotals.apply(user_id, family_id, category_id, month, income, expense, 1)
+    instance._rollup_state = new_state
+
+
+@receiver(post_delete, sender=DataTransaction)
+def subtract_monthly_totals(sender, instance, origin=None, **kwargs):
+    # Usuwanie kategorii, użytkownika lub rodziny kasuje kaskadowo także wiersze zestawienia -
+    # bez tego każda z usuwanych transakcji kosztowałaby osobny UPDATE. Usunięcia przez QuerySet
+    # transakcji odejmuje zbiorczo DataTransactionQuerySet.delete().
+    origin_model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    if origin_model in (Categories, User, Family) or isinstance(origin, DataTransactionQuerySet):
+        return
+    user_id, family_id, category_id, month, income, expense = (
+        getattr(instance, '_rollup_state', None) or instance.rollup_state()
+    )
+    MonthlyCategoryTotals.apply(user_id, family_id, category_id, month, -income, -expense, -1)
 
 
 class FamilyTransactionView(models.Model):
     """
     Model do wyświetlania transakcji dla całej rodziny zalogowanego użytkownika.
     Obejmuje transakcje wszystkich członków rodziny wraz z informacjami o użytkowniku i jego roli.
+
+    Tabela podsumowująca: jeden wiersz na każdą DataTransaction z przepisanymi danymi użytkownika
+    i nazwą kategorii, więc listy rodziny czyta się z jednej tabeli bez złączeń. Wiersze są
+    aktualizowane sygnałami przy zapisie transakcji, użytkownika i kategorii; usuwane razem
+    z transakcją (CASCADE). Ścieżki z bulk_create muszą wywołać add_missing().
     """
-    transaction_id = models.AutoField(primary_key=True)
+    transaction = models.OneToOneField(
+        DataTransaction, on_delete=models.CASCADE, primary_key=True, db_column='transaction_id',
+        related_name='family_row'
+    )
     user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='family_transactions')
     user_name = models.CharField(max_length=100)
     user_surname = models.CharField(max_length=100)
     user_role = models.CharField(max_length=10)
     transaction_date = models.DateField()
-    income = models.FloatField(blank=True, null=True)
-    expense = models.FloatField(blank=True, null=True)
+    income = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    expense = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
     description = models.CharField(blank=True, null=True, max_length=255)
     category = models.CharField(blank=True, null=True, max_length=255)
     transaction_type = models.CharField(blank=True, null=True, max_length=255)
-    family_id = models.UUIDField()
+    family = models.ForeignKey('Family', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    direction = models.CharField(max_length=7, choices=DIRECTION_CHOICES, default='expense')
 
     class Meta:
-        managed = False  # Nie tworzymy fizycznej tabeli - to będzie widok lub query
         db_table = 'family_transaction_view'
+        indexes = [
+            models.Index(fields=['family', 'transaction_date', 'transaction'], name='ftv_family_date_idx'),
+            models.Index(fields=['family', 'direction', 'transaction_date'], name='ftv_family_direction_date_idx'),
+            models.Index(fields=['user', 'transaction_date', 'transaction'], name='ftv_user_date_idx'),
+        ]
+
+    @classmethod
+    def from_transaction(cls, transaction):
+        """Buduje wiersz tabeli na podstawie transakcji (wymaga załadowanych id_user i category)"""
+        user = transaction.id_user
+        return cls(
+            transaction=transaction,
+            user=user,
+            user_name=user.name,
+            user_surname=user.surname,
+            user_role=user.role,
+            transaction_date=transaction.transaction_date,
+            income=to_money(transaction.income) if transaction.income is not None else None,
+            expense=to_money(transaction.expense) if transaction.expense is not None else None,
+            description=transaction.description,
+            category=transaction.category.category_name if transaction.category_id else None,
+            transaction_type=transaction.transaction_type,
+            family_id=transaction.family_id,
+            amount=transaction.amount,
+            direction=transaction.direction,
+        )
+
+    # Pola tabeli i odpowiadające im wyrażenia po stronie DataTransaction (add_missing)
+    TRANSACTION_SOURCE_FIELDS = {
+        'transaction': 'transaction_id',
+        'user': 'id_user',
+        'user_name': 'id_user__name',
+        'user_surname': 'id_user__surname',
+        'user_role': 'id_user__role',
+        'transaction_date': 'transaction_date',
+        'income': 'income',
+        'expense': 'expense',
+        'description': 'description',
+        'category': 'category__category_name',
+        'transaction_type': 'transaction_type',
+        'family': 'family',
+        'amount': 'amount',
+        'direction': 'direction',
+    }
+
+    @classmethod
+    def add_missing(cls, transactions):
+        """
+        Dopisuje wiersze dla transakcji zapisanych z pominięciem sygnałów (np. bulk_create).
+        Jedno zapytanie INSERT ... SELECT - transakcje nie są wczytywane do Pythona.
+        """
+        missing = transactions.filter(family_row__isnull=True).order_by().values_list(
+            *cls.TRANSACTION_SOURCE_FIELDS.values()
+        )
+        select_sql, params = missing.query.sql_with_params()
+        connection = connections[missing.db]
+        quote_name = connection.ops.quote_name
+        columns = ', '.join(quote_name(cls._meta.get_field(name).column) for name in cls.TRANSACTION_SOURCE_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {quote_name(cls._meta.db_table)} ({columns}) {select_sql}", params)
 
     @classmethod
     def get_family_transactions(cls, user):
@@ -59,21 +377,12 @@ class FamilyTransactionView(models.Model):
         """
         if user.family_id is None:
             # Użytkownik nie należy do rodziny - zwracamy tylko jego transakcje
-            return DataTransaction.objects.filter(id_user=user).select_related('id_user')
-
-        # Użytkownik należy do rodziny - pobieramy transakcje wszystkich członków rodziny
-        family_members = User.objects.filter(family_id=user.family_id)
-
-        transactions = DataTransaction.objects.filter(
-            id_user__in=family_members
-        ).select_related('id_user').annotate(
-            user_name=models.F('id_user__name'),
-            user_surname=models.F('id_user__surname'),
-            user_role=models.F('id_user__role'),
-            family_id=models.F('id_user__family_id')
-        ).order_by('-transaction_date', 'id_user__name')
+            transactions = cls.objects.filter(user=user)
+        else:
+            # Użytkownik należy do rodziny - pobieramy transakcje wszystkich członków rodziny
+            transactions = cls.objects.filter(family_id=user.family_id)
 
-        return transactions
+        return transactions.order_by('-transaction_date', '-transaction_id')
 
     @classmethod
     def get_family_transactions_with_details(cls, user):
@@ -86,42 +395,30 @@ class FamilyTransactionView(models.Model):
         Returns:
             Lista słowników z pełnymi informacjami o transakcjach
         """
-        if user.family_id is None:
-            # Użytkownik nie należy do rodziny
-            transactions = DataTransaction.objects.filter(
-                id_user=user
-            ).select_related('id_user')
-        else:
-            # Użytkownik należy do rodziny
-            family_members = User.objects.filter(family_id=user.family_id)
-            transactions = DataTransaction.objects.filter(
-                id_user__in=family_members
-            ).select_related('id_user')
-
-        result = []
-        for transaction in transactions:
-            result.append({
-                'transaction_id': transaction.transaction_id,
-                'user_id': transaction.id_user.user_id,
-                'user_name': transaction.id_user.name,
-                'user_surname': transaction.id_user.surname,
-                'user_role': transaction.id_user.role,
-                'transaction_date': transaction.transaction_date,
-                'income': transaction.income,
-                'expense': transaction.expense,
-                'description': transaction.description,
-                'category': transaction.category,
-                'transaction_type': transaction.transaction_type,
-                'family_id': transaction.id_user.family_id,
-                'is_current_user': transaction.id_user == user
-            })
-
-        return sorted(result, key=lambda x: (x['transaction_date'], x['user_name']), reverse=True)
+        rows = cls.get_family_transactions(user).order_by('-transaction_date', '-user_name').values(
+            'transaction_id', 'user_id', 'user_name', 'user_surname', 'user_role', 'transaction_date',
+            'income', 'expense', 'amount', 'direction', 'description', 'category', 'transaction_type', 'family_id'
+        )
+        return [{**row, 'is_current_user': row['user_id'] == user.user_id} for row in rows]
 
     def __str__(self):
         return f"{self.user_name} {self.user_surname} - {self.transaction_date} - {self.category}"
 
 
+@receiver(post_save, sender=DataTransaction)
+def update_family_transaction_row(sender, instance, created, **kwargs):
+    new_state = instance.family_row_state()
+    # Zapis bez zmian w przepisywanych polach (np. ponowny zapis formularza) nie dotyka tabeli rodziny
+    if not created and getattr(instance, '_family_row_state', None) == new_state:
+        return
+    row = FamilyTransactionView.from_transaction(instance)
+    if created:
+        row.save(force_insert=True)
+    else:
+        row.save()
+    instance._family_row_state = new_state
+
+
 def generate_access_code(length=6):
     characters = string.ascii_uppercase + string.digits
     return ''.join(random.choices(characters, k=length))
@@ -194,6 +491,19 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.name} {self.surname}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Rodzina z bazy - przy zmianie rodziny trzeba unieważnić też listy poprzedniej (family_cache)
+        instance._loaded_family_id = instance.__dict__.get('family_id')
+        return instance
+
+    def set_family(self, family):
+        """Przypisuje użytkownika do rodziny (lub ją usuwa dla None) razem z jego transakcjami"""
+        self.family = family
+        self.save()
+        DataTransaction.objects.filter(id_user=self).update(family=family)
+
     class Meta:
         db_table = 'USERS'
 
@@ -233,6 +543,43 @@ class JoinRequest(models.Model):
     def __str__(self):
         return f"{self.user} -> {self.family} ({'accepted' if self.accepted else 'pending'})"
 
+DEFAULT_CATEGORIES = [
+    # Przychody (income)
+    ('Wynagrodzenie', 'income'),
+    ('Prezenty', 'income'),
+    ('Zwrot podatku', 'income'),
+    ('Dochód pasywny', 'income'),
+    ('Inne przychody', 'income'),
+
+    # Wydatki (expense)
+    ('Zakupy', 'expense'),
+    ('Transport', 'expense'),
+    ('Czynsz', 'expense'),
+    ('Media', 'expense'),
+    ('Abonamenty', 'expense'),
+    ('Zdrowie', 'expense'),
+    ('Edukacja', 'expense'),
+    ('Rozrywka', 'expense'),
+    ('Restauracje', 'expense'),
+    ('Podróże', 'expense'),
+    ('Inne wydatki', 'expense'),
+]
+
+
+class CategoriesQuerySet(models.QuerySet):
+
+    def owned_by(self, user):
+        """Kategorie, które użytkownik może edytować: całej jego rodziny albo (bez rodziny) tylko jego"""
+        if user.family_id:
+            return self.filter(user_id__family_id=user.family_id)
+        return self.filter(user_id=user)
+
+    def visible_to(self, user):
+        """Kategorie do wyboru przez użytkownika: własne (rodziny) oraz wspólne kategorie domyślne"""
+        owner = models.Q(user_id__family_id=user.family_id) if user.family_id else models.Q(user_id=user)
+        return self.filter(owner | models.Q(user_id__isnull=True))
+
+
 class Categories(models.Model):
 
     ROLE_CHOICES = (
@@ -241,43 +588,66 @@ class Categories(models.Model):
     )
     category_name = models.CharField(default= None, max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
-    user_id = models.ForeignKey('User', on_delete=models.CASCADE)
+    # Puste dla wspólnych kategorii domyślnych (settings.SHARED_DEFAULT_CATEGORIES)
+    user_id = models.ForeignKey('User', on_delete=models.CASCADE, null=True, blank=True)
     category_type = models.CharField(max_length=10, choices=ROLE_CHOICES)
 
+    objects = CategoriesQuerySet.as_manager()
+
     class Meta:
         db_table = 'CATEGORIES'
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'category_name', 'category_type'], name='category_user_name_type_uniq'),
+        ]
 
     def __str__(self):
         return self.category_name
 
+    @property
+    def is_shared(self):
+        return self.user_id_id is None
+
+    @classmethod
+    def create_shared_defaults(cls):
+        """Tworzy brakujące wspólne kategorie domyślne (bez właściciela), widoczne dla wszystkich użytkowników"""
+        existing = set(cls.objects.filter(user_id__isnull=True).values_list('category_name', 'category_type'))
+        cls.objects.bulk_create([
+            cls(category_name=name, category_type=category_type)
+            for name, category_type in DEFAULT_CATEGORIES
+            if (name, category_type) not in existing
+        ])
+
+
+# Pola użytkownika przepisywane do FamilyTransactionView
+FAMILY_ROW_USER_FIELDS = {'name', 'surname', 'role', 'family'}
+
+
 @receiver(post_save, sender=User)
-def create_default_categories_for_user(sender, instance, created, **kwargs):
-    if created:
-        default_categories = [
-            # Przychody (income)
-            ('Wynagrodzenie', 'income'),
-            ('Prezenty', 'income'),
-            ('Zwrot podatku', 'income'),
-            ('Dochód pasywny', 'income'),
-            ('Inne przychody', 'income'),
-
-            # Wydatki (expense)
-            ('Zakupy', 'expense'),
-            ('Transport', 'expense'),
-            ('Czynsz', 'expense'),
-            ('Media', 'expense'),
-            ('Abonamenty', 'expense'),
-            ('Zdrowie', 'expense'),
-            ('Edukacja', 'expense'),
-            ('Rozrywka', 'expense'),
-            ('Restauracje', 'expense'),
-            ('Podróże', 'expense'),
-            ('Inne wydatki', 'expense'),
-        ]
+def update_family_rows_for_user(sender, instance, created, update_fields=None, **kwargs):
+    # Np. zapis last_login przy logowaniu nie zmienia danych widocznych w tabeli rodziny
+    if created or (update_fields and not FAMILY_ROW_USER_FIELDS.intersection(update_fields)):
+        return
+    FamilyTransactionView.objects.filter(user=instance).update(
+        user_name=instance.name,
+        user_surname=instance.surname,
+        user_role=instance.role,
+        family_id=instance.family_id,
+    )
+    MonthlyCategoryTotals.objects.filter(user=instance).update(family_id=instance.family_id)
 
-        for name, type_ in default_categories:
-            Categories.objects.get_or_create(
-                category_name=name,
-                category_type=type_,
-                user_id=instance
-            )
\ No newline at end of file
+
+@receiver(post_save, sender=Categories)
+def update_family_rows_for_category(sender, instance, created, **kwargs):
+    if not created:
+        FamilyTransactionView.objects.filter(transaction__category=instance).update(
+            category=instance.category_name
+        )
+
+@receiver(post_save, sender=User)
+def create_default_categories_for_user(sender, instance, created, **kwargs):
+    # Przy wspólnych kategoriach domyślnych rejestracja nie zapisuje żadnych kategorii
+    if created and not settings.SHARED_DEFAULT_CATEGORIES:
+        Categories.objects.bulk_create([
+            Categories(category_name=name, category_type=category_type, user_id=instance)
+            for name, category_type in DEFAULT_CATEGORIES
+        ], ignore_conflicts=True)
@@ -0,0 +1,97 @@
+from datetime import date
+
+from django.db.models import Q
+
+
+class KeysetPage:
+    """Jedna strona wyników wraz z kursorami do stron sąsiednich"""
+
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class TransactionKeysetPaginator:
+    """
+    Stronicowanie transakcji po kluczu (transaction_date, transaction_id).
+
+    Zamiast OFFSET kolejna strona jest wyznaczana warunkiem "starsze niż ostatni
+    wiersz poprzedniej strony", więc koszt pobrania strony nie zależy od tego,
+    jak daleko w historii się ona znajduje. Kursor ma postać "RRRR-MM-DD_id".
+    """
+
+    def __init__(self, queryset, page_size):
+        self.queryset = queryset
+        self.page_size = page_size
+
+    @staticmethod
+    def make_cursor(transaction):
+        return f"{transaction.transaction_date.isoformat()}_{transaction.transaction_id}"
+
+    @staticmethod
+    def parse_cursor(cursor):
+        """Zwraca (data, id) z kursora lub None, jeśli kursor jest nieprawidłowy"""
+        if not cursor:
+            return None
+        try:
+            date_part, id_part = cursor.split('_', 1)
+            return date.fromisoformat(date_part), int(id_part)
+        except ValueError:
+            return None
+
+    def get_page(self, after=None, before=None):
+        """Zwraca stronę po kursorze `after` (starsze) lub przed kursorem `before` (nowsze)"""
+        before_key = self.parse_cursor(before)
+        if before_key:
+            return self._page_before(before_key)
+        return self._page_after(self.parse_cursor(after))
+
+    def iter_items(self):
+        """Zwraca kolejno wszystkie wiersze, strona po stronie - w pamięci jest naraz tylko jedna strona"""
+        page = self._page_after(None)
+        while True:
+            yield from page
+            if not page.has_next:
+                return
+            page = self._page_after(self.parse_cursor(page.next_cursor))
+
+    def _page_after(self, key):
+        queryset = self.queryset
+        if key:
+            key_date, key_id = key
+            queryset = queryset.filter(
+                Q(transaction_date__lt=key_date) | Q(transaction_date=key_date, transaction_id__lt=key_id)
+            )
+        rows = list(queryset.order_by('-transaction_date', '-transaction_id')[:self.page_size + 1])
+        items = rows[:self.page_size]
+        next_cursor = self.make_cursor(items[-1]) if len(rows) > self.page_size else None
+        previous_cursor = self.make_cursor(items[0]) if key and items else None
+        return KeysetPage(items, next_cursor, previous_cursor)
+
+    def _page_before(self, key):
+        key_date, key_id = key
+        queryset = self.queryset.filter(
+            Q(transaction_date__gt=key_date) | Q(transaction_date=key_date, transaction_id__gt=key_id)
+        )
+        rows = list(queryset.order_by('transaction_date', 'transaction_id')[:self.page_size + 1])
+        if not rows:
+            return self._page_after(None)
+        items = list(reversed(rows[:self.page_size]))
+        previous_cursor = self.make_cursor(items[0]) if len(rows) > self.page_size else None
+        next_cursor = self.make_cursor(items[-1])
+        return KeysetPage(items, next_cursor, previous_cursor)
@@ -1,3 +1,710 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import metrics
+from .forms import AddTransaction
+from .instrumentation import view_stats
+from .models import (
+    DEFAULT_CATEGORIES, Categories, DataTransaction, Family, FamilyTransactionView, MonthlyCategoryTotals, User,
+    create_default_categories_for_user,
+)
+from .pagination import TransactionKeysetPaginator
+
+
+class FamilyTransactionsQueryCountTest(TestCase):
+    """Liczba zapytań widoku transakcji rodziny nie może rosnąć z liczbą członków rodziny"""
+
+    def setUp(self):
+        self.family = Family.objects.create(family_name='Testowa')
+        self.owner = self._create_member('owner')
+        self.family.created_by = self.owner
+        self.family.save()
+
+    def _create_member(self, login):
+        user = User.objects.create_user(
+            login, f'{login}@example.com', 'Haslo123!',
+            name=login, surname='Test', role='adult', family=self.family
+        )
+        category = Categories.objects.filter(user_id=user, category_type='expense').first()
+        for day in range(1, 4):
+            DataTransaction.objects.create(
+                id_user=user,
+                transaction_date=date(2025, 1, day),
+                expense=10.0 * day,
+                category=category,
+                transaction_type='one off'
+            )
+        return user
+
+    def _count_queries(self):
+        self.client.force_login(self.owner)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('filtered-family-transactions'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_count_does_not_depend_on_family_size(self):
+        self._create_member('member1')
+        small_family_queries, _ = self._count_queries()
+
+        for number in range(2, 6):
+            self._create_member(f'member{number}')
+        large_family_queries, response = self._count_queries()
+
+        self.assertEqual(small_family_queries, large_family_queries)
+        self.assertEqual(len(response.context['family_summary']), 6)
+
+    def test_member_summary_totals(self):
+        member = self._create_member('member1')
+        _, response = self._count_queries()
+
+        summary = {row['user_name']: row for row in response.context['family_summary']}
+        self.assertEqual(summary[member.name]['total_expense'], 60.0)
+        self.assertEqual(summary[member.name]['total_balance'], -60.0)
+        self.assertEqual(response.context['total_expense'], 120.0)
+
+
+class FamilyTransactionViewAddMissingTest(TestCase):
+    """add_missing() uzupełnia tabelę transakcji rodziny po zapisach z pominięciem sygnałów"""
+
+    def setUp(self):
+        family = Family.objects.create(family_name='Testowa')
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'Haslo123!', name='Jan', surname='Test', role='adult', family=family
+        )
+        self.category = Categories.objects.filter(user_id=self.user, category_type='expense').first()
+
+    def _bulk_create(self, days):
+        rows = [
+            DataTransaction(
+                id_user=self.user, family=self.user.family, transaction_date=date(2025, 1, day),
+                expense='12.34', category=self.category, transaction_type='one off', description=f'Dzień {day}'
+            )
+            for day in days
+        ]
+        for row in rows:
+            row.sync_amount()
+        DataTransaction.objects.bulk_create(rows)
+
+    def test_adds_only_missing_rows_in_one_query(self):
+        DataTransaction.objects.create(
+            id_user=self.user, transaction_date=date(2025, 1, 1), expense='5.00',
+            category=self.category, transaction_type='one off'
+        )
+        self._bulk_create([2, 3])
+        self.assertEqual(FamilyTransactionView.objects.count(), 1)
+
+        with self.assertNumQueries(1):
+            FamilyTransactionView.add_missing(DataTransaction.objects.filter(id_user=self.user))
+
+        self.assertEqual(FamilyTransactionView.objects.count(), 3)
+        fields = list(FamilyTransactionView.TRANSACTION_SOURCE_FIELDS)
+        for transaction in DataTransaction.objects.select_related('id_user', 'category'):
+            expected = FamilyTransactionView.from_transaction(transaction)
+            row = FamilyTransactionView.objects.get(transaction=transaction)
+            for field in fields:
+                attribute = FamilyTransactionView._meta.get_field(field).attname
+                self.assertEqual(getattr(row, attribute), getattr(expected, attribute), field)
+
+    def test_respects_queryset_filter(self):
+        self._bulk_create([2, 3])
+        FamilyTransactionView.add_missing(DataTransaction.objects.filter(transaction_date=date(2025, 1, 2)))
+        self.assertEqual(
+            list(FamilyTransactionView.objects.values_list('transaction_date', flat=True)), [date(2025, 1, 2)]
+        )
+
+
+class MonthlyCategoryTotalsDeleteTest(TestCase):
+    """Kaskadowe usuwanie transakcji nie może aktualizować zestawienia osobno dla każdej transakcji"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'Haslo123!', name='Jan', surname='Test', role='adult'
+        )
+
+    def _category_with_transactions(self, name, count):
+        category = Categories.objects.create(category_name=name, category_type='expense', user_id=self.user)
+        for day in range(count):
+            DataTransaction.objects.create(
+                id_user=self.user, transaction_date=date(2025, 1 + day % 12, 1), expense='10.00',
+                category=category, transaction_type='one off'
+            )
+        return category
+
+    def _count_delete_queries(self, category):
+        with CaptureQueriesContext(connection) as queries:
+            category.delete()
+        return len(queries)
+
+    def test_category_delete_query_count_does_not_depend_on_transactions(self):
+        small = self._count_delete_queries(self._category_with_transactions('Mała', 2))
+        large = self._count_delete_queries(self._category_with_transactions('Duża', 30))
+
+        self.assertEqual(small, large)
+        self.assertFalse(MonthlyCategoryTotals.objects.exists())
+
+    def test_single_transaction_delete_updates_totals(self):
+        category = self._category_with_transactions('Testowa', 2)
+        DataTransaction.objects.filter(category=category).first().delete()
+
+        row = MonthlyCategoryTotals.objects.get(category=category, month=date(2025, 1, 1))
+        self.assertEqual(row.transaction_count, 0)
+        self.assertEqual(row.expense, 0)
+
+    def test_queryset_delete_updates_each_totals_row_once(self):
+        category = self._category_with_transactions('Testowa', 24)
+        other = self._category_with_transactions('Inna', 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            DataTransaction.objects.filter(category=category, transaction_date__month__lte=6).delete()
+        updates = [
+            query for query in queries
+            if query['sql'].startswith('UPDATE') and MonthlyCategoryTotals._meta.db_table in query['sql']
+        ]
+        # 12 usuniętych transakcji w 6 miesiącach - jedna aktualizacja na miesiąc
+        self.assertEqual(len(updates), 6)
+
+        rows = MonthlyCategoryTotals.objects.filter(category=category).order_by('month')
+        self.assertEqual([row.transaction_count for row in rows], [0] * 6 + [2] * 6)
+        self.assertEqual([row.expense for row in rows], [0] * 6 + [Decimal('20.00')] * 6)
+        self.assertEqual(
+            sum(MonthlyCategoryTotals.objects.filter(category=other).values_list('transaction_count', flat=True)), 3
+        )
+
+    def test_monthly_report_ignores_out_of_range_year(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('monthly-report'), {'year': '99999'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['year'], date.today().year)
+
+
+class TransactionKeysetPaginatorTest(TestCase):
+    """Kursory after/before przechodzą przez wszystkie transakcje bez powtórzeń, także przy tych samych datach"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'Haslo123!', name='Jan', surname='Test', role='adult'
+        )
+        category = Categories.objects.filter(user_id=self.user, category_type='expense').first()
+        # Po trzy transakcje z tego samego dnia - strony kończą się w środku grupy o równej dacie
+        for day in (1, 1, 1, 2, 2, 2, 3):
+            DataTransaction.objects.create(
+                id_user=self.user, transaction_date=date(2025, 1, day), expense='10.00',
+                category=category, transaction_type='one off'
+            )
+        self.expected = list(
+            DataTransaction.objects.order_by('-transaction_date', '-transaction_id').values_list('pk', flat=True)
+        )
+        self.paginator = TransactionKeysetPaginator(DataTransaction.objects.all(), page_size=3)
+
+    @staticmethod
+    def _ids(page):
+        return [transaction.pk for transaction in page]
+
+    def test_after_cursor_walks_all_pages(self):
+        page = self.paginator.get_page()
+        self.assertFalse(page.has_previous)
+        pages = [self._ids(page)]
+        while page.has_next:
+            page = self.paginator.get_page(after=page.next_cursor)
+            self.assertTrue(page.has_previous)
+            pages.append(self._ids(page))
+
+        self.assertEqual(pages, [self.expected[0:3], self.expected[3:6], self.expected[6:7]])
+        self.assertEqual([transaction.pk for transaction in self.paginator.iter_items()], self.expected)
+
+    def test_before_cursor_returns_previous_page(self):
+        second = self.paginator.get_page(after=self.paginator.get_page().next_cursor)
+        last = self.paginator.get_page(after=second.next_cursor)
+
+        self.assertEqual(self._ids(self.paginator.get_page(before=last.previous_cursor)), self.expected[3:6])
+        first = self.paginator.get_page(before=second.previous_cursor)
+        self.assertEqual(self._ids(first), self.expected[0:3])
+        self.assertFalse(first.has_previous)
+        self.assertEqual(first.next_cursor, self.paginator.get_page().next_cursor)
+
+    def test_boundaries_and_invalid_cursors(self):
+        newest = DataTransaction.objects.get(pk=self.expected[0])
+        # Przed najnowszą transakcją nie ma wierszy - zwracana jest pierwsza strona
+        self.assertEqual(
+            self._ids(self.paginator.get_page(before=TransactionKeysetPaginator.make_cursor(newest))),
+            self.expected[0:3]
+        )
+        oldest = DataTransaction.objects.get(pk=self.expected[-1])
+        page = self.paginator.get_page(after=TransactionKeysetPaginator.make_cursor(oldest))
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_next)
+        for cursor in ('abc', '2025-13-01_1', '2025-01-01_x'):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self._ids(self.paginator.get_page(after=cursor)), self.expected[0:3])
+
+    def test_view_counts_transactions_in_the_totals_query(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('filtered-transactions'), {'page_size': 3})
+        self.assertEqual(response.context['transaction_count'], 7)
+        self.assertEqual(response.context['total_expense'], 70)
+        self.assertEqual(len(response.context['transactions']), 3)
+        self.assertFalse(any('COUNT(' in query['sql'] and 'SUM(' not in query['sql'] for query in queries))
+
+
+class UserSetFamilyTest(TestCase):
+    """set_family() przenosi do nowej rodziny także transakcje użytkownika i ich wiersze tabeli rodziny"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'Haslo123!', name='Jan', surname='Test', role='adult'
+        )
+        category = Categories.objects.filter(user_id=self.user, category_type='expense').first()
+        for day in (1, 2):
+            DataTransaction.objects.create(
+                id_user=self.user, transaction_date=date(2025, 1, day), expense='10.00',
+                category=category, transaction_type='one off'
+            )
+
+    def _family_ids(self):
+        return (
+            set(DataTransaction.objects.filter(id_user=self.user).values_list('family_id', flat=True)),
+            set(FamilyTransactionView.objects.filter(user=self.user).values_list('family_id', flat=True)),
+            set(MonthlyCategoryTotals.objects.filter(user=self.user).values_list('family_id', flat=True)),
+        )
+
+    def test_join_and_leave_move_transactions(self):
+        self.assertEqual(self._family_ids(), ({None}, {None}, {None}))
+        family = Family.objects.create(family_name='Testowa')
+
+        self.user.set_family(family)
+        self.assertEqual(self._family_ids(), ({family.pk}, {family.pk}, {family.pk}))
+        self.assertEqual(FamilyTransactionView.get_family_transactions(self.user).count(), 2)
+
+        self.user.set_family(None)
+        self.assertEqual(self._family_ids(), ({None}, {None}, {None}))
+        self.assertFalse(FamilyTransactionView.objects.filter(family=family).exists())
+
+
+class FamilyTransactionRowSyncTest(TestCase):
+    """Wiersz tabeli rodziny odpowiada transakcji po każdej edycji, a zapis bez zmian go nie dotyka"""
+
+    def setUp(self):
+        family = Family.objects.create(family_name='Testowa')
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'Haslo123!', name='Jan', surname='Test', role='adult', family=family
+        )
+        self.categories = list(Categories.objects.filter(user_id=self.user, category_type='expense')[:2])
+        self.transaction = DataTransaction.objects.create(
+            id_user=self.user, transaction_date=date(2025, 1, 1), expense='10.00',
+            category=self.categories[0], transaction_type='one off', description='Zakupy'
+        )
+
+    def _assert_row_matches(self, transaction_id):
+        transaction = DataTransaction.objects.select_related('id_user', 'category').get(pk=transaction_id)
+        expected = FamilyTransactionView.from_transaction(transaction)
+        row = FamilyTransactionView.objects.get(pk=transaction_id)
+        for field in FamilyTransactionView.TRANSACTION_SOURCE_FIELDS:
+            attribute = FamilyTransactionView._meta.get_field(field).attname
+            self.assertEqual(getattr(row, attribute), getattr(expected, attribute), field)
+
+    def _family_table_queries(self, transaction):
+        with CaptureQueriesContext(connection) as queries:
+            transaction.save()
+        return [query['sql'] for query in queries if FamilyTransactionView._meta.db_table in query['sql']]
+
+    def test_edits_update_the_row(self):
+        edits = [
+            ('description', 'Apteka'), ('transaction_date', date(2025, 1, 15)), ('expense', Decimal('12.34')),
+            ('category', self.categories[1]), ('transaction_type', 'recurring'),
+        ]
+        for field, value in edits:
+            with self.subTest(field=field):
+                transaction = DataTransaction.objects.get(pk=self.transaction.pk)
+                setattr(transaction, field, value)
+                self.assertTrue(self._family_table_queries(transaction))
+                self._assert_row_matches(transaction.pk)
+
+        # Zmiana wydatku na przychód przepisuje też kwotę ze znakiem i kierunek
+        transaction = DataTransaction.objects.get(pk=self.transaction.pk)
+        transaction.expense, transaction.income = None, Decimal('50.00')
+        transaction.save()
+        self._assert_row_matches(transaction.pk)
+        self.assertEqual(FamilyTransactionView.objects.get(pk=transaction.pk).direction, 'income')
+
+    def test_save_without_changes_skips_the_row(self):
+        transaction = DataTransaction.objects.get(pk=self.transaction.pk)
+        self.assertEqual(self._family_table_queries(transaction), [])
+        self.assertEqual(self._family_table_queries(self.transaction), [])
+
+        # Obiekt spoza bazy z tym samym kluczem - stan jest doczytywany w pre_save
+        copy = DataTransaction(
+            pk=self.transaction.pk, id_user=self.user, transaction_date=date(2025, 1, 1), expense='10.00',
+            category=self.categories[0], transaction_type='one off', description='Zakupy'
+        )
+        self.assertEqual(self._family_table_queries(copy), [])
+
+    def test_delete_removes_the_row(self):
+        other = DataTransaction.objects.create(
+            id_user=self.user, transaction_date=date(2025, 1, 2), expense='5.00',
+            category=self.categories[1], transaction_type='one off'
+        )
+        DataTransaction.objects.get(pk=self.transaction.pk).delete()
+
+        self.assertEqual(list(FamilyTransactionView.objects.values_list('pk', flat=True)), [other.pk])
+        self._assert_row_matches(other.pk)
+
+
+class DefaultCategoriesTest(TestCase):
+    """Kategorie domyślne: własne kopie wstawiane jednym INSERT albo wspólny zestaw bez właściciela"""
+
+    def _create_user(self, login, family=None):
+        return User.objects.create_user(
+            login, f'{login}@example.com', 'Haslo123!', name=login, surname='Test', role='adult', family=family
+        )
+
+    def test_own_defaults_are_inserted_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            user = self._create_user('owner')
+        inserts = [
+            query for query in queries
+            if query['sql'].startswith('INSERT') and Categories._meta.db_table in query['sql']
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Categories.objects.filter(user_id=user).count(), len(DEFAULT_CATEGORIES))
+
+        # Ponowne wywołanie (np. powtórzony sygnał) pomija istniejące kategorie zamiast zgłaszać błąd
+        create_default_categories_for_user(sender=User, instance=user, created=True)
+        self.assertEqual(Categories.objects.filter(user_id=user).count(), len(DEFAULT_CATEGORIES))
+
+    @override_settings(SHARED_DEFAULT_CATEGORIES=True)
+    def test_shared_defaults_are_visible_to_everyone(self):
+        Categories.create_shared_defaults()
+        Categories.create_shared_defaults()
+        self.assertEqual(Categories.objects.filter(user_id__isnull=True).count(), len(DEFAULT_CATEGORIES))
+
+        family = Family.objects.create(family_name='Testowa')
+        owner = self._create_user('owner', family)
+        member = self._create_user('member', family)
+        stranger = self._create_user('stranger')
+        self.assertFalse(Categories.objects.filter(user_id__isnull=False).exists())
+
+        own = Categories.objects.create(category_name='Kieszonkowe', category_type='expense', user_id=owner)
+        Categories.objects.create(category_name='Hobby', category_type='expense', user_id=stranger)
+
+        visible = Categories.objects.visible_to(member)
+        self.assertEqual(visible.count(), len(DEFAULT_CATEGORIES) + 1)
+        self.assertIn(own, visible)
+        self.assertEqual(list(Categories.objects.owned_by(member)), [own])
+        self.assertEqual(
+            set(Categories.objects.visible_to(stranger).values_list('category_name', flat=True)),
+            {name for name, _ in DEFAULT_CATEGORIES} | {'Hobby'}
+        )
+
+
+class FamilyCacheInvalidationTest(TestCase):
+    """Listy wyboru formularza z pamięci podręcznej zmieniają się razem z kategoriami i rodziną"""
+
+    def setUp(self):
+        self.family = Family.objects.create(family_name='Testowa')
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'Haslo123!', name='Jan', surname='Test', role='adult', family=self.family
+        )
+
+    def _choices(self, field):
+        form = AddTransaction(user=User.objects.get(pk=self.user.pk), form_type='expense')
+        return [label for value, label in form.fields[field].choices if value]
+
+    def test_category_add_and_delete_refresh_choices(self):
+        self.assertNotIn('Kieszonkowe', self._choices('category'))
+
+        with CaptureQueriesContext(connection) as queries:
+            category = Categories.objects.create(
+                category_name='Kieszonkowe', category_type='expense', user_id=self.user
+            )
+        # Rodzina właściciela jest znana z wczytanego obiektu - bez zapytania o użytkownika
+        self.assertFalse([query for query in queries if User._meta.db_table in query['sql']])
+        self.assertIn('Kieszonkowe', self._choices('category'))
+
+        Categories.objects.get(pk=category.pk).delete()
+        self.assertNotIn('Kieszonkowe', self._choices('category'))
+
+    def test_family_change_refreshes_choices(self):
+        other_family = Family.objects.create(family_name='Inna')
+        member = User.objects.create_user(
+            'member', 'member@example.com', 'Haslo123!', name='Ewa', surname='Test', role='adult',
+            family=other_family
+        )
+        Categories.objects.create(category_name='Hobby', category_type='expense', user_id=member)
+        self.assertEqual(self._choices('id_user'), ['Jan Test'])
+        self.assertNotIn('Hobby', self._choices('category'))
+
+        User.objects.get(pk=self.user.pk).set_family(other_family)
+        self.assertEqual(self._choices('id_user'), ['Ewa Test', 'Jan Test'])
+        self.assertIn('Hobby', self._choices('category'))
+
+        User.objects.get(pk=self.user.pk).set_family(None)
+        self.assertEqual(self._choices('id_user'), ['Jan Test'])
+        self.assertNotIn('Hobby', self._choices('category'))
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class TransactionExportTest(TestCase):
+    """Eksport zawiera wszystkie transakcje użytkownika lub rodziny i nic spoza nich"""
+
+    def setUp(self):
+        family = Family.objects.create(family_name='Testowa')
+        other_family = Family.objects.create(family_name='Inna')
+        self.owner = self._create_user(
+            'owner', 'Jan', family, [('10.00', 'Chleb'), ('20.00', 'Bilet'), ('30.00', 'Kino')]
+        )
+        self.member = self._create_user('member', 'Ewa', family, [('5.50', 'Lody')])
+        self.stranger = self._create_user('stranger', 'Obcy', other_family, [('99.00', 'Obce')])
+        self.client.force_login(self.owner)
+
+    def _create_user(self, login, name, family, expenses):
+        user = User.objects.create_user(
+            login, f'{login}@example.com', 'Haslo123!', name=name, surname='Test', role='adult', family=family
+        )
+        category = Categories.objects.filter(user_id=user, category_type='expense').first()
+        for day, (amount, description) in enumerate(expenses, start=1):
+            DataTransaction.objects.create(
+                id_user=user, transaction_date=date(2025, 1, day), expense=amount,
+                category=category, transaction_type='one off', description=description
+            )
+        return user
+
+    def _csv_rows(self, **params):
+        response = self.client.get(reverse('export-transactions'), params)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('\ufeff'))
+        return list(csv.reader(io.StringIO(content[1:]), delimiter=';'))
+
+    def test_csv_contains_only_own_transactions(self):
+        rows = self._csv_rows()
+        self.assertEqual(rows[0], ['Data', 'Imię', 'Nazwisko', 'Kategoria', 'Rodzaj', 'Kwota', 'Opis', 'Typ'])
+        self.assertEqual(
+            [(row[0], row[1], row[4], row[5], row[6]) for row in rows[1:]],
+            [
+                ('2025-01-03', 'Jan', 'Wydatek', '-30.00', 'Kino'),
+                ('2025-01-02', 'Jan', 'Wydatek', '-20.00', 'Bilet'),
+                ('2025-01-01', 'Jan', 'Wydatek', '-10.00', 'Chleb'),
+            ]
+        )
+
+    def test_family_scope_excludes_other_families(self):
+        rows = self._csv_rows(scope='family')
+        self.assertEqual(sorted(row[6] for row in rows[1:]), ['Bilet', 'Chleb', 'Kino', 'Lody'])
+
+        rows = self._csv_rows(scope='family', user=str(self.member.pk))
+        self.assertEqual([row[6] for row in rows[1:]], ['Lody'])
+        # Identyfikator spoza rodziny nie daje dostępu do cudzych transakcji
+        rows = self._csv_rows(scope='family', user=str(self.stranger.pk))
+        self.assertEqual(rows[1:], [])
+
+    def test_xlsx_response(self):
+        from openpyxl import load_workbook
+
+        response = self.client.get(reverse('export-transactions'), {'format': 'xlsx', 'scope': 'family'})
+        self.assertEqual(
+            response['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+        self.assertIn('transakcje_rodzina_', response['Content-Disposition'])
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual(rows[0][0], 'Data')
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(sorted(row[5] for row in rows[1:]), [-30, -20, -10, -5.5])
+        self.assertNotIn('Obce', [row[6] for row in rows])
+
+
+class ViewStatsMiddlewareTest(TestCase):
+    """Middleware zapisuje liczbę zapytań SQL każdego żądania pod nazwą widoku"""
+
+    def setUp(self):
+        view_stats.reset()
+        self.addCleanup(view_stats.reset)
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'Haslo123!', name='Jan', surname='Test', role='adult'
+        )
+        self.client.force_login(self.user)
+
+    def test_counts_queries_of_each_request(self):
+        counts = []
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('filtered-transactions'))
+            counts.append(len(queries))
+        self.client.get('/nie-ma-takiego-adresu/')
+
+        snapshot = view_stats.snapshot()
+        self.assertEqual(list(snapshot), ['filtered-transactions'])
+        stats = snapshot['filtered-transactions']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['queries']['max'], max(counts))
+        self.assertEqual(stats['queries']['p50'], min(counts))
+        self.assertGreater(stats['total_ms']['max'], 0)
+        self.assertGreater(stats['response_bytes']['max'], 0)
+
+    @override_settings(VIEW_QUERY_BUDGET=1)
+    def test_logs_requests_over_the_query_budget(self):
+        with self.assertLogs('Budget_Application.instrumentation', 'WARNING') as logs:
+            self.client.get(reverse('filtered-transactions'))
+        self.assertIn('filtered-transactions', logs.output[0])
+
+    def test_report_is_only_for_staff(self):
+        self.assertEqual(self.client.get(reverse('view-stats')).status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('view-stats'))
+        self.assertEqual(response.status_code, 200)
+        # Odmowa dostępu też jest żądaniem widoku i trafia do statystyk
+        self.assertEqual(response.json()['views']['view-stats']['requests'], 1)
+        self.assertEqual(response.json()['window'], view_stats.window_size)
+
+
+class MetricsTest(TestCase):
+    """Wartości z osobnych wątków są sumowane przy odczycie, także po zakończeniu wątku"""
+
+    def _metric(self, metric):
+        self.addCleanup(metrics._registry.remove, metric)
+        return metric
+
+    @staticmethod
+    def _in_threads(function, count=4):
+        threads = [threading.Thread(target=function) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_counter_merges_thread_shards(self):
+        counter = self._metric(metrics.Counter('test_requests_total', 'Żądania', ('view',)))
+
+        def work():
+            for _ in range(100):
+                counter.inc('lista')
+            counter.inc('eksport', amount=2)
+
+        self._in_threads(work)
+        counter.inc('lista')
+        self.assertEqual(counter.collect(), {('lista',): 401, ('eksport',): 8})
+        # Zakończone wątki są przeniesione do wartości zbiorczych - drugi odczyt daje to samo
+        self.assertEqual(counter.collect(), {('lista',): 401, ('eksport',): 8})
+        self.assertEqual(counter.expose(), [
+            '# HELP test_requests_total Żądania',
+            '# TYPE test_requests_total counter',
+            'test_requests_total{view="eksport"} 8',
+            'test_requests_total{view="lista"} 401',
+        ])
+
+    def test_histogram_exposition(self):
+        histogram = self._metric(metrics.Histogram('test_duration_seconds', 'Czas', ('view',), buckets=(0.1, 1.0)))
+        self._in_threads(lambda: histogram.observe(0.05, 'a"b'), count=2)
+        histogram.observe(0.5, 'a"b')
+        histogram.observe(3.0, 'a"b')
+
+        self.assertEqual(histogram.expose(), [
+            '# HELP test_duration_seconds Czas',
+            '# TYPE test_duration_seconds histogram',
+            'test_duration_seconds_bucket{view="a\\"b",le="0.1"} 2',
+            'test_duration_seconds_bucket{view="a\\"b",le="1.0"} 3',
+            'test_duration_seconds_bucket{view="a\\"b",le="+Inf"} 4',
+            'test_duration_seconds_sum{view="a\\"b"} 3.6',
+            'test_duration_seconds_count{view="a\\"b"} 4',
+        ])
+
+
+class MetricsViewTest(TestCase):
+    """/metrics wymaga tokenu albo konta personelu - także gdy token nie jest ustawiony"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'Haslo123!', name='Jan', surname='Test', role='adult'
+        )
+
+    def _status(self, **headers):
+        return self.client.get(reverse('metrics'), headers=headers).status_code
+
+    @override_settings(METRICS_TOKEN='')
+    def test_denied_without_token_by_default(self):
+        self.assertEqual(self._status(), 403)
+        self.assertEqual(self._status(Authorization='Bearer '), 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self._status(), 403)
+
+    @override_settings(METRICS_TOKEN='sekret')
+    def test_token_must_match(self):
+        self.assertEqual(self._status(Authorization='Bearer inny'), 403)
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer sekret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        self.assertIn('# TYPE budget_http_requests_total counter', response.content.decode())
+
+    @override_settings(METRICS_TOKEN='')
+    def test_allowed_for_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.assertEqual(self._status(), 200)
+
+
+class ImportStatementTest(TestCase):
+    """Import wyciągu zapisuje transakcje paczkami i uzupełnia tabelę rodziny oraz zestawienie miesięczne"""
+
+    def setUp(self):
+        family = Family.objects.create(family_name='Testowa')
+        self.user = User.objects.create_user(
+            'owner', 'owner@example.com', 'Haslo123!', name='Jan', surname='Test', role='adult', family=family
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_csv_import_with_rules(self):
+        statement = self._write('wyciag.csv', (
+            "Data operacji;Kwota;Opis\n"
+            "2025-01-02;-12,50;BIEDRONKA 1\n"
+            "2025-01-03;-7,25;Bilet ZTM\n"
+            "2025-01-20;3000,00;Wynagrodzenie\n"
+            "2025-02-01;-40,00;Apteka\n"
+        ))
+        rules = self._write('reguly.json', json.dumps({'biedronka': 'Zakupy', 'ztm': 'Transport', 'apteka': 'Leki'}))
+
+        call_command('import_statement', statement, login='owner', rules=rules, chunk_size=2, stdout=io.StringIO())
+
+        transactions = DataTransaction.objects.filter(id_user=self.user).select_related('category')
+        self.assertEqual(
+            sorted((t.transaction_date.isoformat(), t.amount, t.category.category_name) for t in transactions),
+            [
+                ('2025-01-02', Decimal('-12.50'), 'Zakupy'),
+                ('2025-01-03', Decimal('-7.25'), 'Transport'),
+                ('2025-01-20', Decimal('3000.00'), 'Inne przychody'),
+                ('2025-02-01', Decimal('-40.00'), 'Leki'),
+            ]
+        )
+        # Brakująca kategoria z reguł jest tworzona raz, jako kategoria użytkownika
+        self.assertEqual(Categories.objects.filter(category_name='Leki', user_id=self.user).count(), 1)
+        self.assertEqual(FamilyTransactionView.objects.filter(family=self.user.family).count(), 4)
+        totals = {
+            (row.category.category_name, row.month.month): (row.income, row.expense, row.transaction_count)
+            for row in MonthlyCategoryTotals.objects.filter(user=self.user).select_related('category')
+        }
+        self.assertEqual(totals[('Zakupy', 1)], (Decimal('0.00'), Decimal('12.50'), 1))
+        self.assertEqual(totals[('Inne przychody', 1)], (Decimal('3000.00'), Decimal('0.00'), 1))
+        self.assertEqual(totals[('Leki', 2)], (Decimal('0.00'), Decimal('40.00'), 1))
@@ -15,6 +15,8 @@ urlpatterns = [
     path('transactions/filter/', filtered_transactions, name='filtered-transactions'),
     path('transactions/family/filter/', views.filtered_family_transactions, name='filtered-family-transactions'),
     path('transactions/edit/<int:transaction_id>/', views.edit_transaction, name='edit-transaction'),
+    path('transactions/monthly/', views.monthly_report, name='monthly-report'),
+    path('transactions/export/', views.export_transactions, name='export-transactions'),
 
     # ==================== UŻYTKOWNICY ====================
     path('user/<str:login>/', views.user_detail_view, name='user_detail'),
@@ -58,4 +60,7 @@ urlpatterns = [
     path("add_category/<str:type>", views.add_category, name="add_category"),
     # =====================PRZELICZANIE WALUT =============
     path('currency-converter/', views.currency_converter, name='currency_converter'),
+    # ==================== STATYSTYKI WIDOKÓW ====================
+    path('stats/views/', views.view_stats_report, name='view-stats'),
+    path('metrics', views.metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -6,20 +6,26 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import PasswordChangeForm, PasswordResetForm
 from django.contrib.auth.views import PasswordResetView
 from django.core.mail import send_mail
-from django.http import HttpResponseForbidden, JsonResponse
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-import requests
 
 # Python standard library imports
-from datetime import datetime
+from datetime import MAXYEAR, MINYEAR, date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import chain
+import hmac
 import json
+import tempfile
 
 # Local imports
+from exchange_rates import rate_cache
+from money import from_minor_units, to_minor_units
+from report_export import EXPORT_FORMATS, iter_csv, write_xlsx
 from .forms import (
     FamilyForm,
     KidForm,
@@ -31,10 +37,14 @@ from .forms import (
     JoinRequestForm,
     UserForm, AddTransaction, AddCategory
 )
-from .models import DataTransaction, User, Family, FamilyInvitation, JoinRequest, generate_access_code, FamilyTransactionView, Categories
+from .models import DataTransaction, User, Family, FamilyInvitation, JoinRequest, generate_access_code, FamilyTransactionView, Categories, MonthlyCategoryTotals, to_money
+from . import family_cache, metrics
+from .instrumentation import view_stats
+from .pagination import TransactionKeysetPaginator
 from .services import UserService
 from datetime import datetime
-from django.db.models import Q
+from django.db.models import Case, Count, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
 import uuid
 
 
@@ -56,14 +66,16 @@ class TransactionFilterService:
         return None
 
     @staticmethod
-    def build_transaction_query(user, transaction_type=None, category=None, date_from=None, date_to=None):
-        """Buduje zapytanie dla filtrowania transakcji użytkownika"""
-        query = Q(id_user=user)
+    def build_transaction_query(user, transaction_type=None, category=None, date_from=None, date_to=None,
+                                family=False):
+        """Buduje zapytanie dla filtrowania transakcji użytkownika (lub całej jego rodziny, gdy family=True)"""
+        if family and user.family_id:
+            query = Q(family_id=user.family_id)
+        else:
+            query = Q(id_user=user)
 
-        if transaction_type == 'income':
-            query &= Q(income__isnull=False) & Q(income__gt=0)
-        elif transaction_type == 'expense':
-            query &= Q(expense__isnull=False) & Q(expense__gt=0)
+        if transaction_type in ('income', 'expense'):
+            query &= Q(direction=transaction_type)
 
         if category:
             # Zmiana: filtrowanie po nazwie kategorii zamiast po ID
@@ -80,29 +92,96 @@ class TransactionFilterService:
         return query
 
     @staticmethod
-    def calculate_totals(transactions):
-        """Oblicza sumy przychodów, wydatków i bilans"""
-        total_income = sum(float(t.income or 0) for t in transactions)
-        total_expense = sum(float(t.expense or 0) for t in transactions)
+    def convert_totals(transactions, currency, base_currency='PLN'):
+        """Przelicza sumy transakcji na wybraną walutę po kursach z dnia każdej transakcji"""
+        rows = list(transactions.values_list('transaction_date', 'amount'))
+        dates = [row[0] for row in rows]
+        amounts = rate_cache.convert_many([row[1] for row in rows], base_currency, currency, dates)
+        # Przeliczone kwoty są zaokrąglone do groszy, więc sumujemy je dokładnie jako liczby całkowite
+        minor_units = to_minor_units(amounts)
+        total_income = from_minor_units(minor_units[minor_units > 0].sum())
+        total_expense = from_minor_units(-minor_units[minor_units < 0].sum())
         return {
             'total_income': total_income,
             'total_expense': total_expense,
             'total_balance': total_income - total_expense
         }
 
+    @staticmethod
+    def calculate_totals(transactions):
+        """
+        Oblicza sumy przychodów, wydatków, bilans i liczbę transakcji jednym zapytaniem
+        agregującym w bazie
+        """
+        totals = transactions.aggregate(
+            total_income=Coalesce(Sum('amount', filter=Q(direction='income')), Value(Decimal('0.00'))),
+            total_expense=-Coalesce(Sum('amount', filter=Q(direction='expense')), Value(Decimal('0.00'))),
+            transaction_count=Count('transaction_id'),
+        )
+        transaction_count = totals.pop('transaction_count')
+        # SQLite liczy sumy DECIMAL jako float - zaokrąglamy do groszy, MySQL zwraca je dokładnie
+        totals = {key: to_money(value) for key, value in totals.items()}
+        totals['total_balance'] = totals['total_income'] - totals['total_expense']
+        totals['transaction_count'] = transaction_count
+        return totals
+
+    @staticmethod
+    def calculate_totals_by_user(transactions, user_field='id_user'):
+        """Oblicza sumy przychodów, wydatków i bilans osobno dla każdego użytkownika (jedno zapytanie GROUP BY)"""
+        rows = transactions.order_by().values(user_field).annotate(
+            total_income=Coalesce(Sum('amount', filter=Q(direction='income')), Value(Decimal('0.00'))),
+            total_expense=-Coalesce(Sum('amount', filter=Q(direction='expense')), Value(Decimal('0.00'))),
+        )
+        return {
+            row[user_field]: {
+                'total_income': to_money(row['total_income']),
+                'total_expense': to_money(row['total_expense']),
+                'total_balance': to_money(row['total_income'] - row['total_expense']),
+            }
+            for row in rows
+        }
+
+
+def paginate_transactions(request, transactions):
+    """Zwraca stronę transakcji (stronicowanie po kluczu) oraz linki do stron sąsiednich"""
+    try:
+        page_size = int(request.GET.get('page_size', settings.TRANSACTIONS_PAGE_SIZE))
+    except ValueError:
+        page_size = settings.TRANSACTIONS_PAGE_SIZE
+    page_size = min(max(page_size, 1), settings.TRANSACTIONS_MAX_PAGE_SIZE)
+
+    paginator = TransactionKeysetPaginator(transactions, page_size)
+    page = paginator.get_page(after=request.GET.get('after'), before=request.GET.get('before'))
+
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    next_url = previous_url = None
+    if page.has_next:
+        params['after'] = page.next_cursor
+        next_url = '?' + params.urlencode()
+        params.pop('after')
+    if page.has_previous:
+        params['before'] = page.previous_cursor
+        previous_url = '?' + params.urlencode()
+
+    return page, {
+        'page_size': page_size,
+        'next_page_url': next_url,
+        'previous_page_url': previous_url,
+    }
+
 
 # === SECTION: USER & FAMILY TRANSACTION VIEWS ===
-def get_unique_categories(user=None):
-    """Zwraca listę unikalnych nazw kategorii transakcji dla danego użytkownika"""
-    if user:
-        categories = DataTransaction.objects.filter(
-            id_user__family=user.family
-        ).select_related('category').values('category__category_name').distinct().order_by('category__category_name')
-    else:
-        categories = DataTransaction.objects.select_related('category').values(
-            'category__category_name').distinct().order_by('category__category_name')
+def get_unique_categories(user):
+    """
+    Zwraca posortowaną listę unikalnych nazw kategorii dla danego użytkownika.
 
-    return [cat['category__category_name'] for cat in categories if cat['category__category_name'] is not None]
+    Nazwy pochodzą z tabeli Categories (kategorie rodziny i wspólne) przez pamięć podręczną
+    rodziny, a nie z DISTINCT po wszystkich transakcjach - koszt nie zależy od liczby transakcji.
+    """
+    names = {category['category_name'] for category in family_cache.get_categories(user)}
+    return sorted(name for name in names if name)
 
 
 @login_required
@@ -116,24 +195,45 @@ def filtered_transactions(request):
     date_from = request.GET.get('date_from', '')
     date_to = request.GET.get('date_to', '')
     transaction_type = request.GET.get('type', '')
+    currency = request.GET.get('currency', '').upper()
 
     # Budowanie zapytania przy użyciu serwisu
     query = TransactionFilterService.build_transaction_query(
         request.user, transaction_type, selected_category, date_from, date_to
     )
 
-    transactions = DataTransaction.objects.filter(query).order_by('-transaction_date')
+    transactions = DataTransaction.objects.filter(query).select_related('category')
     totals = TransactionFilterService.calculate_totals(transactions)
+    page, page_context = paginate_transactions(request, transactions)
+
+    # Opcjonalne przeliczenie sum na inną walutę (po kursach z dat transakcji)
+    converted_totals = None
+    currency_error = None
+    if currency and currency != 'PLN':
+        try:
+            converted_totals = TransactionFilterService.convert_totals(transactions, currency)
+        except Exception as e:
+            currency_error = str(e)
+
+    # Lista walut tylko z pamięci podręcznej - wyświetlenie strony nie czeka na API kursów
+    currencies = rate_cache.get_supported_currencies(cached_only=True)
+    if currency and currency != 'PLN' and currency not in currencies:
+        currencies = {**currencies, currency: currency}
 
     context = {
         'user': request.user,
         'user_id': request.user.user_id,
-        'transactions': transactions,
+        'transactions': page,
         'categories': get_unique_categories(request.user),  # Dodaj parametr user
         'selected_category': selected_category,
         'date_from': date_from,
         'date_to': date_to,
         'transaction_type': transaction_type,
+        'currency': currency,
+        'currencies': currencies,
+        'converted_totals': converted_totals,
+        'currency_error': currency_error,
+        **page_context,
         **totals
     }
 
@@ -163,19 +263,17 @@ def filtered_family_transactions(request):
 
     # Aplikowanie filtrów
     if selected_category:
-        filtered_transactions = filtered_transactions.filter(category__category_name=selected_category)
+        filtered_transactions = filtered_transactions.filter(category=selected_category)
 
     if selected_user:
         try:
             selected_user_uuid = uuid.UUID(selected_user)
-            filtered_transactions = filtered_transactions.filter(id_user__user_id=selected_user_uuid)
+            filtered_transactions = filtered_transactions.filter(user_id=selected_user_uuid)
         except (ValueError, TypeError):
             pass
 
-    if transaction_type == 'expense':
-        filtered_transactions = filtered_transactions.filter(expense__isnull=False, expense__gt=0)
-    elif transaction_type == 'income':
-        filtered_transactions = filtered_transactions.filter(income__isnull=False, income__gt=0)
+    if transaction_type in ('income', 'expense'):
+        filtered_transactions = filtered_transactions.filter(direction=transaction_type)
 
     # Filtrowanie dat
     date_from_obj = TransactionFilterService.parse_date(date_from)
@@ -186,31 +284,22 @@ def filtered_family_transactions(request):
     if date_to_obj:
         filtered_transactions = filtered_transactions.filter(transaction_date__lte=date_to_obj)
 
-    transactions = filtered_transactions.order_by('-transaction_date')
+    transactions = filtered_transactions
 
-    # Pobieranie danych pomocniczych
-    family_members = User.objects.filter(family_id=user.family_id)
+    categories = get_unique_categories(user)
 
-    # ZMIANA: Prawidłowe pobieranie nazw kategorii
-    categories = DataTransaction.objects.filter(
-        id_user__in=family_members
-    ).select_related('category').values_list('category__category_name', flat=True).distinct().order_by(
-        'category__category_name')
-    categories = [cat for cat in categories if cat]
+    family_members_info = family_cache.get_members(user)
 
-    family_members_info = User.objects.filter(family_id=user.family_id).values(
-        'user_id', 'name', 'surname', 'role'
-    ).order_by('name', 'surname')
-
-    # Obliczanie sum finansowych
+    # Obliczanie sum finansowych (po całym przefiltrowanym zbiorze, nie tylko bieżącej stronie)
     totals = TransactionFilterService.calculate_totals(transactions)
+    page, page_context = paginate_transactions(request, transactions)
 
-    # Podsumowanie według członków rodziny
+    # Podsumowanie według członków rodziny - jedno zapytanie GROUP BY niezależnie od liczby członków
+    totals_by_member = TransactionFilterService.calculate_totals_by_user(transactions, user_field='user')
     family_summary = []
     for member in family_members_info:
-        member_transactions = transactions.filter(id_user__user_id=member['user_id'])
-        if member_transactions.exists():
-            member_totals = TransactionFilterService.calculate_totals(member_transactions)
+        member_totals = totals_by_member.get(member['user_id'])
+        if member_totals:
             family_summary.append({
                 'user_name': member['name'],
                 'user_surname': member['surname'],
@@ -221,9 +310,7 @@ def filtered_family_transactions(request):
     context = {
         'user': user,
         'family_name': user.family.family_name if user.family else None,
-        'transactions': transactions,
-        'expenses_only': transactions.filter(expense__isnull=False, expense__gt=0),
-        'incomes_only': transactions.filter(income__isnull=False, income__gt=0),
+        'transactions': page,
         'categories': categories,
         'family_members': family_members_info,
         'family_summary': family_summary,
@@ -232,12 +319,151 @@ def filtered_family_transactions(request):
         'selected_type': transaction_type,
         'date_from': date_from,
         'date_to': date_to,
+        **page_context,
         **totals
     }
 
     return render(request, 'filtered_family_transactions.html', context)
 
 
+EXPORT_HEADER = ['Data', 'Imię', 'Nazwisko', 'Kategoria', 'Rodzaj', 'Kwota', 'Opis', 'Typ']
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def iter_export_rows(transactions):
+    """Zwraca wiersze eksportu, pobierając transakcje stronami po kluczu (stała pamięć także w MySQL)"""
+    transactions = transactions.select_related('category', 'id_user').only(
+        'transaction_id', 'transaction_date', 'amount', 'direction', 'description', 'transaction_type',
+        'category__category_name', 'id_user__name', 'id_user__surname'
+    )
+    for transaction in TransactionKeysetPaginator(transactions, settings.EXPORT_CHUNK_SIZE).iter_items():
+        yield [
+            transaction.transaction_date,
+            transaction.id_user.name,
+            transaction.id_user.surname,
+            transaction.category.category_name,
+            'Przychód' if transaction.direction == 'income' else 'Wydatek',
+            transaction.amount,
+            transaction.description or '',
+            transaction.transaction_type or '',
+        ]
+
+
+@login_required
+def export_transactions(request):
+    """
+    Eksport przefiltrowanych transakcji użytkownika (lub rodziny przy ?scope=family) do CSV albo XLSX.
+    Przyjmuje te same parametry filtrów co listy transakcji oraz ?format=csv|xlsx.
+    """
+    user = request.user
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        file_format = 'csv'
+    family = request.GET.get('scope') == 'family' and user.family_id is not None
+
+    query = TransactionFilterService.build_transaction_query(
+        user, request.GET.get('type', ''), request.GET.get('category', ''),
+        request.GET.get('date_from', ''), request.GET.get('date_to', ''), family=family
+    )
+    if family and request.GET.get('user'):
+        try:
+            query &= Q(id_user=uuid.UUID(request.GET['user']))
+        except ValueError:
+            pass
+
+    rows = iter_export_rows(DataTransaction.objects.filter(query))
+    if file_format == 'csv':
+        # Wiersze są wysyłane od razu, w miarę pobierania kolejnych stron z bazy (BOM dla Excela)
+        response = StreamingHttpResponse(
+            chain(['\ufeff'], iter_csv(rows, EXPORT_HEADER)), content_type=EXPORT_CONTENT_TYPES['csv']
+        )
+    else:
+        # XLSX to archiwum ZIP, które powstaje dopiero po zapisaniu wszystkich wierszy. openpyxl w trybie
+        # write-only zrzuca je na bieżąco do pliku tymczasowego, więc pamięć nie rośnie z liczbą wierszy
+        output = tempfile.TemporaryFile()
+        write_xlsx(rows, output, EXPORT_HEADER)
+        output.seek(0)
+        response = FileResponse(output, content_type=EXPORT_CONTENT_TYPES['xlsx'])
+
+    filename = f"transakcje{'_rodzina' if family else ''}_{date.today().isoformat()}.{file_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def view_stats_report(request):
+    """Statystyki widoków (liczba zapytań SQL, czasy, rozmiar odpowiedzi) - tylko dla personelu"""
+    if not request.user.is_staff:
+        return HttpResponseForbidden("Brak uprawnień")
+    return JsonResponse({
+        'window': view_stats.window_size,
+        'views': view_stats.snapshot(),
+    }, json_dumps_params={'indent': 2})
+
+
+def metrics_view(request):
+    """
+    Metryki w formacie Prometheusa - tylko z nagłówkiem Authorization: Bearer <METRICS_TOKEN>
+    albo dla zalogowanego personelu. Bez ustawionego tokenu dostęp ma wyłącznie personel.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    token_ok = bool(token) and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode())
+    if not (token_ok or request.user.is_staff):
+        return HttpResponseForbidden("Brak uprawnień")
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@login_required
+def monthly_report(request):
+    """Zestawienie miesięczne wydatków lub przychodów według kategorii (z tabeli MonthlyCategoryTotals)"""
+    user = request.user
+    transaction_type = 'income' if request.GET.get('type') == 'income' else 'expense'
+    try:
+        year = int(request.GET.get('year', ''))
+        # Rok spoza zakresu dat (np. 99999) kończyłby się błędem przy filtrowaniu po month__year
+        if not MINYEAR <= year <= MAXYEAR:
+            raise ValueError
+    except ValueError:
+        year = datetime.now().year
+
+    # Rodzina widzi zestawienie wszystkich członków, użytkownik bez rodziny - tylko swoje
+    if user.family_id:
+        monthly_totals = MonthlyCategoryTotals.objects.filter(family_id=user.family_id)
+    else:
+        monthly_totals = MonthlyCategoryTotals.objects.filter(user=user)
+
+    rows = monthly_totals.filter(month__year=year).values('category__category_name', 'month').annotate(
+        total=Sum(transaction_type)
+    ).order_by()
+
+    by_category = {}
+    for row in rows:
+        months = by_category.setdefault(row['category__category_name'], [Decimal('0.00')] * 12)
+        months[row['month'].month - 1] += to_money(row['total'])
+
+    report = [
+        {'category': category, 'months': months, 'total': sum(months)}
+        for category, months in sorted(by_category.items())
+        if any(months)
+    ]
+
+    context = {
+        'user': user,
+        'year': year,
+        'years': [day.year for day in monthly_totals.dates('month', 'year', order='DESC')],
+        'transaction_type': transaction_type,
+        'report': report,
+        'month_totals': [sum(row['months'][index] for row in report) for index in range(12)],
+        'year_total': sum(row['total'] for row in report),
+        'hide_sidebar': True,
+    }
+    return render(request, 'monthly_report.html', context)
+
+
 @require_http_methods(["POST"])
 def edit_transaction(request, transaction_id):
     try:
@@ -258,21 +484,24 @@ def edit_transaction(request, transaction_id):
         if not amount_str or amount_str.strip() == '':
             return JsonResponse({'success': False, 'error': 'Kwota jest wymagana!'})
         try:
-            amount = float(amount_str.replace(',', '.'))
+            amount = to_money(amount_str)
             if amount <= 0:
                 return JsonResponse({'success': False, 'error': 'Jeśli chcesz dodać wydatek, zrób to z poziomu "Typ transakcji".'})
-        except (ValueError, TypeError):
+        except (InvalidOperation, ValueError, TypeError):
             return JsonResponse({'success': False, 'error': 'Nieprawidłowa kwota!'})
 
         # Pobierz obiekt kategorii
         category_obj = None
         if category_name:
-            try:
-                category_obj = Categories.objects.get(
-                    category_name=category_name,
-                    user_id__family=request.user.family
-                )
-            except Categories.DoesNotExist:
+            # Ta sama nazwa może należeć do kilku członków rodziny - wybieramy kategorię zgodnego typu,
+            # a spośród nich własną kategorię użytkownika, jeśli jest
+            category_obj = Categories.objects.visible_to(request.user).filter(
+                category_name=category_name
+            ).order_by(
+                Case(When(category_type=transaction_type, then=Value(0)), default=Value(1)),
+                Case(When(user_id=request.user, then=Value(0)), default=Value(1))
+            ).first()
+            if category_obj is None:
                 return JsonResponse({'success': False, 'error': 'Wybrana kategoria nie istnieje'})
 
         # Aktualizuj transakcję
@@ -388,8 +617,7 @@ def create_family(request):
             family.created_by = request.user
             family.save()
 
-            request.user.family = family
-            request.user.save()
+            request.user.set_family(family)
 
             return render(request, "users_test/success.html", {"family": family})
     else:
@@ -568,8 +796,7 @@ def join_family_view(request):
                 elif invitation.family.family_name != family_name:
                     messages.error(request, "Nazwa rodziny nie zgadza się z zaproszeniem.")
                 else:
-                    request.user.family = invitation.family
-                    request.user.save()
+                    request.user.set_family(invitation.family)
                     invitation.accepted = True
                     invitation.save()
                     messages.success(request, f"Dołączyłeś do rodziny: {invitation.family.family_name}")
@@ -628,8 +855,7 @@ def view_join_requests(request):
             messages.error(request, "Nieprawidłowa prośba.")
         else:
             if action == 'accept':
-                join_request.user.family = join_request.family
-                join_request.user.save()
+                join_request.user.set_family(join_request.family)
                 join_request.accepted = True
                 join_request.save()
                 messages.success(request, f"{join_request.user} został przyjęty do Twojej rodziny.")
@@ -681,7 +907,9 @@ def add_category(request, type):
         # Usuwanie
         if 'delete_id' in request.POST:
             delete_id = request.POST.get('delete_id')
-            category_to_delete = get_object_or_404(Categories, pk=delete_id, user_id__family=request.user.family)
+            category_to_delete = get_object_or_404(
+                Categories.objects.owned_by(request.user).select_related('user_id'), pk=delete_id
+            )
             category_to_delete.delete()
             messages.success(request, 'Kategoria została usunięta.')
             return redirect('add_category', type=type)
@@ -689,11 +917,11 @@ def add_category(request, type):
         # Edycja
         elif 'id' in request.POST:
             edit_id = request.POST.get('id')
-            instance = get_object_or_404(Categories, pk=edit_id, user_id__family=request.user.family)
+            instance = get_object_or_404(Categories.objects.owned_by(request.user), pk=edit_id)
             edit_form = AddCategory(request.POST, instance=instance, user=request.user, form_type=type)
             if edit_form.is_valid():
                 category = edit_form.save(commit=False)
-                category.user_id_id = request.user.user_id
+                category.user_id = request.user
                 category.category_type = type
                 category.save()
                 messages.success(request, 'Kategoria została zaktualizowana.')
@@ -704,7 +932,7 @@ def add_category(request, type):
             form = AddCategory(request.POST, user=request.user, form_type=type)
             if form.is_valid():
                 category = form.save(commit=False)
-                category.user_id_id = request.user.user_id
+                category.user_id = request.user
                 category.category_type = type
                 category.save()
                 messages.success(request, 'Kategoria została dodana.')
@@ -712,10 +940,10 @@ def add_category(request, type):
 
     # GET z parametrem edit
     elif edit_id:
-        edytowana = get_object_or_404(Categories, pk=edit_id, user_id__family=request.user.family)
+        edytowana = get_object_or_404(Categories.objects.owned_by(request.user), pk=edit_id)
         edit_form = AddCategory(instance=edytowana, user=request.user, form_type=type)
 
-    kategorie = Categories.objects.filter(user_id__family=request.user.family).order_by('created_at')
+    kategorie = family_cache.get_categories(request.user)
 
     return render(request, 'add_category.html', {
         'form': form,
@@ -725,32 +953,6 @@ def add_category(request, type):
         'edit_id': int(edit_id) if edit_id else None,
     })
 
-def get_supported_currencies():
-    url = "https://api.frankfurter.app/currencies"
-    response = requests.get(url)
-    if response.status_code != 200:
-        raise Exception("Błąd pobierania walut.")
-    return response.json()
-
-
-def convert_currency(amount, from_currency, to_currency):
-    if from_currency == to_currency:
-        return amount
-
-    url = "https://api.frankfurter.app/latest"
-    params = {
-        "amount": amount,
-        "from": from_currency,
-        "to": to_currency
-    }
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        raise Exception("Błąd przeliczania waluty.")
-
-    data = response.json()
-    return data["rates"][to_currency]
-
-
 def currency_converter(request):
     result = None
     error = None
@@ -760,7 +962,7 @@ def currency_converter(request):
     amount = ''
 
     try:
-        currencies = get_supported_currencies()
+        currencies = rate_cache.get_supported_currencies()
     except Exception as e:
         error = str(e)
 
@@ -770,7 +972,7 @@ def currency_converter(request):
             from_currency = request.POST.get('from_currency') or "PLN"
             to_currency = request.POST.get('to_currency')
 
-            result = convert_currency(float(amount), from_currency, to_currency)
+            result = rate_cache.convert(float(amount), from_currency, to_currency)
         except Exception as e:
             error = str(e)
 
@@ -1,5 +1,6 @@
 
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -9,6 +10,12 @@ load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Katalog główny repozytorium z modułami aplikacji konsolowej (import wyciągów, kantor),
+# z których korzysta również aplikacja Django
+REPO_DIR = BASE_DIR.parent
+if str(REPO_DIR) not in sys.path:
+    sys.path.append(str(REPO_DIR))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -40,6 +47,8 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
 
 MIDDLEWARE = [
+    # Pierwszy, żeby doliczać także zapytania sesji i uwierzytelniania
+    'Budget_Application.instrumentation.ViewStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,7 +62,8 @@ ROOT_URLCONF = 'Budget_Project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates z pomiarem czasu renderowania (statystyki widoków)
+        'BACKEND': 'Budget_Application.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -86,6 +96,15 @@ DATABASES = {
     }
 }
 
+# DB_ENGINE=sqlite - lokalna baza SQLite zamiast MySQL (testy wydajności, praca bez serwera bazy)
+if os.getenv('DB_ENGINE', 'mysql') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -129,5 +148,44 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Domyślna liczba transakcji na stronie list transakcji (można zmienić parametrem ?page_size=)
+TRANSACTIONS_PAGE_SIZE = 50
+TRANSACTIONS_MAX_PAGE_SIZE = 500
+
+# Liczba transakcji pobieranych z bazy naraz przy eksporcie do CSV/XLSX
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Pamięć podręczna (m.in. listy kategorii i członków rodziny). Domyślnie w pamięci procesu;
+# przy kilku procesach serwera ustaw CACHE_DIR, żeby unieważnienia były widoczne we wszystkich.
+if os.getenv('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'budget-application',
+        }
+    }
+FAMILY_CACHE_TIMEOUT = int(os.getenv('FAMILY_CACHE_TIMEOUT', 60 * 60))
+
+# Wspólne kategorie domyślne (bez właściciela) zamiast kopii 16 kategorii dla każdego nowego użytkownika
+SHARED_DEFAULT_CATEGORIES = os.getenv('SHARED_DEFAULT_CATEGORIES', '0').lower() in ('1', 'true', 'yes')
+
+# Statystyki widoków (/stats/views/): liczba zapytań SQL i czasy z ostatnich VIEW_STATS_WINDOW żądań.
+# Żądania ponad budżet zapytań lub czasu (w ms) są logowane jako ostrzeżenia; 0 wyłącza dany budżet.
+VIEW_STATS_ENABLED = os.getenv('VIEW_STATS_ENABLED', '1').lower() in ('1', 'true', 'yes')
+VIEW_STATS_WINDOW = int(os.getenv('VIEW_STATS_WINDOW', 1000))
+VIEW_QUERY_BUDGET = int(os.getenv('VIEW_QUERY_BUDGET', 0))
+VIEW_LATENCY_BUDGET_MS = int(os.getenv('VIEW_LATENCY_BUDGET_MS', 0))
+
+# Endpoint /metrics (format Prometheusa): dostęp z nagłówkiem "Authorization: Bearer <token>" albo dla personelu;
+# bez tokenu metryki widzi tylko zalogowany personel
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'noreply@budgetapp.local'
\ No newline at end of file
@@ -1,47 +1,26 @@
-import requests
+from exchange_rates import rate_cache
 
 
 class Kantor:
     #Funkcja wyświetlania walut
     @staticmethod
     def convert_currency(amount, from_currency, to_currency):
+        # Kurs pochodzi z lokalnej tabeli kursów (odświeżanej po upływie TTL),
+        # więc kolejne przeliczenia nie wysyłają zapytań do API
+        return rate_cache.convert(amount, from_currency, to_currency)
 
-        if from_currency == to_currency:
-            return amount  # No conversion needed
 
-        url = f"https://api.frankfurter.app/latest"
-        params = {
-            "amount": amount,
-            "from": from_currency,
-            "to": to_currency
-        }
-
-        response = requests.get(url, params=params)
-        if response.status_code != 200:
-            raise Exception(f"Error fetching exchange rates: {response.status_code} {response.text}")
-
-        #print(response)
-        data = response.json()
-
-        #print(data)
-
-        if "rates" not in data or to_currency not in data["rates"]:
-            raise Exception("Currency not found in API response.")
-
-        return data["rates"][to_currency]
 
+    #przeliczanie całej kolumny kwot (np. historii transakcji) - jedna tabela kursów na (datę, walutę)
+    @staticmethod
+    def convert_many(amounts, from_currencies, to_currency, dates=None):
+        return rate_cache.convert_many(amounts, from_currencies, to_currency, dates)
 
 
     #funkcja wyświtlania obsługiwanych walut
     @staticmethod
     def get_supported_currencies():
-
-        url = "https://api.frankfurter.app/currencies"
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise Exception(f"Error fetching supported currencies: {response.status_code} {response.text}")
-
-        return response.json()
+        return rate_cache.get_supported_currencies()
 
 
     #MENU
@@ -1,8 +1,10 @@
 
 from email.policy import default
 
+import bank_import
 import budget_input
 import Kantor_przeliczanie_walut
+import report_export
 import users
 import openpyxl
 
@@ -21,6 +23,7 @@ def menu():
               "5. Historia Wydatków\n"
               "6. Zaplanuj budżet\n"
               "7. Zarządzanie użytkownikami\n"
+              "8. Import wyciągu bankowego (CSV/MT940)\n"
               "0. Wyjście z Aplikacji")
         choice = input("Wybierz opcję: ")
 
@@ -32,7 +35,7 @@ def menu():
         # elif choice == "3":
         #     print("Tu trzeba zrobić funkcję która będzie cyklicznie odejmować wydatki od budżetu użytkownika ")
         elif choice == "3":
-            print("Tu trzeba zrobić funkcje exportowania do pliku raportu z budżetem ")
+            report_export.export_from_cli()
         elif choice == "4":
             Kantor_przeliczanie_walut.Kantor.menu()
         elif choice == "5":
@@ -41,6 +44,8 @@ def menu():
             print("Koniec planowanie/wydawania/zarządzania \n")
         elif choice == "7":
            users.menu_users()
+        elif choice == "8":
+            bank_import.import_from_cli()
         elif choice == "0":
             "***Do ZoBaCzEnIA***"
             break
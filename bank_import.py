@@ -0,0 +1,244 @@
+import csv
+import json
+import re
+import time
+from datetime import datetime
+from itertools import islice
+
+import dummy_data
+from money import to_decimal
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Nazwy kolumn w eksporcie CSV banku -> pola wiersza wyciągu
+DEFAULT_CSV_COLUMNS = {
+    'date': 'Data operacji',
+    'amount': 'Kwota',
+    'description': 'Opis',
+}
+
+DATE_FORMATS = ['%Y-%m-%d', '%d-%m-%Y', '%d.%m.%Y', '%y%m%d']
+
+MT940_STATEMENT_LINE = re.compile(
+    r'^(?P<date>\d{6})(?P<entry_date>\d{4})?(?P<mark>R?[CD])(?P<funds_code>[A-Z])?(?P<amount>\d+(,\d*)?)'
+)
+MT940_SUBFIELD = re.compile(r'[~^<]\d{2}')
+# Kod operacji (np. 020) przed podpolami :86: - nie jest częścią opisu
+MT940_TRANSACTION_CODE = re.compile(r'^\d{3}(?=[~^<]\d{2})')
+
+
+def parse_amount(value):
+    """Zamienia kwoty zapisane jako '1 234,56', '-1234.56' albo '1.234,56' na dokładny Decimal"""
+    text = str(value).strip().replace('\xa0', '').replace(' ', '')
+    if ',' in text:
+        text = text.replace('.', '').replace(',', '.')
+    return to_decimal(text)
+
+
+def parse_date(value):
+    text = str(value).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Nieprawidłowa data: {value}")
+
+
+class CategoryMapper:
+    """
+    Przypisuje wierszowi wyciągu kategorię budżetu i typ transakcji.
+
+    Typ wynika ze znaku kwoty. Kategoria pochodzi z pierwszej reguły, której słowo
+    kluczowe występuje w opisie (bez rozróżniania wielkości liter), a w przeciwnym
+    razie jest to domyślna kategoria danego typu.
+    """
+
+    def __init__(self, rules=None, default_income='Inne przychody', default_expense='Inne wydatki'):
+        self.rules = [(keyword.lower(), category) for keyword, category in (rules or {}).items()]
+        self.default_income = default_income
+        self.default_expense = default_expense
+
+    def map(self, row):
+        transaction_type = 'income' if row['amount'] > 0 else 'expense'
+        description = (row.get('description') or '').lower()
+        category = self.default_income if transaction_type == 'income' else self.default_expense
+        for keyword, rule_category in self.rules:
+            if keyword in description:
+                category = rule_category
+                break
+        return {
+            'date': row['date'],
+            'amount': abs(row['amount']),
+            'type': transaction_type,
+            'description': row.get('description') or '',
+            'category': category,
+        }
+
+
+def load_mapping(file_path):
+    """
+    Wczytuje plik JSON z jednym obiektem o tekstowych kluczach i wartościach, np. reguły
+    kategorii ({"biedronka": "Zakupy"}) albo nazwy kolumn CSV ({"amount": "Kwota PLN"}).
+    """
+    with open(file_path, encoding='utf-8') as f:
+        try:
+            mapping = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Nieprawidłowy plik JSON {file_path}: {e}")
+    if not isinstance(mapping, dict) or not all(
+        isinstance(key, str) and isinstance(value, str) for key, value in mapping.items()
+    ):
+        raise ValueError(f"Plik {file_path} musi zawierać obiekt JSON z tekstowymi kluczami i wartościami")
+    return mapping
+
+
+def _chunked(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_csv_rows(file_path, columns=None, delimiter=';', encoding='utf-8-sig'):
+    """
+    Zwraca kolejne wiersze wyciągu z eksportu CSV banku, czytając plik linia po linii.
+    `columns` zastępuje część albo wszystkie nazwy z DEFAULT_CSV_COLUMNS.
+    """
+    unknown = set(columns or {}) - set(DEFAULT_CSV_COLUMNS)
+    if unknown:
+        raise ValueError(f"Nieznane pola kolumn: {', '.join(sorted(unknown))} (dozwolone: date, amount, description)")
+    columns = {**DEFAULT_CSV_COLUMNS, **(columns or {})}
+    with open(file_path, newline='', encoding=encoding) as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        missing = [name for field, name in columns.items() if field != 'description' and name not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Brak kolumn w pliku CSV: {', '.join(missing)}")
+        for line in reader:
+            amount = parse_amount(line[columns['amount']])
+            if amount == 0:
+                continue
+            yield {
+                'date': parse_date(line[columns['date']]),
+                'amount': amount,
+                'description': (line.get(columns['description']) or '').strip(),
+            }
+
+
+def iter_mt940_rows(file_path, encoding='utf-8'):
+    """Zwraca kolejne wiersze wyciągu z pliku MT940 (linie :61: z opisami z pól :86:)"""
+    current = None
+    description_lines = None
+
+    def finish():
+        if description_lines:
+            text = MT940_SUBFIELD.sub(' ', MT940_TRANSACTION_CODE.sub('', ''.join(description_lines)))
+            current['description'] = ' '.join(text.split())
+        return current
+
+    with open(file_path, encoding=encoding) as f:
+        for raw_line in f:
+            line = raw_line.rstrip('\r\n')
+            if line.startswith(':61:'):
+                if current:
+                    yield finish()
+                match = MT940_STATEMENT_LINE.match(line[4:])
+                if not match:
+                    raise ValueError(f"Nieprawidłowa linia :61: {line}")
+                amount = parse_amount(match.group('amount'))
+                # C - uznanie, D - obciążenie, RC/RD - storno
+                if match.group('mark') in ('D', 'RC'):
+                    amount = -amount
+                current = {'date': parse_date(match.group('date')), 'amount': amount, 'description': ''}
+                description_lines = None
+            elif line.startswith(':86:') and current:
+                description_lines = [line[4:]]
+            elif line.startswith(':') or line.startswith('-'):
+                if current:
+                    yield finish()
+                current = None
+                description_lines = None
+            elif description_lines is not None:
+                description_lines.append(line)
+    if current:
+        yield finish()
+
+
+def read_statement(file_path, file_format=None, chunk_size=DEFAULT_CHUNK_SIZE, mapper=None, **options):
+    """
+    Czyta wyciąg paczkami zmapowanych wierszy (słowniki z datą, kwotą, typem, opisem
+    i kategorią). W pamięci jest naraz tylko jedna paczka.
+    """
+    file_format = file_format or ('mt940' if file_path.lower().endswith(('.sta', '.mt940')) else 'csv')
+    if file_format == 'csv':
+        rows = iter_csv_rows(file_path, **options)
+    elif file_format == 'mt940':
+        rows = iter_mt940_rows(file_path, **options)
+    else:
+        raise ValueError(f"Nieobsługiwany format wyciągu: {file_format}")
+
+    mapper = mapper or CategoryMapper()
+    return _chunked((mapper.map(row) for row in rows), chunk_size)
+
+
+def import_statement(file_path, sink, file_format=None, chunk_size=DEFAULT_CHUNK_SIZE, mapper=None, **options):
+    """
+    Przekazuje wyciąg do `sink` (obiektu z metodą `write(rows)`), jeden zapis na paczkę.
+    Zwraca liczbę wierszy, czas i przepustowość.
+    """
+    started = time.perf_counter()
+    imported = 0
+    for chunk in read_statement(file_path, file_format, chunk_size, mapper, **options):
+        sink.write(chunk)
+        imported += len(chunk)
+    seconds = time.perf_counter() - started
+    return {
+        'rows': imported,
+        'seconds': seconds,
+        'rows_per_second': imported / seconds if seconds > 0 else 0.0,
+    }
+
+
+class BudgetManagerSink:
+    """Zapisuje importowane wiersze do rejestru `BudgetManager`, jeden zapis wsadowy na paczkę"""
+
+    def __init__(self, budget, user_id, frequency='Jednorazowy'):
+        self.budget = budget
+        self.user_id = user_id
+        self.frequency = frequency
+
+    def write(self, rows):
+        self.budget.add_transactions({
+            'type': row['type'],
+            'user_id': self.user_id,
+            'amount': row['amount'],
+            'date': row['date'].strftime("%d-%m-%Y"),
+            'description': row['description'],
+            'category': row['category'],
+            'frequency': self.frequency,
+        } for row in rows)
+
+
+def import_from_cli():
+    # Import lokalny: moduł jest używany także przez aplikację Django, która nie potrzebuje pandas
+    import budget_manager
+
+    file_path = input("Podaj ścieżkę do pliku z wyciągiem (CSV lub MT940): ").strip()
+    if not file_path:
+        return
+    rules_path = input("Plik z regułami kategorii (JSON, Enter - bez reguł): ").strip()
+    columns_path = ''
+    if not file_path.lower().endswith(('.sta', '.mt940')):
+        columns_path = input("Plik z nazwami kolumn CSV (JSON, Enter - domyślne): ").strip()
+    try:
+        mapper = CategoryMapper(load_mapping(rules_path) if rules_path else None)
+        options = {'columns': load_mapping(columns_path)} if columns_path else {}
+        budget = budget_manager.BudgetManager()
+        stats = import_statement(file_path, BudgetManagerSink(budget, dummy_data.user_id), mapper=mapper, **options)
+        print(f"Zaimportowano {stats['rows']} transakcji w {stats['seconds']:.2f} s "
+              f"({stats['rows_per_second']:.0f} wierszy/s)")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Błąd importu: {e}")
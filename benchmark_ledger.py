@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from perf_stats import RollingWindow, find_regressions, git_commit
+from seed_data import DEFAULT_END_DATE, TransactionGenerator, write_ledger
+
+
+DEFAULT_SIZES = '1000,10000,100000,1000000'
+DEFAULT_FORMATS = 'jsonl,xlsx'
+# Każdy zapis do arkusza wczytuje i zapisuje go w całości - przy 20 000 wierszy to już ok. 12 s na zapis
+DEFAULT_XLSX_MAX_ROWS = 20_000
+DEFAULT_BATCH_SIZE = 1000
+QUERY_DAYS = 90
+# Regresja: p95 (lub szczyt pamięci) wzrósł ponad tyle razy względem raportu bazowego...
+DEFAULT_MAX_SLOWDOWN = 1.25
+DEFAULT_MAX_MEMORY_GROWTH = 1.25
+# ...i o więcej niż szum pomiaru
+DEFAULT_MIN_DELTA_MS = 1.0
+MIN_DELTA_MB = 0.5
+
+
+def measure(operation, repeat):
+    """
+    Mierzy czas `repeat` wywołań `operation()`, a potem szczyt pamięci jeszcze jednego
+    wywołania przez tracemalloc. Śledzone wywołanie nie jest mierzone czasowo, bo
+    śledzenie kilkukrotnie spowalnia alokacje.
+    """
+    latency = RollingWindow(repeat)
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        latency.add((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'latency_ms': latency.summary(), 'runs': repeat, 'peak_mb': peak / 1024 / 1024}
+
+
+class LedgerBenchmark:
+    """
+    Buduje rejestr z `size` wygenerowanych wierszy i mierzy na nim operacje aplikacji
+    konsolowej: pojedyncze zapisy (`BudgetManager.add_expense`), zapisy wsadowe
+    (`add_transactions`) oraz zapytania `TransactionHistoryAnalyzer` o użytkownika
+    i zakres dat. Zapytania są mierzone na zimno (pusta pamięć podręczna, więc cały
+    rejestr jest parsowany) i na ciepło (z pamięci podręcznej).
+    """
+
+    def __init__(self, directory, file_format, size, users=4, seed=42):
+        # Import lokalny: moduły aplikacji konsolowej wczytują pandas
+        import budget_manager
+        import transaction_analyzer
+
+        self.budget_manager = budget_manager
+        self.transaction_analyzer = transaction_analyzer
+        self.file_path = os.path.join(directory, f'ledger-{size}.{file_format}')
+        self.size = size
+        generator = TransactionGenerator(seed)
+        self.owners = [generator.make_uuid() for _ in range(users)]
+        self.rows = generator.rows(self.owners, size)
+        self.user_id = self.owners[0]
+        self.end_date = DEFAULT_END_DATE.strftime("%d-%m-%Y")
+        self.start_date = (DEFAULT_END_DATE - timedelta(days=QUERY_DAYS)).strftime("%d-%m-%Y")
+
+    def build(self):
+        started = time.perf_counter()
+        write_ledger(self.file_path, self.rows)
+        return time.perf_counter() - started
+
+    def _analyzer(self, cache=None):
+        return self.transaction_analyzer.TransactionHistoryAnalyzer(
+            self.file_path, cache if cache else self.transaction_analyzer.LedgerCache()
+        )
+
+    def run(self, repeat, insert_repeat, batch_size):
+        results = {}
+        # Zapytania przed zapisami - każdy zapis zmienia plik i unieważnia pamięć podręczną
+        results['user_query_cold'] = measure(lambda: self._analyzer().get_user_transactions(self.user_id), repeat)
+        results['date_range_query_cold'] = measure(
+            lambda: self._analyzer().get_user_expenses_by_date(self.user_id, self.start_date, self.end_date), repeat
+        )
+        warm = self._analyzer()
+        warm.get_user_transactions(self.user_id)
+        results['user_query_warm'] = measure(lambda: warm.get_user_transactions(self.user_id), repeat)
+        results['date_range_query_warm'] = measure(
+            lambda: warm.get_user_expenses_by_date(self.user_id, self.start_date, self.end_date), repeat
+        )
+
+        budget = self.budget_manager.BudgetManager(self.file_path)
+        results['add_expense'] = measure(
+            lambda: budget.add_expense(self.user_id, 12.34, self.end_date, 'Benchmark', 'Zakupy', 'Jednorazowy'),
+            insert_repeat,
+        )
+        batch = [
+            {'type': 'expense', 'user_id': self.user_id, 'amount': 12.34, 'date': self.end_date,
+             'description': 'Benchmark', 'category': 'Zakupy', 'frequency': 'Jednorazowy'}
+            for _ in range(batch_size)
+        ]
+        results['add_transactions'] = measure(lambda: budget.add_transactions(batch), insert_repeat)
+        results['add_transactions']['rows_per_call'] = batch_size
+        return results
+
+
+def compare_reports(baseline, current, max_slowdown=DEFAULT_MAX_SLOWDOWN,
+                    max_memory_growth=DEFAULT_MAX_MEMORY_GROWTH, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Zwraca regresje `current` względem `baseline`: operacje, których p95 czasu albo
+    szczyt pamięci wzrosły ponad progi. Porównywane są tylko rejestry i operacje
+    obecne w obu raportach.
+    """
+    limits = {
+        'p95': (max_slowdown, min_delta_ms, "p95 {old:.2f} ms -> {new:.2f} ms"),
+        'peak_mb': (max_memory_growth, MIN_DELTA_MB, "pamięć {old:.1f} MB -> {new:.1f} MB"),
+    }
+    return find_regressions(_flatten(baseline), _flatten(current), limits)
+
+
+def _flatten(report):
+    return {
+        f"{file_format} {size} {name}": {'p95': operation['latency_ms']['p95'], 'peak_mb': operation['peak_mb']}
+        for file_format, sizes in report.get('results', {}).items()
+        for size, result in sizes.items()
+        for name, operation in result['operations'].items()
+    }
+
+
+def run_benchmarks(sizes, formats, repeat=5, insert_repeat=3, batch_size=DEFAULT_BATCH_SIZE,
+                   users=4, seed=42, xlsx_max_rows=DEFAULT_XLSX_MAX_ROWS, progress=print):
+    """
+    Uruchamia pomiary dla każdego formatu i rozmiaru, każdy rejestr w osobnym katalogu
+    tymczasowym, i zwraca raport jako słownik gotowy do zapisu w JSON.
+    """
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'settings': {'repeat': repeat, 'insert_repeat': insert_repeat, 'batch_size': batch_size,
+                     'users': users, 'seed': seed},
+        'results': {},
+        'skipped': [],
+    }
+    for file_format in formats:
+        for size in sizes:
+            if file_format == 'xlsx' and size > xlsx_max_rows:
+                report['skipped'].append(f'{file_format} {size}')
+                continue
+            with tempfile.TemporaryDirectory(prefix='budget-ledger-') as directory:
+                benchmark = LedgerBenchmark(directory, file_format, size, users, seed)
+                progress(f"{file_format} {size}: budowanie rejestru...")
+                build_seconds = benchmark.build()
+                progress(f"{file_format} {size}: pomiary...")
+                operations = benchmark.run(repeat, insert_repeat, batch_size)
+            report['results'].setdefault(file_format, {})[str(size)] = {
+                'build_seconds': build_seconds,
+                'operations': operations,
+            }
+    return report
+
+
+def format_table(report):
+    lines = [f"{'format':<7}{'wiersze':>9}  {'operacja':<24}{'p50 ms':>11}{'p95 ms':>11}{'pamięć MB':>11}"]
+    for file_format, sizes in report['results'].items():
+        for size, result in sizes.items():
+            for name, operation in result['operations'].items():
+                lines.append(
+                    f"{file_format:<7}{size:>9}  {name:<24}{operation['latency_ms']['p50']:>11.2f}"
+                    f"{operation['latency_ms']['p95']:>11.2f}{operation['peak_mb']:>11.1f}"
+                )
+    for skipped in report['skipped']:
+        lines.append(f"{skipped}: pominięto (zwiększ --xlsx-max-rows)")
+    return '\n'.join(lines)
+
+
+def _csv_list(value, cast=str):
+    return [cast(item) for item in value.split(',') if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mierzy czas zapisów i zapytań rejestru aplikacji konsolowej dla różnych rozmiarów"
+    )
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Liczby wierszy oddzielone przecinkami")
+    parser.add_argument('--formats', default=DEFAULT_FORMATS, help="Formaty rejestru: jsonl, xlsx")
+    parser.add_argument('--repeat', type=int, default=5, help="Powtórzenia każdego zapytania")
+    parser.add_argument('--insert-repeat', type=int, default=3, help="Powtórzenia każdego zapisu")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Wiersze w zapisie wsadowym")
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--xlsx-max-rows', type=int, default=DEFAULT_XLSX_MAX_ROWS,
+                        help="Większe rejestry .xlsx są pomijane")
+    parser.add_argument('--json', dest='json_path', help="Zapisz raport do pliku JSON")
+    parser.add_argument('--compare', help="Raport JSON do porównania (kod wyjścia 1 przy regresji)")
+    parser.add_argument('--max-slowdown', type=float, default=DEFAULT_MAX_SLOWDOWN)
+    parser.add_argument('--max-memory-growth', type=float, default=DEFAULT_MAX_MEMORY_GROWTH)
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS)
+    options = parser.parse_args(argv)
+
+    try:
+        sizes = _csv_list(options.sizes, int)
+    except ValueError:
+        parser.error(f"nieprawidłowa lista rozmiarów: {options.sizes}")
+    formats = _csv_list(options.formats)
+    unknown = set(formats) - {'jsonl', 'xlsx'}
+    if unknown:
+        parser.error(f"nieobsługiwane formaty: {', '.join(sorted(unknown))}")
+    if min(options.repeat, options.insert_repeat, options.batch_size, options.users) < 1:
+        parser.error("--repeat, --insert-repeat, --batch-size i --users muszą być większe od zera")
+
+    report = run_benchmarks(sizes, formats, options.repeat, options.insert_repeat, options.batch_size,
+                            options.users, options.seed, options.xlsx_max_rows)
+    print(format_table(report))
+    if options.json_path:
+        with open(options.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Raport zapisany do {options.json_path}")
+
+    if options.compare:
+        with open(options.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, options.max_slowdown, options.max_memory_growth,
+                                      options.min_delta_ms)
+        if regressions:
+            print(f"Regresje względem {options.compare}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"Brak regresji względem {options.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,111 +1,138 @@
-import pandas as pd
 import uuid
 from datetime import datetime
+from decimal import Decimal
 import os
+from ledger_storage import DEFAULT_LEDGER_FILE, open_storage
+from money import to_decimal
 from transaction_analyzer import TransactionHistoryAnalyzer
 import budget_input
 
 class BudgetManager:
     """
-    Manages budget operations such as income and expense recordings.
-
-    This class provides functionality to manage personal budgeting by allowing
-    users to record income and expenses. Data is stored in an Excel file which
-    is initialized and maintained by the class. Each record includes details
-    like user ID, date, description, category, and transaction amount.
+    Obsługuje operacje budżetu, takie jak zapisywanie przychodów i wydatków.
+
+    Klasa pozwala użytkownikom zapisywać przychody i wydatki. Dane przechowuje magazyn
+    (zob. `ledger_storage`): domyślnie dziennik JSONL tylko do dopisywania (data.jsonl),
+    a dla `file_path` kończącego się na `.xlsx` skoroszyt Excela. Każdy rekord zawiera m.in. ID
+    użytkownika, datę, opis, kategorię i kwotę transakcji. Kwoty są parsowane jako
+    liczby dziesiętne i zaokrąglane do pełnych groszy przed zapisem, więc później
+    można je dokładnie sumować jako całkowite grosze.
     """
     USER_ID_COLUMN = 'ID_urzytkownika'
     INCOME_COLUMN = 'Przychod'
     EXPENSE_COLUMN = 'Wydatek'
     DATE_COLUMN = 'Data'
     DEFAULT_COLUMNS = ['ID', USER_ID_COLUMN, DATE_COLUMN, INCOME_COLUMN, EXPENSE_COLUMN, 'Opis', 'Kategoria',"Typ"]
+    # Komunikat dla kwoty <= 0 - jedyna część walidacji zależna od typu transakcji
+    NON_POSITIVE_AMOUNT_ERRORS = {
+        'expense': "Kwota wydatku musi być większa od 0",
+        'income': "Kwota przychodu musi być większa od 0 zł!",
+    }
 
-    def __init__(self, file_path="data.xlsx"):
+    def __init__(self, file_path=DEFAULT_LEDGER_FILE, storage=None):
         self.file_path = file_path
-        if not os.path.exists(file_path):
-            self._initialize_excel_file()
-
-
-    def _initialize_excel_file(self):
-        df = pd.DataFrame(columns=self.DEFAULT_COLUMNS)
-        df.to_excel(self.file_path, index=False)
+        self.storage = storage if storage else open_storage(file_path, self.DEFAULT_COLUMNS)
 
     def _get_next_id(self):
-        df = pd.read_excel(self.file_path)
-        if df.empty:
-            return 1
-        return df['ID'].max() + 1
+        return self.storage.next_id()
 
     def _save_to_excel(self, data):
-        df = pd.read_excel(self.file_path)
-        new_data = pd.DataFrame([data], columns=self.DEFAULT_COLUMNS)
-        for col in df.columns:
-            if col in new_data.columns:
-                new_data[col] = new_data[col].astype(df[col].dtype)
-        df = pd.concat([df, new_data], ignore_index=True)
-        df.to_excel(self.file_path, index=False)
+        self.storage.append(data)
 
-    def add_expense(self, user_id: uuid.UUID, amount: float, date: str = None,
-                    description: str = None, category: str = None, frequency: str = None):
+    def export_to_excel(self, target_path="data.xlsx"):
         """
-        Adds an expense record for the given user to the system.
-        This method accepts details of an expense, including the user ID, the monetary
-        amount, and optionally the date, description, and category, and records it
-        to the system. If the date is not provided, the current date will be used.
-        The expense data is saved into an Excel file for further record-keeping.
+        Zapisuje cały rejestr do skoroszytu Excela w standardowym układzie kolumn.
+        Przydatne przy dzienniku JSONL, który sam nie trzyma kopii xlsx.
         """
+        if os.path.abspath(target_path) == os.path.abspath(self.file_path):
+            return target_path
+        return self.storage.export_to_excel(target_path)
+
+    def _validate_transaction(self, transaction_type, user_id, amount):
+        if transaction_type not in self.NON_POSITIVE_AMOUNT_ERRORS:
+            raise ValueError("Typ transakcji musi być 'income' albo 'expense'")
         if not isinstance(user_id, uuid.UUID):
             raise ValueError("ID_urzytkownika musi być typu UUID")
-        if amount <= 0:
-            raise ValueError("Kwota wydatku musi być większa od 0")
+        if to_decimal(amount) <= 0:
+            raise ValueError(self.NON_POSITIVE_AMOUNT_ERRORS[transaction_type])
 
+    def _build_record(self, record_id, transaction_type, user_id, amount, date=None,
+                      description=None, category=None, frequency=None):
         current_date = date if date else datetime.now().strftime("%d-%m-%Y")
+        is_income = transaction_type == 'income'
+        # Kwota dokładna do grosza; dziennik zapisuje ją jako tekst Decimal, arkusz jako liczbę
+        amount = to_decimal(amount)
+        zero = Decimal('0.00')
 
-        expense_data = {
-            'ID': self._get_next_id(),
+        return {
+            'ID': record_id,
             self.USER_ID_COLUMN: str(user_id),
             self.DATE_COLUMN: current_date,
-            self.INCOME_COLUMN: 0.0,
-            self.EXPENSE_COLUMN: amount,
+            self.INCOME_COLUMN: amount if is_income else zero,
+            self.EXPENSE_COLUMN: zero if is_income else amount,
             'Opis': description if description else '',
             'Kategoria': category if category else '',
             'Typ': frequency if frequency else ''
         }
 
+    def add_expense(self, user_id: uuid.UUID, amount: float, date: str = None,
+                    description: str = None, category: str = None, frequency: str = None):
+        """
+        Dodaje wydatek podanego użytkownika.
+        Przyjmuje ID użytkownika i kwotę oraz opcjonalnie datę, opis i kategorię.
+        Bez daty używana jest bieżąca data. Wydatek zapisuje skonfigurowany magazyn.
+        """
+        self._validate_transaction('expense', user_id, amount)
+
+        expense_data = self._build_record(self._get_next_id(), 'expense', user_id, amount,
+                                          date, description, category, frequency)
+
         self._save_to_excel(expense_data)
         return expense_data
 
     def add_income(self, user_id: uuid.UUID, amount: float, date: str = None,
                     description: str = None, category: str = None, frequency: str = None):
         """
-        Adds an income record to the Excel for a specified user. The income record
-        contains details such as user ID, amount, optional description, category,
-        and the date of the income. In case the date is not provided, the system
-        uses the current date. This method validates that the user ID is of type
-        UUID and that the amount is greater than zero. The income record is stored
-        in an Excel file via the `_save_to_excel` method.
+        Dodaje przychód podanego użytkownika. Rekord zawiera ID użytkownika, kwotę
+        oraz opcjonalnie opis, kategorię i datę przychodu. Bez daty używana jest bieżąca
+        data. Metoda sprawdza, czy ID użytkownika jest typu UUID, a kwota większa od zera.
+        Przychód zapisuje skonfigurowany magazyn przez metodę `_save_to_excel`.
         """
-        if not isinstance(user_id, uuid.UUID):
-            raise ValueError("ID_urzytkownika musi być typu UUID!")
-        if amount <= 0:
-            raise ValueError("Kwota przychodu musi być większa od 0 zł!")
-
-        current_date = date if date else datetime.now().strftime("%d-%m-%Y")
+        self._validate_transaction('income', user_id, amount)
 
-        income_data = {
-            'ID': self._get_next_id(),
-            self.USER_ID_COLUMN: str(user_id),
-            self.DATE_COLUMN: current_date,
-            self.INCOME_COLUMN: amount,
-            self.EXPENSE_COLUMN: 0.0,
-            'Opis': description if description else '',
-            'Kategoria': category if category else '',
-            'Typ': frequency if frequency else ''
-        }
+        income_data = self._build_record(self._get_next_id(), 'income', user_id, amount,
+                                         date, description, category, frequency)
 
         self._save_to_excel(income_data)
         return income_data
 
+    def add_transactions(self, records):
+        """
+        Dodaje wiele przychodów/wydatków jednym zapisem do magazynu.
+        Każdy rekord to słownik z kluczami `type` ('income' albo 'expense'), `user_id`
+        i `amount` oraz opcjonalnie `date`, `description`, `category` i `frequency`.
+        Cała paczka jest sprawdzana tymi samymi regułami co w `add_expense`/`add_income`
+        przed jakimkolwiek zapisem, rekordy dostają ciągły zakres ID, a metoda zwraca
+        zapisane wiersze.
+        """
+        records = list(records)
+        for number, record in enumerate(records, start=1):
+            try:
+                self._validate_transaction(record.get('type'), record.get('user_id'), record.get('amount'))
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"Rekord {number}: {e}") from e
+
+        first_id = self._get_next_id()
+        rows = [
+            self._build_record(first_id + offset, record['type'], record['user_id'], record['amount'],
+                               record.get('date'), record.get('description'),
+                               record.get('category'), record.get('frequency'))
+            for offset, record in enumerate(records)
+        ]
+        if rows:
+            self.storage.append_many(rows)
+        return rows
+
 
 if __name__ == "__main__":
     # TEST DATA
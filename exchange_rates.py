@@ -0,0 +1,331 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import date, timedelta
+
+import numpy as np
+import requests
+
+
+API_URL = "https://api.frankfurter.app"
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exchange_rates.json")
+DEFAULT_TTL = 6 * 60 * 60
+# Po nieudanym zapytaniu API nie jest odpytywane ponownie przez tyle sekund
+DEFAULT_RETRY_AFTER = 60
+# Dni bez notowań (weekendy, święta) mają kurs z ostatniego wcześniejszego dnia roboczego,
+# więc zakres pobierany dla historii zaczyna się odpowiednio wcześniej
+HISTORY_LOOKBACK_DAYS = 7
+# Lista walut pokazywana, dopóki pełna lista z API nie trafi do pamięci podręcznej
+FALLBACK_CURRENCIES = {
+    'EUR': 'Euro',
+    'USD': 'United States Dollar',
+    'GBP': 'British Pound',
+    'CHF': 'Swiss Franc',
+    'CZK': 'Czech Koruna',
+    'DKK': 'Danish Krone',
+    'NOK': 'Norwegian Krone',
+    'SEK': 'Swedish Krona',
+    'HUF': 'Hungarian Forint',
+    'JPY': 'Japanese Yen',
+    'CAD': 'Canadian Dollar',
+    'AUD': 'Australian Dollar',
+}
+
+
+class ExchangeRateError(Exception):
+    pass
+
+
+class ExchangeRateUnavailable(ExchangeRateError):
+    """API kursów jest nieosiągalne albo zwróciło błąd po swojej stronie (timeout, 5xx, 429)"""
+
+
+class ExchangeRateCache:
+    """
+    Lokalna pamięć podręczna tabel kursów walut, wspólna dla konsolowego Kantoru i aplikacji webowej.
+
+    Dla każdej waluty bazowej pobierana jest jedna tabela kursów, ważna przez `ttl` sekund;
+    przeliczenia są liczone lokalnie z tej tabeli. Tabele są zapisywane w pliku JSON,
+    więc przetrwają restart. Gdy API jest nieosiągalne, zwracana jest ostatnia znana
+    tabela (nieaktualna), a w trybie `offline` API nie jest odpytywane wcale.
+
+    Po nieudanym zapytaniu API nie jest odpytywane przez `retry_after` sekund: awaria
+    wstrzymuje wszystkie zapytania, a błąd jednej tabeli (np. nieznana waluta) jest
+    zapamiętywany tylko dla tej tabeli. W tym czasie odczyty zwracają nieaktualną
+    tabelę albo od razu zgłaszają błąd, zamiast znowu czekać na timeout.
+
+    Wartości domyślne można ustawić zmiennymi środowiskowymi EXCHANGE_RATES_CACHE_FILE,
+    EXCHANGE_RATES_TTL, EXCHANGE_RATES_RETRY_AFTER i EXCHANGE_RATES_OFFLINE.
+    """
+
+    def __init__(self, cache_file=None, ttl=None, offline=None, timeout=5, retry_after=None):
+        self.cache_file = cache_file or os.getenv("EXCHANGE_RATES_CACHE_FILE", DEFAULT_CACHE_FILE)
+        self.ttl = ttl if ttl is not None else int(os.getenv("EXCHANGE_RATES_TTL", DEFAULT_TTL))
+        if offline is None:
+            offline = os.getenv("EXCHANGE_RATES_OFFLINE", "0").lower() in ("1", "true", "yes")
+        self.offline = offline
+        self.timeout = timeout
+        if retry_after is None:
+            retry_after = int(os.getenv("EXCHANGE_RATES_RETRY_AFTER", DEFAULT_RETRY_AFTER))
+        self.retry_after = retry_after
+        self._entries = {}
+        # Nieudane zapytania: {klucz: (ponów po, komunikat)} oraz czas, do którego całe API jest pomijane
+        self._failures = {}
+        self._unavailable_until = 0.0
+        self._unavailable_error = None
+        self._lock = threading.Lock()
+        # Liczniki diagnostyczne (odczyt przez stats())
+        self.hits = 0
+        self.misses = 0
+        self.upstream_requests = 0
+        self.upstream_errors = 0
+        self.upstream_seconds = 0.0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def _save(self):
+        tmp_path = self.cache_file + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError:
+            # Brak zapisu na dysk nie może blokować przeliczeń - kursy zostają w pamięci
+            pass
+
+    def _request(self, path, params=None):
+        started = time.perf_counter()
+        try:
+            response = requests.get(f"{API_URL}{path}", params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            self._count_request(started, failed=True)
+            raise ExchangeRateUnavailable(f"Error fetching exchange rates: {e}")
+        failed = response.status_code != 200
+        self._count_request(started, failed)
+        if failed:
+            error_class = ExchangeRateUnavailable if response.status_code >= 500 or response.status_code == 429 \
+                else ExchangeRateError
+            raise error_class(f"Error fetching exchange rates: {response.status_code} {response.text}")
+        return response.json()
+
+    def _count_request(self, started, failed):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.upstream_requests += 1
+            self.upstream_errors += int(failed)
+            self.upstream_seconds += elapsed
+
+    def _backoff_error(self, key, now):
+        """Zwraca zapamiętany błąd, dopóki zapytania o `key` są wstrzymane, w przeciwnym razie None"""
+        if now < self._unavailable_until:
+            return self._unavailable_error
+        failure = self._failures.get(key)
+        if failure and now < failure[0]:
+            return failure[1]
+        return None
+
+    def _record_failure(self, key, error):
+        retry_at = time.time() + self.retry_after
+        with self._lock:
+            if isinstance(error, ExchangeRateUnavailable):
+                self._unavailable_until = retry_at
+                self._unavailable_error = str(error)
+            else:
+                self._failures[key] = (retry_at, str(error))
+
+    def _get(self, key, fetch, expires=True):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = entry and (self.offline or not expires or now - entry["fetched_at"] < self.ttl)
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+            backoff_error = None if fresh else self._backoff_error(key, now)
+        if fresh:
+            return entry["data"]
+        if self.offline:
+            raise ExchangeRateError("Brak zapisanych kursów walut (tryb offline).")
+        if backoff_error:
+            # Niedawno nieudane zapytanie - nie czekamy ponownie na API
+            if entry:
+                return entry["data"]
+            raise ExchangeRateError(backoff_error)
+
+        try:
+            data = fetch()
+        except ExchangeRateError as e:
+            self._record_failure(key, e)
+            if entry:
+                return entry["data"]
+            raise
+
+        with self._lock:
+            self._failures.pop(key, None)
+            self._entries[key] = {"fetched_at": time.time(), "data": data}
+            self._save()
+        return data
+
+    def get_rates(self, base, day=None):
+        """
+        Zwraca tabelę kursów waluty `base` jako {waluta: kurs}, łącznie z samą walutą bazową.
+        Z `day` ('RRRR-MM-DD' albo date) zwraca tabelę historyczną z tego dnia; tabele
+        z minionych dni się nie zmieniają, więc nie wygasają.
+        """
+        base = base.upper()
+        day = str(day) if day else "latest"
+
+        def fetch():
+            data = self._request(f"/{day}", params={"from": base})
+            return {**data["rates"], base: 1.0}
+
+        expires = day == "latest" or day >= date.today().isoformat()
+        return self._get(f"{day}:{base}", fetch, expires=expires)
+
+    def get_supported_currencies(self, cached_only=False):
+        """
+        Zwraca obsługiwane waluty jako {kod: nazwa}. Z `cached_only` API nie jest
+        odpytywane: zwracana jest zapisana lista (nawet nieaktualna) albo FALLBACK_CURRENCIES,
+        więc strony mogą pokazać listę bez czekania na API.
+        """
+        if cached_only:
+            with self._lock:
+                entry = self._entries.get("currencies")
+            return entry["data"] if entry else dict(FALLBACK_CURRENCIES)
+        return self._get("currencies", lambda: self._request("/currencies"))
+
+    def _prefetch_history(self, base, days):
+        """
+        Uzupełnia pamięć podręczną o brakujące tabele historyczne waluty `base` dla dni
+        `days` (minione daty ISO) jednym zapytaniem o zakres dat i jednym zapisem pliku.
+
+        Pobrane zakresy są zapamiętywane razem z tabelami (wpis "history:<waluta>"), więc dni
+        z już pobranego zakresu są uzupełniane z pamięci, bez kolejnego zapytania.
+        """
+        now = time.time()
+        history_key = f"history:{base}"
+        with self._lock:
+            missing = sorted(day for day in days if f"{day}:{base}" not in self._entries)
+            entry = self._entries.get(history_key)
+            history = entry["data"] if entry else {"ranges": [], "tables": {}}
+            uncovered = [day for day in missing if not self._in_ranges(history["ranges"], day)]
+            paused = self._backoff_error(history_key, now)
+        if not missing:
+            return
+
+        if uncovered and not self.offline and not paused:
+            start = (date.fromisoformat(uncovered[0]) - timedelta(days=HISTORY_LOOKBACK_DAYS)).isoformat()
+            try:
+                data = self._request(f"/{start}..{uncovered[-1]}", params={"from": base})
+            except ExchangeRateError as e:
+                # Pojedyncze tabele pobierze (albo poda z zapisanych) get_rates()
+                self._record_failure(history_key, e)
+            else:
+                history = {
+                    "ranges": history["ranges"] + [[uncovered[0], uncovered[-1]]],
+                    "tables": {**history["tables"], **data.get("rates", {})},
+                }
+                with self._lock:
+                    self._entries[history_key] = {"fetched_at": time.time(), "data": history}
+
+        covered = [day for day in missing if self._in_ranges(history["ranges"], day)]
+        if not covered:
+            return
+        table_days = sorted(history["tables"])
+        fetched_at = time.time()
+        with self._lock:
+            for day in covered:
+                position = bisect_right(table_days, day)
+                if position:
+                    self._entries[f"{day}:{base}"] = {
+                        "fetched_at": fetched_at,
+                        "data": {**history["tables"][table_days[position - 1]], base: 1.0},
+                    }
+            self._save()
+
+    @staticmethod
+    def _in_ranges(ranges, day):
+        return any(start <= day <= end for start, end in ranges)
+
+    def convert(self, amount, from_currency, to_currency):
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+        if from_currency == to_currency:
+            return amount
+
+        rates = self.get_rates(from_currency)
+        if to_currency not in rates:
+            raise ExchangeRateError("Currency not found in API response.")
+        return round(amount * rates[to_currency], 2)
+
+    def convert_many(self, amounts, from_currencies, to_currency, dates=None):
+        """
+        Przelicza całą kolumnę kwot (listę, tablicę NumPy albo pandas Series).
+
+        `from_currencies` to jeden kod waluty albo kod dla każdego wiersza, `dates` to
+        opcjonalne daty wierszy (None/NaT oznacza najnowsze kursy). Brakujące tabele
+        historyczne każdej waluty są pobierane jednym zapytaniem o zakres dat, każda
+        różna tabela (data, waluta) jest odczytywana raz, a kolumna jest przeliczana
+        jednym mnożeniem wektorowym. Zwraca tablicę NumPy.
+        """
+        values = np.asarray(amounts, dtype=float)
+        to_currency = to_currency.upper()
+        bases = np.char.upper(np.broadcast_to(np.asarray(from_currencies, dtype=str), values.shape))
+        if dates is None:
+            days = np.full(values.shape, "latest")
+        else:
+            days = np.asarray(dates, dtype="datetime64[D]").astype(str)
+            days = np.where(days == "NaT", "latest", days)
+
+        keys, inverse = np.unique(np.char.add(np.char.add(days, ":"), bases), return_inverse=True)
+        today = date.today().isoformat()
+        history = {}
+        for key in keys:
+            day, base = key.split(":")
+            if day != "latest" and day < today and base != to_currency:
+                history.setdefault(base, []).append(day)
+        for base, base_days in history.items():
+            self._prefetch_history(base, base_days)
+
+        factors = np.empty(len(keys))
+        for position, key in enumerate(keys):
+            day, base = key.split(":")
+            if base == to_currency:
+                factors[position] = 1.0
+                continue
+            rates = self.get_rates(base, None if day == "latest" else day)
+            if to_currency not in rates:
+                raise ExchangeRateError("Currency not found in API response.")
+            factors[position] = rates[to_currency]
+
+        return np.round(values * factors[inverse.reshape(values.shape)], 2)
+
+    def stats(self):
+        """Zwraca liczniki trafień i chybień pamięci podręcznej oraz liczbę, błędy i łączny czas zapytań do API"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'upstream_requests': self.upstream_requests,
+                'upstream_errors': self.upstream_errors,
+                'upstream_seconds': self.upstream_seconds,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._failures = {}
+            self._unavailable_until = 0.0
+            self._save()
+
+
+rate_cache = ExchangeRateCache()
@@ -0,0 +1,233 @@
+import json
+import os
+from decimal import Decimal
+
+import pandas as pd
+
+from money import to_decimal
+
+
+# Kolumny kwot - w dzienniku zapisywane jako tekst Decimal, w arkuszu nigdy nierzutowane na int
+MONEY_COLUMNS = ('Przychod', 'Wydatek')
+# Rejestr aplikacji konsolowej; arkusz o tej samej nazwie jest do niego przenoszony przy pierwszym użyciu
+DEFAULT_LEDGER_FILE = 'data.jsonl'
+
+
+class ExcelStorage:
+    """
+    Magazyn trzymający cały rejestr w jednym skoroszycie Excela.
+
+    Każdy zapis wczytuje i zapisuje skoroszyt od nowa, więc dopisanie kosztuje O(N).
+    Zostaje dla zgodności z istniejącymi arkuszami - domyślnym rejestrem jest dziennik
+    JSONL (DEFAULT_LEDGER_FILE). Ostatnie ID jest zapamiętywane razem ze stanem pliku
+    (mtime, rozmiar), więc next_id() wczytuje arkusz tylko po zmianie z zewnątrz.
+    """
+
+    def __init__(self, file_path, columns):
+        self.file_path = file_path
+        self.columns = list(columns)
+        self._last_id = None
+        self._file_state = None
+        if not os.path.exists(file_path):
+            self._initialize_file()
+
+    def _initialize_file(self):
+        df = pd.DataFrame(columns=self.columns)
+        df.to_excel(self.file_path, index=False)
+
+    def _current_file_state(self):
+        stat = os.stat(self.file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _remember_last_id(self, df):
+        self._last_id = 0 if df.empty else int(df['ID'].max())
+        self._file_state = self._current_file_state()
+
+    def next_id(self):
+        if self._last_id is None or self._file_state != self._current_file_state():
+            self._remember_last_id(pd.read_excel(self.file_path, usecols=['ID']))
+        return self._last_id + 1
+
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records):
+        df = pd.read_excel(self.file_path)
+        new_data = pd.DataFrame(records, columns=self.columns)
+        # Liczby w xlsx to zawsze double - kwoty zaokrąglone do groszy zapisujemy jako float,
+        # a to_decimal()/to_minor_units() odtwarzają je przy odczycie bez straty
+        for col in MONEY_COLUMNS:
+            if col in new_data.columns:
+                new_data[col] = new_data[col].astype(float)
+        for col in df.columns:
+            if col not in new_data.columns:
+                continue
+            if col in MONEY_COLUMNS:
+                # Kolumna z samymi pełnymi złotymi jest wczytywana jako int64 - rzutowanie ucięłoby grosze
+                if pd.api.types.is_integer_dtype(df[col]):
+                    df[col] = df[col].astype(float)
+                continue
+            try:
+                new_data[col] = new_data[col].astype(df[col].dtype)
+            except (ValueError, TypeError):
+                # np. pusta kolumna 'Opis' wczytana jako float, a nowy wpis ma tekst
+                pass
+        df = pd.concat([df, new_data], ignore_index=True)
+        df.to_excel(self.file_path, index=False)
+        self._remember_last_id(df)
+
+    def read_all(self):
+        return pd.read_excel(self.file_path)
+
+    def iter_records(self):
+        """Zwraca kolejne wiersze jako słowniki, czytając skoroszyt wiersz po wierszu (tryb read-only openpyxl)"""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            for row in rows:
+                if any(value is not None for value in row):
+                    yield dict(zip(header, row))
+        finally:
+            workbook.close()
+
+    def export_to_excel(self, target_path):
+        self.read_all().reindex(columns=self.columns).to_excel(target_path, index=False)
+        return target_path
+
+
+class JournalStorage:
+    """
+    Magazyn tylko do dopisywania: jeden rekord JSON w każdej linii (JSONL).
+
+    Ostatnie nadane ID jest zapisywane w małym pliku obok (``<file_path>.seq``),
+    więc ani dopisanie rekordu, ani wyznaczenie kolejnego ID nie wymaga czytania
+    dziennika. Zapis kosztuje O(1) niezależnie od rozmiaru rejestru.
+
+    Kwoty (MONEY_COLUMNS) są zapisywane jako tekst Decimal ("12.34"), a przy odczycie
+    zamieniane z powrotem na Decimal, więc dziennik przechowuje je dokładnie.
+
+    Nowy dziennik jest jednorazowo wypełniany wierszami arkusza `import_from`, jeśli ten
+    istnieje - tak dane z dotychczasowego data.xlsx trafiają do data.jsonl.
+    """
+    SEQUENCE_SUFFIX = '.seq'
+
+    def __init__(self, file_path, columns, import_from=None):
+        self.file_path = file_path
+        self.sequence_path = file_path + self.SEQUENCE_SUFFIX
+        self.columns = list(columns)
+        if not os.path.exists(file_path):
+            self._create(import_from)
+        self._last_id = self._load_last_id()
+
+    def _create(self, import_from):
+        # Dziennik powstaje pod tymczasową nazwą, żeby przerwany import nie zostawił połowy danych
+        tmp_path = self.file_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if import_from and os.path.exists(import_from):
+                for record in ExcelStorage(import_from, self.columns).iter_records():
+                    f.write(self._dump(record))
+        os.replace(tmp_path, self.file_path)
+        # Licznik z poprzedniego dziennika o tej nazwie jest nieaktualny
+        if os.path.exists(self.sequence_path):
+            os.remove(self.sequence_path)
+
+    @staticmethod
+    def _dump(record):
+        record = dict(record)
+        for column in MONEY_COLUMNS:
+            value = record.get(column)
+            # Puste komórki starszych arkuszy (None, NaN) zostają puste
+            if value is not None and value == value and value != '':
+                record[column] = str(to_decimal(value))
+            elif column in record:
+                record[column] = None
+        # Daty z arkusza mogą być obiektami datetime
+        return json.dumps(record, ensure_ascii=False, default=str) + '\n'
+
+    @staticmethod
+    def _load(line):
+        record = json.loads(line)
+        for column in MONEY_COLUMNS:
+            value = record.get(column)
+            if isinstance(value, str) and value:
+                record[column] = Decimal(value)
+            elif value is not None:
+                # Dzienniki zapisane przed przejściem na tekst Decimal przechowują liczby
+                record[column] = to_decimal(value)
+        return record
+
+    def _load_last_id(self):
+        if os.path.exists(self.sequence_path):
+            with open(self.sequence_path, encoding='utf-8') as f:
+                content = f.read().strip()
+            if content:
+                return int(content)
+        # Brak licznika (np. journal skopiowany ręcznie) - odtwarzamy go jednorazowo z pliku
+        last_id = 0
+        for record in self._iter_records():
+            last_id = max(last_id, int(record['ID']))
+        self._store_last_id(last_id)
+        return last_id
+
+    def _store_last_id(self, last_id):
+        tmp_path = self.sequence_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(str(last_id))
+        os.replace(tmp_path, self.sequence_path)
+
+    def _iter_records(self):
+        with open(self.file_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield self._load(line)
+
+    def next_id(self):
+        return self._last_id + 1
+
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records):
+        # Licznik zapisujemy przed rekordami: po awarii najwyżej pominiemy kilka ID,
+        # ale nigdy nie nadamy tego samego ID dwóm rekordom.
+        last_id = max([self._last_id] + [int(record['ID']) for record in records])
+        self._store_last_id(last_id)
+        self._last_id = last_id
+        lines = ''.join(self._dump(record) for record in records)
+        with open(self.file_path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    def read_all(self):
+        return pd.DataFrame(list(self._iter_records()), columns=self.columns)
+
+    def iter_records(self):
+        """Zwraca kolejne rekordy bez wczytywania całego dziennika"""
+        return self._iter_records()
+
+    def export_to_excel(self, target_path):
+        self.read_all().reindex(columns=self.columns).to_excel(target_path, index=False)
+        return target_path
+
+
+STORAGE_BY_EXTENSION = {
+    '.xlsx': ExcelStorage,
+    '.jsonl': JournalStorage,
+}
+
+
+def open_storage(file_path, columns):
+    """
+    Zwraca magazyn odpowiedni dla rozszerzenia pliku (domyślnie Excel). Nowy dziennik
+    .jsonl przejmuje wiersze arkusza .xlsx o tej samej nazwie, jeśli taki istnieje.
+    """
+    root, extension = os.path.splitext(file_path)
+    storage_class = STORAGE_BY_EXTENSION.get(extension.lower(), ExcelStorage)
+    if storage_class is JournalStorage:
+        return JournalStorage(file_path, columns, import_from=root + '.xlsx')
+    return storage_class(file_path, columns)
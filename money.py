@@ -0,0 +1,40 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+import numpy as np
+
+
+CENT = Decimal('0.01')
+MINOR_UNITS = 100
+
+
+def to_decimal(amount):
+    """
+    Zamienia kwotę (int, float, str lub Decimal) na Decimal zaokrąglony do pełnych
+    groszy (połówki w górę). Float jest zamieniany przez najkrótszy zapis (repr),
+    więc 0.1 daje Decimal('0.10'), a nie przybliżenie binarne. NaN
+    i nieskończoności zgłaszają ValueError.
+    """
+    if isinstance(amount, float):
+        amount = repr(amount)
+    try:
+        value = Decimal(str(amount).strip().replace(',', '.'))
+        if not value.is_finite():
+            raise InvalidOperation
+        return value.quantize(CENT, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError(f"Nieprawidłowa kwota: {amount}")
+
+
+def to_minor_units(values):
+    """
+    Zamienia kolumnę kwot (listę, tablicę NumPy albo pandas Series) na grosze int64.
+    Brakujące wartości liczą się jako 0. Suma wyniku jest dokładna, w przeciwieństwie
+    do sumowania floatów.
+    """
+    amounts = np.nan_to_num(np.asarray(values, dtype=float))
+    return np.rint(amounts * MINOR_UNITS).astype(np.int64)
+
+
+def from_minor_units(total):
+    """Zamienia całkowitą liczbę groszy z powrotem na kwotę Decimal"""
+    return (Decimal(int(total)) / MINOR_UNITS).quantize(CENT)
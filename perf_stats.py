@@ -0,0 +1,70 @@
+"""
+Statystyki wspólne dla narzędzi pomiarowych aplikacji konsolowej i aplikacji Django:
+okno ostatnich próbek z percentylami metodą najbliższej rangi, bieżący commit gita
+do raportów z pomiarów i wyszukiwanie regresji między dwoma raportami.
+"""
+import math
+import os
+import subprocess
+from collections import deque
+
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class RollingWindow:
+    """Ostatnie `size` próbek jednej miary; percentyle liczone przy odczycie"""
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def summary(self):
+        values = sorted(self.samples)
+        if not values:
+            return {}
+        summary = {f'p{percentile}': self._percentile(values, percentile) for percentile in PERCENTILES}
+        summary['mean'] = sum(values) / len(values)
+        summary['max'] = values[-1]
+        return summary
+
+    @staticmethod
+    def _percentile(values, percentile):
+        # Metoda najbliższej rangi - zwraca zawsze jedną z zarejestrowanych wartości
+        rank = max(math.ceil(percentile / 100 * len(values)), 1)
+        return values[rank - 1]
+
+
+def git_commit(directory=None):
+    """Zwraca skrót HEAD w katalogu `directory` (domyślnie w repozytorium) albo None poza gitem"""
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=directory or os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def find_regressions(baseline, current, limits):
+    """
+    Porównuje dwa spłaszczone raporty, {etykieta: {miara: wartość}}, i zwraca jeden komunikat
+    na każdą regresję. `limits` przypisuje mierze (max_ratio, min_delta, komunikat): regresja
+    to wzrost ponad `max_ratio` razy i o więcej niż `min_delta`; komunikat jest formatowany
+    wartościami `old` i `new`. Porównywane są tylko etykiety i miary obecne w obu raportach.
+    """
+    regressions = []
+    for label, values in current.items():
+        previous = baseline.get(label)
+        if previous is None:
+            continue
+        for metric, (max_ratio, min_delta, message) in limits.items():
+            old, new = previous.get(metric), values.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * max_ratio and new - old > min_delta:
+                regressions.append(f"{label}: {message.format(old=old, new=new)}")
+    return regressions
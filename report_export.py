@@ -0,0 +1,101 @@
+import csv
+import os
+import time
+
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+DEFAULT_DELIMITER = ';'
+
+
+class _EchoBuffer:
+    """Obiekt plikopodobny, którego write() zwraca tekst zamiast go zapisywać"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, header=None, delimiter=DEFAULT_DELIMITER):
+    """
+    Zwraca wiersze jako tekst CSV, linia po linii. Nic nie jest buforowane, więc wynik
+    można zapisywać do pliku albo wysyłać w odpowiedzi HTTP jeszcze w trakcie
+    czytania wierszy.
+    """
+    writer = csv.writer(_EchoBuffer(), delimiter=delimiter)
+    if header:
+        yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(rows, target, header=None, delimiter=DEFAULT_DELIMITER):
+    # BOM, żeby Excel poprawnie odczytał polskie znaki
+    with open(target, 'w', newline='', encoding='utf-8-sig') as f:
+        f.writelines(iter_csv(rows, header, delimiter))
+    return target
+
+
+def write_xlsx(rows, target, header=None, sheet_title='Transakcje'):
+    """
+    Zapisuje wiersze do skoroszytu Excela w trybie write-only openpyxl. Dopisywane
+    wiersze trafiają od razu do pliku tymczasowego, więc zużycie pamięci nie rośnie
+    z liczbą wierszy. `target` to ścieżka albo plik binarny.
+    """
+    # Import lokalny: eksport CSV nie potrzebuje openpyxl
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    if header:
+        sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(target)
+    return target
+
+
+def detect_format(file_path):
+    extension = os.path.splitext(file_path)[1].lower().lstrip('.')
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Nieobsługiwany format eksportu: {file_path} (dozwolone: .csv, .xlsx)")
+    return extension
+
+
+def export_rows(rows, target, header=None, file_format=None):
+    """
+    Zapisuje wiersze (iterowalny zbiór list) do pliku CSV albo XLSX, wybranego przez
+    `file_format` albo rozszerzenie pliku. Zwraca liczbę wyeksportowanych wierszy i czas.
+    """
+    file_format = file_format if file_format else detect_format(target)
+    stats = {'rows': 0}
+
+    def counted(source):
+        for row in source:
+            stats['rows'] += 1
+            yield row
+
+    started = time.perf_counter()
+    if file_format == 'xlsx':
+        write_xlsx(counted(rows), target, header)
+    else:
+        write_csv(counted(rows), target, header)
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+def export_from_cli():
+    # Import lokalny: moduł jest używany także przez aplikację Django, która nie potrzebuje pandas
+    import budget_manager
+
+    target = input("Podaj ścieżkę pliku raportu (.csv lub .xlsx): ").strip()
+    if not target:
+        return
+    try:
+        budget = budget_manager.BudgetManager()
+        if os.path.abspath(target) == os.path.abspath(budget.file_path):
+            raise ValueError("Plik raportu musi być inny niż plik z danymi budżetu")
+        columns = budget.DEFAULT_COLUMNS
+        rows = ([record.get(column) for column in columns] for record in budget.storage.iter_records())
+        stats = export_rows(rows, target, header=columns)
+        print(f"Wyeksportowano {stats['rows']} transakcji do {target} w {stats['seconds']:.2f} s")
+    except (OSError, ValueError) as e:
+        print(f"Błąd eksportu: {e}")
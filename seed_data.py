@@ -0,0 +1,221 @@
+import argparse
+import math
+import os
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+import dummy_data
+
+
+DEFAULT_END_DATE = date(2025, 12, 31)
+DEFAULT_CHUNK_SIZE = 10_000
+# Arkusz Excela ma 1 048 576 wierszy, jeden zajmuje nagłówek
+XLSX_MAX_ROWS = 1_048_575
+
+# Kategoria: (rodzaj, udział w liczbie transakcji, mediana kwoty, rozrzut kwot, dzień miesiąca)
+# Kwoty mają rozkład log-normalny; transakcje z dniem miesiąca (pensja, czynsz) są comiesięczne
+CATEGORY_PROFILES = {
+    'Wynagrodzenie': ('income', 2.0, 6500, 0.25, 10),
+    'Prezenty': ('income', 1.0, 200, 0.8, None),
+    'Zwrot podatku': ('income', 0.2, 900, 0.6, None),
+    'Dochód pasywny': ('income', 0.8, 150, 1.0, None),
+    'Inne przychody': ('income', 0.6, 300, 0.9, None),
+    'Zakupy': ('expense', 35.0, 85, 0.8, None),
+    'Transport': ('expense', 12.0, 45, 0.7, None),
+    'Czynsz': ('expense', 2.0, 2200, 0.2, 1),
+    'Media': ('expense', 3.0, 250, 0.4, 15),
+    'Abonamenty': ('expense', 4.0, 45, 0.5, 5),
+    'Zdrowie': ('expense', 4.0, 120, 0.9, None),
+    'Edukacja': ('expense', 2.0, 250, 0.8, None),
+    'Rozrywka': ('expense', 8.0, 90, 0.9, None),
+    'Restauracje': ('expense', 9.0, 70, 0.7, None),
+    'Podróże': ('expense', 1.5, 900, 0.9, None),
+    'Inne wydatki': ('expense', 5.0, 60, 1.0, None),
+}
+# Profil dodatkowych kategorii tworzonych przez użytkowników
+EXTRA_CATEGORY_PROFILE = ('expense', 2.0, 80, 1.0, None)
+# Weekend ma więcej zakupów i wyjść
+WEEKEND_WEIGHT = 1.4
+
+
+def extra_category_names(count):
+    return [f'Kategoria {number}' for number in range(1, count + 1)]
+
+
+class TransactionGenerator:
+    """
+    Deterministyczny generator realistycznych transakcji budżetowych.
+
+    To samo ziarno i argumenty dają zawsze te same wiersze. Kategorie są losowane według
+    ich udziału w liczbie transakcji, kwoty mają rozkład log-normalny osobny dla każdej
+    kategorii, w weekendy transakcji jest więcej, a kategorie comiesięczne (pensja,
+    czynsz, rachunki) wypadają w stały dzień miesiąca. Wiersze powstają paczkami przez
+    `random.choices`, więc milion wierszy generuje się w kilka sekund.
+    """
+
+    def __init__(self, seed=42, start_date=None, end_date=DEFAULT_END_DATE, extra_categories=0):
+        self.rng = random.Random(seed)
+        self.end_date = end_date
+        self.start_date = start_date if start_date else end_date - timedelta(days=3 * 365)
+        if self.start_date > self.end_date:
+            raise ValueError("Data początkowa musi być wcześniejsza niż końcowa")
+
+        self.profiles = dict(CATEGORY_PROFILES)
+        for name in extra_category_names(extra_categories):
+            self.profiles[name] = EXTRA_CATEGORY_PROFILE
+        self.category_names = list(self.profiles)
+        self._category_weights = list(accumulate(self.profiles[name][1] for name in self.category_names))
+
+        days = (self.end_date - self.start_date).days + 1
+        self.days = [self.start_date + timedelta(days=offset) for offset in range(days)]
+        self._day_weights = list(accumulate(
+            WEEKEND_WEIGHT if day.weekday() >= 5 else 1.0 for day in self.days
+        ))
+
+    def make_uuid(self):
+        """Zwraca UUID wylosowany z generatora, więc identyfikatory też są powtarzalne"""
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _amount(self, median, sigma):
+        return Decimal(f"{self.rng.lognormvariate(math.log(median), sigma):.2f}")
+
+    def _day(self, day, day_of_month):
+        if day_of_month is None:
+            return day
+        candidate = day.replace(day=min(day_of_month, 28))
+        return min(max(candidate, self.start_date), self.end_date)
+
+    def rows(self, owners, count, weights=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Zwraca `count` transakcji jako słowniki z kluczami owner, date, type, amount
+        (Decimal), category, description i frequency. `owners` mogą być dowolnymi
+        obiektami (ID użytkowników, obiekty modeli); `weights` określa aktywność
+        każdego z nich.
+        """
+        owners = list(owners)
+        if not owners:
+            raise ValueError("Brak użytkowników dla generowanych transakcji")
+        owner_weights = list(accumulate(weights)) if weights else None
+
+        remaining = count
+        while remaining > 0:
+            size = min(remaining, chunk_size)
+            chunk_owners = self.rng.choices(owners, cum_weights=owner_weights, k=size)
+            chunk_categories = self.rng.choices(self.category_names, cum_weights=self._category_weights, k=size)
+            chunk_days = self.rng.choices(self.days, cum_weights=self._day_weights, k=size)
+            for owner, category, day in zip(chunk_owners, chunk_categories, chunk_days):
+                category_type, _, median, sigma, day_of_month = self.profiles[category]
+                yield {
+                    'owner': owner,
+                    'date': self._day(day, day_of_month),
+                    'type': category_type,
+                    'amount': self._amount(median, sigma),
+                    'category': category,
+                    'description': category,
+                    'frequency': 'Miesięczny' if day_of_month else 'Jednorazowy',
+                }
+            remaining -= size
+
+
+def _chunked(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_ledger(file_path, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Zapisuje wygenerowane wiersze do rejestru aplikacji konsolowej. Do dziennika `.jsonl`
+    wiersze są dopisywane paczkami, a skoroszyt `.xlsx` jest zapisywany od nowa w trybie
+    write-only openpyxl. Zwraca liczbę zapisanych wierszy.
+    """
+    # Import lokalny: generator jest używany także przez komendę Django, która nie potrzebuje pandas
+    import budget_manager
+    from report_export import write_xlsx
+
+    records = (
+        {
+            'type': row['type'],
+            'user_id': row['owner'],
+            'amount': row['amount'],
+            'date': row['date'].strftime("%d-%m-%Y"),
+            'description': row['description'],
+            'category': row['category'],
+            'frequency': row['frequency'],
+        }
+        for row in rows
+    )
+    written = 0
+    if file_path.lower().endswith('.xlsx'):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        budget = budget_manager.BudgetManager(file_path)
+        columns = budget.DEFAULT_COLUMNS
+
+        def workbook_rows():
+            nonlocal written
+            for record in records:
+                written += 1
+                if written > XLSX_MAX_ROWS:
+                    raise ValueError(f"Arkusz Excela mieści najwyżej {XLSX_MAX_ROWS} transakcji - użyj pliku .jsonl")
+                built = budget._build_record(
+                    written, record['type'], record['user_id'], record['amount'], record['date'],
+                    record['description'], record['category'], record['frequency']
+                )
+                yield [built[column] for column in columns]
+
+        write_xlsx(workbook_rows(), file_path, header=columns, sheet_title='Sheet1')
+    else:
+        budget = budget_manager.BudgetManager(file_path)
+        for chunk in _chunked(records, chunk_size):
+            written += len(budget.add_transactions(chunk))
+    return written
+
+
+def seed_ledger(file_path, rows=100_000, users=2, seed=42, start_date=None, end_date=DEFAULT_END_DATE,
+                chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Wypełnia rejestr aplikacji konsolowej transakcjami `users` użytkowników. Pierwszy
+    to `dummy_data.user_id`, którego używa menu konsolowe.
+    """
+    generator = TransactionGenerator(seed, start_date, end_date)
+    owners = [dummy_data.user_id] + [generator.make_uuid() for _ in range(users - 1)]
+    started = time.perf_counter()
+    written = write_ledger(file_path, generator.rows(owners, rows, chunk_size=chunk_size), chunk_size)
+    seconds = time.perf_counter() - started
+    return {
+        'rows': written,
+        'seconds': seconds,
+        'rows_per_second': written / seconds if seconds > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generuje powtarzalne dane testowe dla rejestru aplikacji konsolowej")
+    parser.add_argument('--output', default='data.jsonl', help="Plik rejestru (.jsonl albo .xlsx)")
+    parser.add_argument('--rows', type=int, default=100_000, help="Liczba transakcji")
+    parser.add_argument('--users', type=int, default=2, help="Liczba użytkowników")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start-date', type=date.fromisoformat, help="Pierwszy dzień (RRRR-MM-DD)")
+    parser.add_argument('--end-date', type=date.fromisoformat, default=DEFAULT_END_DATE,
+                        help="Ostatni dzień (RRRR-MM-DD)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    options = parser.parse_args(argv)
+
+    stats = seed_ledger(options.output, options.rows, max(options.users, 1), options.seed,
+                        options.start_date, options.end_date, options.chunk_size)
+    print(f"Zapisano {stats['rows']} transakcji do {options.output} w {stats['seconds']:.2f} s "
+          f"({stats['rows_per_second']:.0f} wierszy/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+import os
+import tempfile
+import unittest
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+import pandas as pd
+import requests
+
+import bank_import
+from budget_manager import BudgetManager
+from exchange_rates import ExchangeRateCache, ExchangeRateError, ExchangeRateUnavailable
+from ledger_storage import DEFAULT_LEDGER_FILE, JournalStorage
+from money import to_decimal
+from transaction_analyzer import LedgerCache, TransactionHistoryAnalyzer
+
+
+class ExcelLedgerMoneyTest(unittest.TestCase):
+    """Kwoty dopisywane do arkusza z całkowitymi kolumnami kwot nie mogą tracić groszy"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'data.xlsx')
+        self.user_id = uuid.uuid4()
+        # Arkusz z samymi pełnymi złotymi - pandas wczytuje kolumny kwot jako int64
+        pd.DataFrame([{
+            'ID': 1, 'ID_urzytkownika': str(self.user_id), 'Data': '01-01-2025', 'Przychod': 100,
+            'Wydatek': 0, 'Opis': 'Pensja', 'Kategoria': 'Wynagrodzenie', 'Typ': 'Jednorazowy',
+        }]).to_excel(self.file_path, index=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_keeps_grosze_in_int_typed_workbook(self):
+        self.assertTrue(pd.api.types.is_integer_dtype(pd.read_excel(self.file_path)['Wydatek']))
+
+        BudgetManager(self.file_path).add_expense(self.user_id, 10.01, '02-01-2025', 'Zakupy', 'Zakupy')
+
+        ledger = pd.read_excel(self.file_path)
+        self.assertEqual(ledger['Wydatek'].tolist(), [0.0, 10.01])
+        totals = TransactionHistoryAnalyzer(self.file_path, LedgerCache()).get_user_totals(self.user_id)
+        self.assertEqual(totals['expense'], Decimal('10.01'))
+        self.assertEqual(totals['balance'], Decimal('89.99'))
+
+
+class LedgerStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.user_id = uuid.uuid4()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_excel_next_id_is_cached_until_file_changes(self):
+        file_path = self._path('data.xlsx')
+        budget = BudgetManager(file_path)
+        with mock.patch('ledger_storage.pd.read_excel', wraps=pd.read_excel) as read_excel:
+            budget.add_expense(self.user_id, 1, '01-01-2025')
+            budget.add_expense(self.user_id, 2, '02-01-2025')
+        # Pierwszy next_id() i dwa zapisy - kolejne ID jest już znane
+        self.assertEqual(read_excel.call_count, 3)
+
+        # Zmiana pliku z zewnątrz (inny proces) unieważnia zapamiętane ID
+        BudgetManager(file_path).add_expense(self.user_id, 3, '03-01-2025')
+        self.assertEqual(budget.add_expense(self.user_id, 4, '04-01-2025')['ID'], 4)
+        self.assertEqual(pd.read_excel(file_path)['ID'].tolist(), [1, 2, 3, 4])
+
+    def test_new_journal_imports_workbook_with_the_same_name(self):
+        BudgetManager(self._path('data.xlsx')).add_transactions([
+            {'type': 'income', 'user_id': self.user_id, 'amount': '100.00', 'date': '01-01-2025'},
+            {'type': 'expense', 'user_id': self.user_id, 'amount': '10.01', 'date': '02-01-2025'},
+        ])
+
+        budget = BudgetManager(self._path('data.jsonl'))
+        self.assertEqual(budget.add_expense(self.user_id, 5, '03-01-2025')['ID'], 3)
+        # Istniejący dziennik nie jest ponownie uzupełniany z arkusza
+        totals = TransactionHistoryAnalyzer(self._path('data.jsonl'), LedgerCache()).get_user_totals(self.user_id)
+        self.assertEqual(totals, {
+            'income': Decimal('100.00'), 'expense': Decimal('15.01'), 'balance': Decimal('84.99'),
+        })
+
+    def test_amounts_round_trip_exactly(self):
+        user_id = uuid.uuid4()
+        amounts = ['0.10', '0.20', '0.70', '1234567.89', '0.01', '19.99'] * 50
+        for name in ('data.jsonl', 'data.xlsx'):
+            with self.subTest(ledger=name):
+                budget = BudgetManager(self._path(name))
+                budget.add_transactions([
+                    {'type': 'expense', 'user_id': user_id, 'amount': amount, 'date': '01-01-2025'}
+                    for amount in amounts
+                ])
+                budget.add_income(user_id, '0.30', '02-01-2025')
+
+                totals = TransactionHistoryAnalyzer(self._path(name), LedgerCache()).get_user_totals(user_id)
+                expense = sum(Decimal(amount) for amount in amounts)
+                self.assertEqual(totals, {
+                    'income': Decimal('0.30'), 'expense': expense, 'balance': Decimal('0.30') - expense,
+                })
+                self.assertEqual(
+                    [to_decimal(record['Wydatek']) for record in budget.storage.iter_records()][:6],
+                    [Decimal(amount) for amount in amounts[:6]]
+                )
+
+    def test_journal_stores_amounts_as_decimal_text(self):
+        budget = BudgetManager(self._path('data.jsonl'))
+        budget.add_expense(uuid.uuid4(), 0.1, '01-01-2025')
+
+        with open(self._path('data.jsonl'), encoding='utf-8') as f:
+            line = f.read()
+        self.assertIn('"Przychod": "0.00", "Wydatek": "0.10"', line)
+        record = next(budget.storage.iter_records())
+        self.assertEqual((record['Przychod'], record['Wydatek']), (Decimal('0.00'), Decimal('0.10')))
+
+    def test_journal_is_the_default_ledger(self):
+        self.assertEqual(BudgetManager.__init__.__defaults__[0], DEFAULT_LEDGER_FILE)
+        self.assertEqual(TransactionHistoryAnalyzer.__init__.__defaults__[0], DEFAULT_LEDGER_FILE)
+        self.assertIsInstance(BudgetManager(self._path(DEFAULT_LEDGER_FILE)).storage, JournalStorage)
+
+
+class LedgerCacheTest(unittest.TestCase):
+    """Rejestr jest parsowany ponownie tylko po zmianie pliku (mtime albo rozmiaru)"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'data.jsonl')
+        self.user_id = uuid.uuid4()
+        self.budget = BudgetManager(self.file_path)
+        self.budget.add_expense(self.user_id, 1, '01-01-2025')
+        self.cache = LedgerCache()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _analyzer(self):
+        return TransactionHistoryAnalyzer(self.file_path, self.cache)
+
+    def test_unchanged_file_is_served_from_cache(self):
+        self._analyzer().get_user_transactions(self.user_id)
+        rows = self._analyzer().get_user_transactions(self.user_id)
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1, 'entries': 1})
+
+    def test_append_invalidates_entry(self):
+        analyzer = self._analyzer()
+        analyzer.get_user_transactions(self.user_id)
+        self.budget.add_expense(self.user_id, 2, '02-01-2025')
+
+        self.assertEqual(len(analyzer.get_user_transactions(self.user_id)), 2)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+    def test_mtime_change_with_same_size_invalidates_entry(self):
+        analyzer = self._analyzer()
+        analyzer.get_user_transactions(self.user_id)
+        with open(self.file_path, encoding='utf-8') as f:
+            content = f.read()
+        # Ta sama długość pliku, inna kwota
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            f.write(content.replace('"Wydatek": "1.00"', '"Wydatek": "7.00"'))
+        stat = os.stat(self.file_path)
+        os.utime(self.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        self.assertEqual(analyzer.get_user_totals(self.user_id)['expense'], Decimal('7.00'))
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+    def test_files_are_cached_separately(self):
+        other_path = os.path.join(self.directory.name, 'other.jsonl')
+        BudgetManager(other_path).add_expense(self.user_id, 5, '01-01-2025')
+
+        self._analyzer().get_user_transactions(self.user_id)
+        TransactionHistoryAnalyzer(other_path, self.cache).get_user_transactions(self.user_id)
+        self._analyzer().get_user_transactions(self.user_id)
+
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 2, 'entries': 2})
+
+
+class TransactionHistoryIndexTest(unittest.TestCase):
+    """Zapytania o użytkownika i zakres dat korzystają z indeksu posortowanego po dacie"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'data.jsonl')
+        self.user_id, self.other_user_id = uuid.uuid4(), uuid.uuid4()
+        BudgetManager(self.file_path).add_transactions([
+            {'type': 'expense', 'user_id': self.user_id, 'amount': 3, 'date': '15-03-2025'},
+            {'type': 'expense', 'user_id': self.other_user_id, 'amount': 99, 'date': '01-02-2025'},
+            {'type': 'income', 'user_id': self.user_id, 'amount': 1, 'date': '01.01.2025'},
+            {'type': 'expense', 'user_id': self.user_id, 'amount': 2, 'date': '01-02-2025'},
+            {'type': 'expense', 'user_id': self.user_id, 'amount': 4, 'date': 'brak daty'},
+        ])
+        self.analyzer = TransactionHistoryAnalyzer(self.file_path, LedgerCache())
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_user_rows_are_sorted_by_date_and_keep_dates_from_file(self):
+        rows = self.analyzer.get_user_transactions(self.user_id)
+        # Wiersz z nieczytelną datą jest na końcu
+        self.assertEqual([row['ID'] for row in rows], [3, 4, 1, 5])
+        self.assertEqual([row['Data'] for row in rows], ['01.01.2025', '01-02-2025', '15-03-2025', 'brak daty'])
+        self.assertEqual([row['ID'] for row in self.analyzer.get_all_user_expenses(self.user_id)], [4, 1, 5])
+
+    def test_date_range_includes_both_boundaries(self):
+        rows = self.analyzer.get_user_expenses_by_date(self.user_id, '01-02-2025', '15-03-2025')
+        self.assertEqual([row['ID'] for row in rows], [4, 1])
+        self.assertEqual([row['Data'] for row in rows], [pd.Timestamp(2025, 2, 1), pd.Timestamp(2025, 3, 15)])
+        self.assertEqual(
+            [row['ID'] for row in self.analyzer.get_user_incomes_by_date(self.user_id, '01-01-2025', '01-01-2025')], [3]
+        )
+
+    def test_date_range_outside_data_and_unknown_user(self):
+        self.assertEqual(self.analyzer.get_user_expenses_by_date(self.user_id, '16-03-2025', '31-12-2025'), [])
+        self.assertEqual(self.analyzer.get_user_expenses_by_date(self.user_id, '01-01-2024', '31-12-2024'), [])
+        self.assertEqual(self.analyzer.get_user_transactions(uuid.uuid4()), [])
+        self.assertEqual(self.analyzer.get_user_totals(uuid.uuid4(), '01-01-2025', '31-12-2025')['balance'],
+                         Decimal('0.00'))
+
+
+class AddTransactionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.user_id = uuid.uuid4()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _batch(self, count):
+        return [{'type': 'expense', 'user_id': self.user_id, 'amount': number} for number in range(1, count + 1)]
+
+    def test_batch_gets_contiguous_ids(self):
+        for name in ('data.jsonl', 'data.xlsx'):
+            with self.subTest(name=name):
+                file_path = os.path.join(self.directory.name, name)
+                budget = BudgetManager(file_path)
+                budget.add_income(self.user_id, 100, '01-01-2025')
+
+                rows = budget.add_transactions(self._batch(3))
+
+                self.assertEqual([row['ID'] for row in rows], [2, 3, 4])
+                self.assertEqual(budget.add_expense(self.user_id, 5)['ID'], 5)
+                self.assertEqual(budget.storage.read_all()['ID'].tolist(), [1, 2, 3, 4, 5])
+
+    def test_empty_batch_writes_nothing(self):
+        file_path = os.path.join(self.directory.name, 'data.jsonl')
+        budget = BudgetManager(file_path)
+
+        self.assertEqual(budget.add_transactions([]), [])
+        self.assertEqual(os.path.getsize(file_path), 0)
+        self.assertEqual(budget.add_expense(self.user_id, 1)['ID'], 1)
+
+    def test_invalid_record_rejects_whole_batch(self):
+        budget = BudgetManager(os.path.join(self.directory.name, 'data.jsonl'))
+        batch = self._batch(2)
+        for record, message in [
+            ({'type': 'transfer', 'user_id': self.user_id, 'amount': 1}, "Rekord 3: Typ transakcji"),
+            ({'type': 'income', 'user_id': str(self.user_id), 'amount': 1}, "Rekord 3: ID_urzytkownika musi być typu UUID"),
+            ({'type': 'income', 'user_id': self.user_id, 'amount': 0}, "Rekord 3: Kwota przychodu"),
+            ({'type': 'expense', 'user_id': self.user_id, 'amount': '-1'}, "Rekord 3: Kwota wydatku"),
+        ]:
+            with self.subTest(record=record), self.assertRaisesRegex(ValueError, message):
+                budget.add_transactions(batch + [record])
+        self.assertTrue(budget.storage.read_all().empty)
+
+
+class BankImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.user_id = uuid.uuid4()
+        self.budget = BudgetManager(self._path('data.jsonl'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def _write(self, name, content):
+        with open(self._path(name), 'w', encoding='utf-8') as f:
+            f.write(content)
+        return self._path(name)
+
+    def _import(self, file_path, **options):
+        sink = bank_import.BudgetManagerSink(self.budget, self.user_id)
+        return bank_import.import_statement(file_path, sink, **options)
+
+    def _ledger(self):
+        return [
+            (row['Data'], row['Przychod'], row['Wydatek'], row['Kategoria'], row['Opis'])
+            for row in self.budget.storage.iter_records()
+        ]
+
+    def test_csv_with_rules_and_custom_columns(self):
+        file_path = self._write('wyciag.csv', (
+            "Data księgowania;Kwota PLN;Tytuł\n"
+            "2025-01-02;-1 234,56;BIEDRONKA 123\n"
+            "03.01.2025;0,00;Blokada\n"
+            "04-01-2025;6500.00;Wynagrodzenie styczeń\n"
+            "2025-01-05;-12,5;Bilet ZTM\n"
+        ))
+        mapper = bank_import.CategoryMapper({'biedronka': 'Zakupy', 'ztm': 'Transport'})
+        columns = {'date': 'Data księgowania', 'amount': 'Kwota PLN', 'description': 'Tytuł'}
+
+        stats = self._import(file_path, mapper=mapper, chunk_size=2, columns=columns)
+
+        # Wiersz z zerową kwotą jest pomijany
+        self.assertEqual(stats['rows'], 3)
+        self.assertEqual(self._ledger(), [
+            ('02-01-2025', Decimal('0.00'), Decimal('1234.56'), 'Zakupy', 'BIEDRONKA 123'),
+            ('04-01-2025', Decimal('6500.00'), Decimal('0.00'), 'Inne przychody', 'Wynagrodzenie styczeń'),
+            ('05-01-2025', Decimal('0.00'), Decimal('12.50'), 'Transport', 'Bilet ZTM'),
+        ])
+
+    def test_csv_with_missing_columns_or_invalid_amount(self):
+        file_path = self._write('wyciag.csv', "Data operacji;Kwota\n2025-01-02;-10,00\n")
+        with self.assertRaisesRegex(ValueError, 'Brak kolumn w pliku CSV: Tytuł'):
+            self._import(file_path, columns={'date': 'Data operacji', 'amount': 'Tytuł'})
+
+        file_path = self._write('nan.csv', "Data operacji;Kwota;Opis\n2025-01-02;NaN;Test\n")
+        with self.assertRaisesRegex(ValueError, 'Nieprawidłowa kwota'):
+            self._import(file_path)
+        self.assertEqual(self._ledger(), [])
+
+    def test_mt940_signs_and_multiline_descriptions(self):
+        file_path = self._write('wyciag.sta', (
+            ":20:ST250101\n"
+            ":25:PL61109010140000071219812874\n"
+            ":60F:C250101PLN1000,00\n"
+            ":61:2501020102DN100,50NTRFNONREF\n"
+            ":86:020~00FEBA~20ZAKUPY BIEDRONKA\n"
+            "~21WARSZAWA~22UL. PROSTA 1\n"
+            ":61:250103C2500,NTRFNONREF\n"
+            ":86:~20PRZELEW PRZYCHODZACY\n"
+            ":61:250104RD15,00NTRFNONREF\n"
+            ":61:250105RC7,25NTRFNONREF\n"
+            ":86:ZWROT\n"
+            ":62F:C250105PLN3391,75\n"
+            "-\n"
+        ))
+        mapper = bank_import.CategoryMapper({'biedronka': 'Zakupy'})
+
+        self.assertEqual(self._import(file_path, mapper=mapper)['rows'], 4)
+        self.assertEqual(self._ledger(), [
+            ('02-01-2025', Decimal('0.00'), Decimal('100.50'), 'Zakupy', 'FEBA ZAKUPY BIEDRONKA WARSZAWA UL. PROSTA 1'),
+            ('03-01-2025', Decimal('2500.00'), Decimal('0.00'), 'Inne przychody', 'PRZELEW PRZYCHODZACY'),
+            # Storno obciążenia (RD) zwiększa saldo, storno uznania (RC) je zmniejsza
+            ('04-01-2025', Decimal('15.00'), Decimal('0.00'), 'Inne przychody', ''),
+            ('05-01-2025', Decimal('0.00'), Decimal('7.25'), 'Inne wydatki', 'ZWROT'),
+        ])
+
+
+class ToDecimalTest(unittest.TestCase):
+
+    def test_rounds_half_up_to_grosze(self):
+        self.assertEqual(to_decimal('0.125'), Decimal('0.13'))
+        self.assertEqual(to_decimal(0.1), Decimal('0.10'))
+        self.assertEqual(to_decimal('12,5'), Decimal('12.50'))
+
+    def test_rejects_non_finite_amounts(self):
+        for amount in ('NaN', float('nan'), 'Infinity', float('-inf'), 'abc'):
+            with self.subTest(amount=amount), self.assertRaises(ValueError):
+                to_decimal(amount)
+
+    def test_batch_reports_record_with_non_finite_amount(self):
+        with tempfile.TemporaryDirectory() as directory:
+            budget = BudgetManager(os.path.join(directory, 'data.jsonl'))
+            with self.assertRaisesRegex(ValueError, 'Rekord 2'):
+                budget.add_transactions([
+                    {'type': 'expense', 'user_id': uuid.uuid4(), 'amount': '5.00'},
+                    {'type': 'expense', 'user_id': uuid.uuid4(), 'amount': 'NaN'},
+                ])
+
+
+def rates_response(payload, status_code=200):
+    response = mock.Mock(status_code=status_code, text='')
+    response.json.return_value = payload
+    return response
+
+
+class ExchangeRateCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.directory.name, 'rates.json')
+        patcher = mock.patch('exchange_rates.requests.get')
+        self.get = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.get.return_value = rates_response({'rates': {'PLN': 4.3}})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _cache(self, **options):
+        options.setdefault('ttl', 60)
+        options.setdefault('offline', False)
+        options.setdefault('retry_after', 60)
+        return ExchangeRateCache(self.cache_file, **options)
+
+    def test_rates_are_cached_until_ttl_expires(self):
+        cache = self._cache()
+        self.assertEqual(cache.get_rates('eur'), {'PLN': 4.3, 'EUR': 1.0})
+        self.assertEqual(cache.convert(10, 'EUR', 'PLN'), 43.0)
+        self.assertEqual(self.get.call_count, 1)
+
+        cache._entries['latest:EUR']['fetched_at'] -= 61
+        self.get.return_value = rates_response({'rates': {'PLN': 4.25}})
+        self.assertEqual(cache.get_rates('EUR')['PLN'], 4.25)
+        self.assertEqual(self.get.call_count, 2)
+        # Tabela przetrwała restart - nowa instancja czyta ją z pliku
+        self.assertEqual(self._cache().get_rates('EUR')['PLN'], 4.25)
+        self.assertEqual(self.get.call_count, 2)
+
+    def test_offline_mode_uses_stale_rates_and_never_calls_api(self):
+        self._cache().get_rates('EUR')
+        offline = self._cache(ttl=0, offline=True)
+
+        self.assertEqual(offline.get_rates('EUR')['PLN'], 4.3)
+        with self.assertRaises(ExchangeRateError):
+            offline.get_rates('USD')
+        self.assertEqual(self.get.call_count, 1)
+
+    def test_outage_pauses_all_requests_and_serves_stale_rates(self):
+        cache = self._cache()
+        cache.get_rates('EUR')
+        cache._entries['latest:EUR']['fetched_at'] -= 61
+        self.get.side_effect = requests.ConnectionError('timeout')
+
+        self.assertEqual(cache.get_rates('EUR')['PLN'], 4.3)
+        with self.assertRaises(ExchangeRateError):
+            cache.get_rates('USD')
+        self.assertEqual(self.get.call_count, 2)
+
+        # Po upływie retry_after API jest odpytywane ponownie
+        cache._unavailable_until = 0.0
+        self.get.side_effect = None
+        self.assertEqual(cache.get_rates('USD'), {'PLN': 4.3, 'USD': 1.0})
+        self.assertEqual(self.get.call_count, 3)
+
+    def test_client_error_pauses_only_the_failed_table(self):
+        cache = self._cache()
+        self.get.return_value = rates_response({}, status_code=404)
+        for _ in range(2):
+            with self.assertRaises(ExchangeRateError) as error:
+                cache.get_rates('XYZ')
+            self.assertNotIsInstance(error.exception, ExchangeRateUnavailable)
+        self.assertEqual(self.get.call_count, 1)
+
+        self.get.return_value = rates_response({'rates': {'PLN': 4.3}})
+        self.assertEqual(cache.get_rates('EUR')['PLN'], 4.3)
+        self.assertEqual(self.get.call_count, 2)
+
+    def test_history_is_fetched_once_per_range(self):
+        cache = self._cache()
+        self.get.return_value = rates_response({'rates': {
+            '2024-03-01': {'PLN': 4.30}, '2024-03-04': {'PLN': 4.31}, '2024-03-08': {'PLN': 4.35},
+        }})
+        converted = cache.convert_many([1, 2, 1], 'EUR', 'PLN', dates=['2024-03-01', '2024-03-03', '2024-03-08'])
+        self.assertEqual(converted.tolist(), [4.30, 8.60, 4.35])
+        self.assertEqual(self.get.call_count, 1)
+        self.assertEqual(self.get.call_args.args[0], 'https://api.frankfurter.app/2024-02-23..2024-03-08')
+
+        # Dni z już pobranego zakresu nie wymagają kolejnego zapytania
+        converted = cache.convert_many([1, 1], 'EUR', 'PLN', dates=['2024-03-05', '2024-03-02'])
+        self.assertEqual(converted.tolist(), [4.31, 4.30])
+        self.assertEqual(self.get.call_count, 1)
+        self.assertEqual(cache.stats()['upstream_requests'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
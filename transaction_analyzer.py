@@ -1,84 +1,203 @@
 import pandas as pd
 import uuid
 import os
+import threading
+from ledger_storage import DEFAULT_LEDGER_FILE, open_storage
+from money import from_minor_units, to_minor_units
+
+
+class LedgerCache:
+    """
+    Wspólna dla procesu pamięć podręczna sparsowanych plików rejestru.
+
+    Kluczem wpisu jest (ścieżka, mtime, rozmiar) pliku, więc rejestr jest parsowany
+    ponownie dopiero po zmianie na dysku. Liczniki trafień i chybień służą diagnostyce
+    i można je odczytać przez `stats()`.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path, loader):
+        """Zwraca zapamiętane dane pliku albo, gdy są nieaktualne, buduje je przez `loader()`"""
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        data = loader()
+        with self._lock:
+            self._entries[path] = (key, data)
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+ledger_cache = LedgerCache()
+
+
+class LedgerIndex:
+    """
+    Indeks sparsowanego rejestru według użytkowników.
+
+    Wiersze są raz grupowane w posortowaną po dacie ramkę dla każdego użytkownika, więc
+    odczyt użytkownika to dostęp do słownika, a zakresy dat są wyznaczane wyszukiwaniem
+    binarnym (`searchsorted`) po datach tego użytkownika zamiast maską po wszystkich wierszach.
+    Kolumna daty w ramkach zostaje taka jak w pliku; sparsowane daty (`dates`, wyrównane
+    z `data`) są trzymane osobno.
+    """
+
+    def __init__(self, data, user_column, date_column, dates):
+        self.date_column = date_column
+        self._empty = data.iloc[0:0]
+        self._frames = {}
+        self._dates = {}
+        data = data.reset_index(drop=True)
+        dates = dates.reset_index(drop=True)
+        for user_id, positions in data.groupby(user_column, sort=False).indices.items():
+            user_dates = dates.iloc[positions]
+            # Wiersze bez daty (NaT) trafiają na koniec, więc wyszukujemy tylko w prefiksie z datami
+            order = user_dates.sort_values(kind='stable', na_position='last').index
+            self._frames[user_id] = data.iloc[order].reset_index(drop=True)
+            sorted_dates = dates.iloc[order]
+            self._dates[user_id] = sorted_dates[sorted_dates.notna()].to_numpy()
+
+    def for_user(self, user_id):
+        """Zwraca wszystkie wiersze użytkownika posortowane po dacie"""
+        return self._frames.get(str(user_id), self._empty)
+
+    def for_user_between(self, user_id, start_date, end_date):
+        """
+        Zwraca wiersze użytkownika z start_date <= data <= end_date. Tak jak przed
+        wprowadzeniem indeksu, kolumna daty tych wierszy zawiera sparsowane daty (Timestamp).
+        """
+        user_id = str(user_id)
+        if user_id not in self._frames:
+            return self._empty
+        dates = self._dates[user_id]
+        start = dates.searchsorted(pd.Timestamp(start_date).to_datetime64(), side='left')
+        end = dates.searchsorted(pd.Timestamp(end_date).to_datetime64(), side='right')
+        return self._frames[user_id].iloc[start:end].assign(**{self.date_column: dates[start:end]})
 
 
 class TransactionHistoryAnalyzer:
     """
-    This class provides functionalities to initialize transaction data, load
-    existing records, and filter transactions based on user ID, type of
-    transaction (income or expense), and date ranges.
-    The transaction data
-    is stored in an Excel file and can be retrieved or manipulated
-    as needed.
+    Wczytuje zapisane transakcje i filtruje je według ID użytkownika, typu transakcji
+    (przychód albo wydatek) i zakresu dat. Transakcje są przechowywane w dzienniku JSONL
+    (albo w pliku Excela, zob. `ledger_storage`).
     """
     USER_ID_COLUMN = 'ID_urzytkownika'
     INCOME_COLUMN = 'Przychod'
     EXPENSE_COLUMN = 'Wydatek'
     DATE_COLUMN = 'Data'
-    DEFAULT_COLUMNS = ['ID', USER_ID_COLUMN, DATE_COLUMN, INCOME_COLUMN, EXPENSE_COLUMN, 'Opis', 'Kategoria']
+    DEFAULT_COLUMNS = ['ID', USER_ID_COLUMN, DATE_COLUMN, INCOME_COLUMN, EXPENSE_COLUMN, 'Opis', 'Kategoria', 'Typ']
 
-    def __init__(self, data_file_path="data.xlsx"):
+    def __init__(self, data_file_path=DEFAULT_LEDGER_FILE, cache=None):
         self.data_file_path = data_file_path
-        if not os.path.exists(data_file_path):
-            self._initialize_excel_file()
-
-    def _initialize_excel_file(self):
-        """Initializes the Excel file with default columns if it doesn't exist."""
-        df = pd.DataFrame(columns=self.DEFAULT_COLUMNS)
-        df.to_excel(self.data_file_path, index=False)
-
-    def _load_data(self, convert_dates=False):
-        """Loads the data from the Excel file and converts date columns if needed."""
-        df = pd.read_excel(self.data_file_path)
-        if convert_dates:
-            df[self.DATE_COLUMN] = pd.to_datetime(df[self.DATE_COLUMN], format="%d-%m-%Y")
-        return df
+        self.storage = open_storage(data_file_path, self.DEFAULT_COLUMNS)
+        self.cache = cache if cache else ledger_cache
+
+    def _parse_dates(self, dates):
+        """Zamienia kolumnę dat na datetime, przyjmując zarówno DD-MM-RRRR, jak i DD.MM.RRRR"""
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            return dates
+        normalized = dates.astype(str).str.replace('.', '-', regex=False)
+        return pd.to_datetime(normalized, format="%d-%m-%Y", errors="coerce")
+
+    def _read_ledger(self):
+        df = self.storage.read_all()
+        df[self.USER_ID_COLUMN] = df[self.USER_ID_COLUMN].astype(str)
+        return LedgerIndex(df, self.USER_ID_COLUMN, self.DATE_COLUMN, self._parse_dates(df[self.DATE_COLUMN]))
+
+    def _load_data(self):
+        """
+        Zwraca indeks sparsowanego rejestru, z pamięci podręcznej, jeśli plik się nie zmienił.
+        """
+        return self.cache.get(self.data_file_path, self._read_ledger)
+
+    def cache_stats(self):
+        """Zwraca liczniki trafień i chybień pamięci podręcznej rejestru"""
+        return self.cache.stats()
 
     def _convert_date_range(self, start_date: str, end_date: str):
-        """Converts strings to pandas datetime objects for date comparison."""
+        """Zamienia daty w tekście na obiekty datetime pandas do porównań"""
         return pd.to_datetime(start_date, dayfirst=True), pd.to_datetime(end_date, dayfirst=True)
 
-    def _filter_transactions(self, data, user_id: uuid.UUID, column_filter=None, start_date=None, end_date=None):
-        """Filters transactions by user, type (income/expenses), and optionally by date."""
-        user_transactions = data[data[self.USER_ID_COLUMN] == str(user_id)]
-        if column_filter:
-            user_transactions = user_transactions[user_transactions[column_filter] > 0]
+    def _filter_transactions(self, index, user_id: uuid.UUID, column_filter=None, start_date=None, end_date=None):
+        """Filtruje transakcje według użytkownika, typu (przychody/wydatki) i opcjonalnie dat"""
         if start_date and end_date:
-            user_transactions = user_transactions[
-                (user_transactions[self.DATE_COLUMN] >= start_date) &
-                (user_transactions[self.DATE_COLUMN] <= end_date)
-                ]
+            user_transactions = index.for_user_between(user_id, start_date, end_date)
+        else:
+            user_transactions = index.for_user(user_id)
+        if column_filter:
+            # Kwoty z dziennika są Decimal, z arkusza liczbami (puste komórki bywają tekstem)
+            user_transactions = user_transactions[pd.to_numeric(user_transactions[column_filter], errors='coerce') > 0]
         return user_transactions.to_dict('records')
 
     def get_all_user_expenses(self, user_id: uuid.UUID):
-        """Gets all expenses for the specified user."""
-        df = self._load_data()
-        return self._filter_transactions(df, user_id, column_filter=self.EXPENSE_COLUMN)
+        """Zwraca wszystkie wydatki użytkownika"""
+        index = self._load_data()
+        return self._filter_transactions(index, user_id, column_filter=self.EXPENSE_COLUMN)
 
     def get_all_user_incomes(self, user_id: uuid.UUID):
-        """Gets all incomes for the specified user."""
-        df = self._load_data()
-        return self._filter_transactions(df, user_id, column_filter=self.INCOME_COLUMN)
+        """Zwraca wszystkie przychody użytkownika"""
+        index = self._load_data()
+        return self._filter_transactions(index, user_id, column_filter=self.INCOME_COLUMN)
 
     def get_user_expenses_by_date(self, user_id: uuid.UUID, start_date: str, end_date: str):
-        """Gets expenses for the specified user within a date range."""
-        df = self._load_data(convert_dates=True)
+        """Zwraca wydatki użytkownika z zakresu dat"""
+        index = self._load_data()
         start_date, end_date = self._convert_date_range(start_date, end_date)
-        return self._filter_transactions(df, user_id, column_filter=self.EXPENSE_COLUMN, start_date=start_date,
+        return self._filter_transactions(index, user_id, column_filter=self.EXPENSE_COLUMN, start_date=start_date,
                                          end_date=end_date)
 
     def get_user_incomes_by_date(self, user_id: uuid.UUID, start_date: str, end_date: str):
-        """Gets incomes for the specified user within a date range."""
-        df = self._load_data(convert_dates=True)
+        """Zwraca przychody użytkownika z zakresu dat"""
+        index = self._load_data()
         start_date, end_date = self._convert_date_range(start_date, end_date)
-        return self._filter_transactions(df, user_id, column_filter=self.INCOME_COLUMN, start_date=start_date,
+        return self._filter_transactions(index, user_id, column_filter=self.INCOME_COLUMN, start_date=start_date,
                                          end_date=end_date)
 
+    def get_user_totals(self, user_id: uuid.UUID, start_date: str = None, end_date: str = None) -> dict:
+        """
+        Sumuje przychody i wydatki użytkownika (opcjonalnie w zakresie dat).
+        Kwoty są sumowane jako grosze int64, więc sumy są dokładnymi wartościami Decimal.
+        """
+        index = self._load_data()
+        if start_date and end_date:
+            start_date, end_date = self._convert_date_range(start_date, end_date)
+            user_transactions = index.for_user_between(user_id, start_date, end_date)
+        else:
+            user_transactions = index.for_user(user_id)
+
+        # Puste komórki w starszych arkuszach mogą być wczytane jako tekst
+        income = to_minor_units(pd.to_numeric(user_transactions[self.INCOME_COLUMN], errors='coerce')).sum()
+        expense = to_minor_units(pd.to_numeric(user_transactions[self.EXPENSE_COLUMN], errors='coerce')).sum()
+        return {
+            'income': from_minor_units(income),
+            'expense': from_minor_units(expense),
+            'balance': from_minor_units(income - expense),
+        }
+
     def get_user_transactions(self, user_id: uuid.UUID) -> list[dict]:
-        """Gets all transactions for the specified user."""
-        df = self._load_data()
-        return self._filter_transactions(df, user_id)
+        """Zwraca wszystkie transakcje użytkownika"""
+        index = self._load_data()
+        return self._filter_transactions(index, user_id)
 
 
 if __name__ == "__main__":
@@ -96,4 +215,5 @@ if __name__ == "__main__":
     print("\nWydatki:", expenses)
     print("\nPrzychody:", incomes)
     print("\nWszystkie operacje:", operations)
-    print("\nWydatki z zakresu dat:", date_expenses)
\ No newline at end of file
+    print("\nWydatki z zakresu dat:", date_expenses)
+    print("\nCache:", test_budget.cache_stats())
\ No newline at end of file